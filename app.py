@@ -1,5 +1,8 @@
 """MarketStockMonitor 应用启动入口."""
 
+import subprocess
+import sys
+
 import uvicorn
 from app.main import app, settings
 
@@ -10,10 +13,24 @@ if __name__ == "__main__":
     print(f"🔧 配置信息: {settings.app_name} v{settings.app_version}")
     print("=" * 50)
     
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.reload,
-        access_log=True
-    )
+    # 发布/订阅部署: 独立的采集进程运行数据源，多个API工作进程共享其行情
+    ingest = None
+    workers = 1
+    if settings.broker_enabled:
+        ingest = subprocess.Popen([sys.executable, "-m", "app.ingest"])
+        workers = settings.api_workers
+        print(f"📡 采集进程 PID {ingest.pid}，API工作进程数: {workers}")
+    
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=settings.reload and workers == 1,
+            workers=workers,
+            access_log=True
+        )
+    finally:
+        if ingest is not None:
+            ingest.terminate()
+            ingest.wait(timeout=15)
@@ -1,6 +1,6 @@
 """应用配置设置."""
 
-from typing import List
+from typing import Dict, List, Optional
 from functools import lru_cache
 
 
@@ -25,6 +25,50 @@ class Settings:
     # 日志配置
     log_level: str = "INFO"
     
+    # 标的注册表配置
+    symbol_registry_file: Optional[str] = None  # 自选标的JSON文件，启动时加载
+    
+    # 数据源工作进程模式: 每个数据源在独立进程中运行，经共享内存传回数据
+    source_worker_mode: bool = False
+    
+    # 调度器配置
+    scheduler_max_workers: int = 4  # 共享调度器执行同步任务的线程数
+    
+    # 按需轮询配置
+    demand_linger_seconds: float = 60.0  # 最后一个消费者离开后继续轮询的时间
+    demand_warmup_seconds: float = 30.0  # 启动后全量轮询的预热时间
+    demand_rest_ttl_seconds: float = 300.0  # REST访问产生的需求有效期
+    
+    # 最新价格接口: 缓存数据在该时间内直接返回，否则请求上游（休市时有缓存即返回）
+    latest_max_staleness_seconds: Dict[str, float] = {"realtime": 5.0, "kline1m": 90.0}
+    latest_batch_max_items: int = 200  # 批量最新价格接口单次请求的 数据源×市场×类型 组合数上限
+    
+    # 上游请求合并: 相同的并发请求共享一次上游调用
+    upstream_max_workers: int = 4  # 同时进行的上游请求数上限
+    upstream_timeouts: Dict[str, float] = {"latest": 10.0, "latest_batch": 10.0,
+                                           "trading_hours": 15.0, "next_opening_time": 15.0}
+    
+    # SSE配置
+    sse_replay_buffer_size: int = 1000  # 断线重连补发的最近事件数
+    sse_idle_timeout_seconds: float = 300.0  # 连接无数据推送超过该时间后断开
+    
+    # 数据流准入控制（SSE与WebSocket共用）
+    stream_max_connections: int = 1000
+    stream_max_connections_per_ip: int = 20
+    stream_max_queued_events: int = 100000  # 所有连接待发送事件总数上限
+    stream_overload_policy: str = "reject"  # reject=503拒绝, conflate=新连接降级为合并模式, evict=断开最慢的连接
+    stream_retry_after_seconds: float = 5.0
+    tick_bridge_max_backlog: int = 10000  # 数据源线程到服务事件循环的积压上限
+    sse_compression_enabled: bool = True  # 按 Accept-Encoding 协商逐连接流式压缩
+    sse_compression_level: int = 1  # zlib 压缩级别
+    sse_compression_max_cpu: float = 0.25  # 压缩耗时占单核比例上限，超出时新连接不压缩
+    
+    # 多进程部署: 独立的采集进程(python -m app.ingest)运行数据源，
+    # 经本地Unix套接字向各API工作进程发布行情，工作进程不再轮询上游
+    broker_enabled: bool = False
+    broker_socket_path: str = "/tmp/market_stock_monitor.sock"
+    api_workers: int = 1  # 启用 broker_enabled 时可大于1
+    
     # API配置
     api_prefix: str = "/api"
     docs_url: str = "/docs"
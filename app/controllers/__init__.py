@@ -2,6 +2,6 @@
 
 from .health import health_router
 from .sources import sources_router
-from .market import market_router
+from .market import market_router, latest_router
 
-__all__ = ["health_router", "sources_router", "market_router"]
\ No newline at end of file
+__all__ = ["health_router", "sources_router", "market_router", "latest_router"]
\ No newline at end of file
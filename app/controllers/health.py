@@ -4,7 +4,10 @@ from datetime import datetime
 from fastapi import APIRouter, Depends
 from app.models.responses import HealthResponse
 from app.services import SourceService
+from app.services.calendar_cache import get_calendar_cache
 from utils.logger_config import setup_api_logger
+from utils.scheduler import get_scheduler
+from utils.single_flight import get_single_flight
 
 api_logger = setup_api_logger()
 
@@ -49,4 +52,26 @@ def health_check(source_service: SourceService = Depends(get_source_service)):
         status="healthy",
         uptime=str(uptime),
         sources_count=source_service.get_sources_count()
-    )
\ No newline at end of file
+    )
+
+
+@health_router.get(
+    "/health/scheduler",
+    summary="调度器状态",
+    description="获取共享调度器及各定时任务的运行统计"
+)
+def scheduler_status():
+    """调度器状态端点."""
+    return get_scheduler().get_stats()
+
+
+@health_router.get(
+    "/health/upstream",
+    summary="上游请求合并状态",
+    description="获取按需上游请求的调用次数、合并次数、超时与进行中的请求，以及交易日历响应缓存的命中情况"
+)
+def upstream_status():
+    """上游请求合并状态端点."""
+    stats = get_single_flight().get_stats()
+    stats["calendar_cache"] = get_calendar_cache().get_stats()
+    return stats
@@ -1,12 +1,14 @@
 """市场数据控制器."""
 
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, Path, Query, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Path, Query, Depends, Header
+from app.models.requests import LatestBatchRequest
 from app.models.responses import (
-    LatestPriceResponse, TradingHoursResponse, 
+    LatestPriceResponse, LatestBatchResponse, TradingHoursResponse, 
     MarketStatusResponse, NextOpeningTimeResponse
 )
+from models.market_data import MarketDataType
 from app.services import MarketService
 from app.utils.validators import validate_market_symbol, validate_data_type, convert_exceptions_to_http
 from utils.logger_config import setup_api_logger
@@ -14,6 +16,8 @@ from utils.logger_config import setup_api_logger
 api_logger = setup_api_logger()
 
 market_router = APIRouter(prefix="/sources", tags=["市场数据"])
+# 跨数据源的批量查询
+latest_router = APIRouter(tags=["市场数据"])
 
 
 def get_market_service() -> MarketService:
@@ -27,7 +31,7 @@ def get_market_service() -> MarketService:
     summary="获取最新价格数据",
     description="获取指定数据源的指定市场的最新价格数据"
 )
-def get_latest_price(
+async def get_latest_price(
     source_id: str = Path(..., description="数据源ID，如: wen_cai"),
     market: str = Path(..., description="市场代码，如: HSI, NASDAQ"),
     data_type: str = Path(..., description="数据类型，如: realtime, kline1m"),
@@ -39,7 +43,7 @@ def get_latest_price(
         market_symbol = validate_market_symbol(market)
         market_data_type = validate_data_type(data_type)
         
-        return market_service.get_latest_price(source_id, market_symbol, market_data_type)
+        return await market_service.get_latest_price(source_id, market_symbol, market_data_type)
     except Exception as e:
         api_logger.error(f"❌ 获取最新价格失败: {str(e)}")
         from fastapi import HTTPException, status
@@ -50,11 +54,13 @@ def get_latest_price(
     "/{source_id}/trading-hours/{market}",
     response_model=TradingHoursResponse,
     summary="获取交易时间表",
-    description="获取指定市场的特殊交易时间表（包括节假日安排等）"
+    description="获取指定市场的特殊交易时间表（包括节假日安排等），支持 ETag / If-Modified-Since 条件请求"
 )
-def get_trading_hours(
+async def get_trading_hours(
     source_id: str = Path(..., description="数据源ID，如: wen_cai"),
     market: str = Path(..., description="市场代码，如: HSI, NASDAQ"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
     market_service: MarketService = Depends(get_market_service)
 ):
     """获取特殊交易时间表."""
@@ -62,7 +68,8 @@ def get_trading_hours(
         # 验证市场代码
         market_symbol = validate_market_symbol(market)
         
-        return market_service.get_trading_hours(source_id, market_symbol)
+        rendered = await market_service.get_calendar_response("trading_hours", source_id, market_symbol)
+        return rendered.respond(if_none_match, if_modified_since)
     except Exception as e:
         from fastapi import HTTPException, status
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -72,12 +79,14 @@ def get_trading_hours(
     "/{source_id}/market-status/{market}",
     response_model=MarketStatusResponse,
     summary="获取市场状态",
-    description="获取指定市场在特定时间的开盘状态"
+    description="获取指定市场在特定时间的开盘状态，不指定检查时间时支持 ETag / If-Modified-Since 条件请求"
 )
-def get_market_status(
+async def get_market_status(
     source_id: str = Path(..., description="数据源ID，如: wen_cai"),
     market: str = Path(..., description="市场代码，如: HSI, NASDAQ"),
     check_time: Optional[str] = Query(None, description="检查时间 (ISO格式，可选，默认为当前时间)"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
     market_service: MarketService = Depends(get_market_service)
 ):
     """获取指定源的指定市场的状态."""
@@ -97,7 +106,11 @@ def get_market_status(
                     detail=f"无效的时间格式: {check_time}。请使用ISO格式，如: 2024-01-15T09:00:00"
                 )
         
-        return market_service.get_market_status(source_id, market_symbol, check_datetime)
+        if check_datetime is None:
+            # 当前状态在交易时段切换前不变，可使用缓存
+            rendered = await market_service.get_calendar_response("market_status", source_id, market_symbol)
+            return rendered.respond(if_none_match, if_modified_since)
+        return await market_service.get_market_status(source_id, market_symbol, check_datetime)
     except Exception as e:
         from fastapi import HTTPException, status
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -107,11 +120,13 @@ def get_market_status(
     "/{source_id}/next-opening-time/{market}",
     response_model=NextOpeningTimeResponse,
     summary="获取下一个开盘时间",
-    description="获取指定市场的下一个开盘时间信息"
+    description="获取指定市场的下一个开盘时间信息，支持 ETag / If-Modified-Since 条件请求"
 )
-def get_next_opening_time(
+async def get_next_opening_time(
     source_id: str = Path(..., description="数据源ID，如: wen_cai"),
     market: str = Path(..., description="市场代码，如: HSI, NASDAQ"),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
     market_service: MarketService = Depends(get_market_service)
 ):
     """获取指定市场的下一个开盘时间."""
@@ -119,7 +134,52 @@ def get_next_opening_time(
         # 验证市场代码
         market_symbol = validate_market_symbol(market)
         
-        return market_service.get_next_opening_time(source_id, market_symbol)
+        rendered = await market_service.get_calendar_response("next_opening_time", source_id, market_symbol)
+        return rendered.respond(if_none_match, if_modified_since)
     except Exception as e:
         from fastapi import HTTPException, status
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+async def _latest_batch(market_service: MarketService, sources: Optional[List[str]],
+                        markets: Optional[List[str]], data_types: Optional[List[str]]) -> LatestBatchResponse:
+    """验证参数并批量获取最新价格，参数错误由全局异常处理器转换为 400/404."""
+    market_symbols = [validate_market_symbol(market) for market in markets] if markets else None
+    market_data_types = ([validate_data_type(data_type) for data_type in dict.fromkeys(data_types)]
+                         if data_types else [MarketDataType.REALTIME])
+    return await market_service.get_latest_batch(sources, market_symbols, market_data_types)
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    items = [item.strip() for item in value.split(',') if item.strip()] if value else []
+    return items or None
+
+
+@latest_router.get(
+    "/latest",
+    response_model=LatestBatchResponse,
+    summary="批量获取最新价格",
+    description="一次获取多个数据源、市场、数据类型的最新价格，优先使用最新行情缓存"
+)
+async def get_latest_batch(
+    sources: Optional[str] = Query(None, description="数据源列表，逗号分隔，为空则查询所有数据源"),
+    markets: Optional[str] = Query(None, description="市场列表，逗号分隔，为空则查询数据源支持的所有市场"),
+    data_types: Optional[str] = Query(None, description="数据类型列表，逗号分隔，默认 realtime"),
+    market_service: MarketService = Depends(get_market_service)
+):
+    """批量获取最新价格（查询参数）."""
+    return await _latest_batch(market_service, _split(sources), _split(markets), _split(data_types))
+
+
+@latest_router.post(
+    "/latest",
+    response_model=LatestBatchResponse,
+    summary="批量获取最新价格",
+    description="与 GET /latest 相同，参数通过JSON请求体传递，适合标的较多的查询"
+)
+async def post_latest_batch(
+    request: LatestBatchRequest,
+    market_service: MarketService = Depends(get_market_service)
+):
+    """批量获取最新价格（请求体）."""
+    return await _latest_batch(market_service, request.sources, request.markets, request.data_types)
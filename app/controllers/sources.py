@@ -1,17 +1,24 @@
 """数据源控制器."""
 
-import json
-import asyncio
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket
+from fastapi.responses import Response, StreamingResponse
 from app.models.responses import SourceInfoResponse
 from app.services import SourceService, MarketService
-from app.services.sse_manager import get_sse_manager, SSEFilter
+from app.services.sse_manager import format_sse, get_sse_manager, SSEFilter
+from app.services.sse_stream import SSEStreamSession
+from app.services.loop_bridge import get_tick_bridge
+from app.services.ws_stream import WSStreamSession
+from app.services.stream_throttle import StreamThrottle
+from app.services.stream_admission import AdmissionRejected
+from app.services.stream_codec import CompactEncoder
+from app.services.stream_compression import StreamCompressor, get_compression_budget, negotiate_encoding
+from app.config.settings import get_settings
 from utils.logger_config import setup_api_logger
 
 api_logger = setup_api_logger()
+settings = get_settings()
 
 sources_router = APIRouter(prefix="/sources", tags=["数据源"])
 
@@ -52,6 +59,23 @@ def get_data_sources(source_service: SourceService = Depends(get_source_service)
     - sources: 数据源列表，逗号分隔，为空则监听所有数据源
     - markets: 市场列表，逗号分隔，为空则监听所有市场  
     - data_types: 数据类型列表，逗号分隔，为空则监听所有数据类型
+    - conflate: 合并模式，慢速客户端每个(数据源, 市场, 类型)只接收最新的一条待发送数据
+    - heartbeat: 心跳间隔(秒)，默认30秒，心跳按独立计时发送，不延迟数据推送
+    - max_rate: 每个(数据源, 市场, 类型)每秒最多推送的条数，为空则不限速
+    - sample: 限速窗口内的合并方式，latest=最新一条，first=最早一条，ohlc=按窗口内价格构造开高低收
+    - format: 数据格式，json=完整字段（默认），compact=短键增量格式：每个市场/类型首条为完整记录，
+      之后只发送变化的字段，字段对照表见 connected 事件的 schema
+    - compress: 是否启用流式压缩（默认启用），编码按 Accept-Encoding 协商 gzip/deflate，
+      每个事件后同步刷新，不增加推送延迟；服务端压缩CPU超出预算时新连接不压缩
+    - last_event_id: 断线重连时最后收到的事件ID，浏览器自动重连时通过 Last-Event-ID 请求头携带
+    
+    连接建立后立即发送 snapshot 事件，包含匹配过滤条件的各市场最新行情
+    
+    断线重连: 补发断线期间错过的、匹配过滤条件的事件；缺口超出重放缓冲区时发送 reset 事件，
+    客户端应通过REST接口重新获取最新状态
+    
+    过载保护: 连接数（全局/单个IP）或待发送事件超出上限时按配置的策略拒绝(503 + Retry-After，
+    响应体含SSE retry 提示)、降级为合并模式或断开积压最多的慢速连接，当前压力见 /stream/stats
     
     示例:
     - /api/sources/stream - 接收所有数据
@@ -62,9 +86,19 @@ def get_data_sources(source_service: SourceService = Depends(get_source_service)
     """
 )
 async def sse_data_stream(
+    request: Request,
     sources: Optional[str] = Query(None, description="数据源列表，逗号分隔，为空则监听所有"),
     markets: Optional[str] = Query(None, description="市场列表，逗号分隔，为空则监听所有"),
-    data_types: Optional[str] = Query(None, description="数据类型列表，逗号分隔，为空则监听所有")
+    data_types: Optional[str] = Query(None, description="数据类型列表，逗号分隔，为空则监听所有"),
+    conflate: bool = Query(False, description="合并模式，每个市场/类型只保留最新的待发送数据"),
+    last_event_id: Optional[int] = Query(None, description="最后收到的事件ID，用于断线重连补发"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    heartbeat: float = Query(30.0, ge=1.0, le=300.0, description="心跳间隔(秒)"),
+    max_rate: Optional[float] = Query(None, gt=0, le=100, description="每个市场/类型每秒最多推送条数"),
+    sample: str = Query("latest", pattern="^(latest|first|ohlc)$", description="限速窗口内的合并方式"),
+    format: str = Query("json", pattern="^(json|compact)$", description="数据格式: json=完整字段, compact=短键增量"),
+    compress: bool = Query(True, description="按 Accept-Encoding 启用流式压缩"),
+    accept_encoding: Optional[str] = Header(None)
 ):
     """统一的SSE数据流端点."""
     
@@ -80,7 +114,10 @@ async def sse_data_stream(
         data_types=set(data_type_list) if data_type_list else None
     )
     
-    # 记录连接信息
+    # 浏览器自动重连时携带 Last-Event-ID 请求头，优先于查询参数
+    if last_event_id_header and last_event_id_header.strip().isdigit():
+        last_event_id = int(last_event_id_header.strip())
+    
     # 记录连接信息
     filter_desc = []
     if source_list:
@@ -96,100 +133,68 @@ async def sse_data_stream(
     api_logger.info(f"🔄 开始SSE数据流: {' | '.join(filter_desc)} (实时推送模式)")
     
     try:
-        # 获取SSE管理器并创建连接
-        sse_manager = get_sse_manager()
+        # 连接确认中回显的过滤条件
+        filter_info = {}
+        if source_list:
+            filter_info["sources"] = source_list
+        if market_list:
+            filter_info["markets"] = market_list
+        if data_type_list:
+            filter_info["data_types"] = data_type_list
         
-        async def event_generator():
-            """SSE事件生成器."""
-            connection_id = None
-            try:
-                # 创建连接
-                connection_id = sse_manager.create_connection(filter_config)
-                
-                # 发送连接确认
-                # 发送连接确认
-                # 构造连接确认数据
-                connection_data = {
-                    "message": "已连接到数据流",
-                    "connection_id": connection_id,
-                    "filter": {
-                        "mode": "realtime"
-                    }
-                }
-                
-                # 添加过滤条件
-                if source_list:
-                    connection_data["filter"]["sources"] = source_list
-                if market_list:
-                    connection_data["filter"]["markets"] = market_list
-                if data_type_list:
-                    connection_data["filter"]["data_types"] = data_type_list
-                
-                # 发送连接确认
-                yield f"event: connected\n"
-                yield f"data: {json.dumps(connection_data, ensure_ascii=False)}\n\n"
-                
-                # 获取连接对象
-                connection = sse_manager.get_connection(connection_id)
-                if not connection:
-                    raise Exception("无法获取SSE连接")
-                
-                # 持续发送数据
-                # 持续发送数据 - 实时推送模式
-                while connection.connected:
-                    try:
-                        # 从连接队列获取数据 (阻塞等待)
-                        data = await connection.get_data()
-                        
-                        if data:
-                            # 立即发送数据事件
-                            yield f"event: {data['event']}\n"
-                            yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
-                        else:
-                            # 如果没有数据，发送保活心跳 (每30秒)
-                            # 如果没有数据，发送保活心跳 (每30秒)
-                            heartbeat = {
-                                "event": "heartbeat",
-                                "connection_id": connection_id,
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            yield f"event: heartbeat\n"
-                            yield f"data: {json.dumps(heartbeat, ensure_ascii=False)}\n\n"
-                            # 心跳后等待一段时间
-                            await asyncio.sleep(30)
-                        
-                    except Exception as e:
-                        # 发送错误消息
-                        # 发送错误消息
-                        error_data = {
-                            "message": str(e),
-                            "connection_id": connection_id,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                        yield f"event: error\n"
-                        yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
-                        api_logger.error(f"❌ SSE数据流异常: {str(e)}")
-                        break
-                    
-            except Exception as e:
-                api_logger.error(f"❌ SSE流异常: {str(e)}")
-                yield f"event: error\n"
-                yield f'data: {{"message": "数据流异常: {str(e)}"}}\n\n'
-            finally:
-                # 清理连接
-                if connection_id:
-                    sse_manager.disconnect_connection(connection_id)
-                    api_logger.info(f"🔌 SSE连接已断开: {connection_id}")
+        # 协商流式压缩，压缩CPU超出预算时不压缩
+        encoding = None
+        if compress and settings.sse_compression_enabled:
+            encoding = negotiate_encoding(accept_encoding)
+            if encoding and not get_compression_budget().allow_new():
+                api_logger.warning("⚠️ 压缩CPU超出预算，新SSE连接不启用压缩")
+                encoding = None
+        compressor = None
+        if encoding:
+            compressor = StreamCompressor(encoding, level=settings.sse_compression_level,
+                                          budget=get_compression_budget())
+        
+        session = SSEStreamSession(
+            filter_config,
+            filter_info=filter_info,
+            conflate=conflate,
+            last_event_id=last_event_id,
+            heartbeat_interval=heartbeat,
+            throttle=StreamThrottle(max_rate, sample) if max_rate else None,
+            codec=CompactEncoder() if format == "compact" else None,
+            compressor=compressor,
+            client_ip=request.client.host if request.client else None
+        )
+        
+        # 在返回响应之前准入，未被准入时仍可回复503
+        try:
+            session.open()
+        except AdmissionRejected as e:
+            api_logger.warning(f"⚠️ 拒绝SSE连接: {e.reason}")
+            return Response(
+                content=f"retry: {int(e.retry_after * 1000)}\n".encode('utf-8') + format_sse("rejected", {
+                    "message": e.reason,
+                    "retry_after": e.retry_after
+                }),
+                status_code=503,
+                media_type="text/event-stream",
+                headers={"Retry-After": str(int(e.retry_after)), "Cache-Control": "no-cache"}
+            )
+        
+        headers = {
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "Cache-Control",
+            "Vary": "Accept-Encoding"
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
         
         return StreamingResponse(
-            event_generator(),
+            session.events(),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Cache-Control"
-            }
+            headers=headers
         )
         
     except Exception as e:
@@ -197,26 +202,79 @@ async def sse_data_stream(
         raise
 
 
+@sources_router.websocket("/ws")
+async def ws_data_stream(
+    websocket: WebSocket,
+    conflate: bool = Query(False),
+    heartbeat: float = Query(30.0, ge=1.0, le=300.0),
+    max_rate: Optional[float] = Query(None, gt=0, le=100),
+    sample: str = Query("latest", pattern="^(latest|first|ohlc)$")
+):
+    """WebSocket实时数据流.
+    
+    连接后发送JSON控制消息调整订阅，缺省的维度表示全部:
+    - {"action": "subscribe", "subscriptions": [{"source": "wen_cai", "symbol": "HSI", "type": "realtime"}]}
+    - {"action": "unsubscribe", "subscriptions": [{"symbol": "HSI"}]}
+    - {"action": "ping"}
+    
+    行情以二进制帧批量推送，布局见 app.services.ws_stream；新订阅会先收到最新行情快照帧。
+    conflate=true 时每个(数据源, 市场, 类型)只保留最新的待发送数据；
+    max_rate/sample 与SSE数据流相同，按键限速并合并窗口内的数据。
+    """
+    api_logger.info(f"🔄 开始WebSocket数据流 (合并模式: {conflate})")
+    throttle = StreamThrottle(max_rate, sample) if max_rate else None
+    await WSStreamSession(websocket, conflate=conflate, heartbeat_interval=heartbeat, throttle=throttle).run()
+
+
 @sources_router.get(
     "/stream/stats",
     summary="SSE连接统计",
-    description="获取当前SSE连接的统计信息"
+    description="""
+    获取数据流的聚合统计: 连接数（按类型、按过滤条件）、入队/丢弃/合并/发送的事件数、
+    队列深度分布、入队到发送的延迟分位数、准入压力等，均为增量维护，代价与连接数无关。
+    逐连接详情见 /stream/stats/connections
+    """
 )
 async def get_sse_stats():
     """获取SSE连接统计."""
     try:
         sse_manager = get_sse_manager()
         stats = await sse_manager.get_stats()
-        api_logger.info("📊 获取SSE统计信息")
+        stats["bridge"] = get_tick_bridge().get_stats()
+        stats["compression_budget"] = get_compression_budget().get_stats()
+        api_logger.debug("📊 获取SSE统计信息")
         return {
             "status": "success",
             "stats": stats,
-            "timestamp": "2025-01-25T09:59:50.945Z"
+            "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
         api_logger.error(f"❌ 获取SSE统计失败: {str(e)}")
         return {
             "status": "error",
             "message": str(e),
-            "timestamp": "2025-01-25T09:59:50.945Z"
-        }
\ No newline at end of file
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+@sources_router.get(
+    "/stream/stats/connections",
+    summary="SSE连接详情",
+    description="分页获取数据流连接详情，可按连接类型、客户端IP、订阅市场与最小积压过滤"
+)
+async def get_sse_connections(
+    offset: int = Query(0, ge=0, description="起始位置"),
+    limit: int = Query(100, ge=1, le=500, description="每页条数"),
+    kind: Optional[str] = Query(None, pattern="^(sse|ws)$", description="连接类型"),
+    client_ip: Optional[str] = Query(None, description="客户端IP"),
+    market: Optional[str] = Query(None, description="订阅的市场（含订阅全部市场的连接）"),
+    min_queue: int = Query(0, ge=0, description="最小待发送事件数，用于查找慢速连接")
+):
+    """分页获取SSE连接详情."""
+    details = get_sse_manager().connection_details(
+        offset=offset, limit=limit, kind=kind, client_ip=client_ip, market=market, min_queue=min_queue)
+    return {
+        "status": "success",
+        **details,
+        "timestamp": datetime.now().isoformat()
+    }
@@ -0,0 +1,105 @@
+"""行情采集进程入口.
+
+发布/订阅部署(broker_enabled)下运行唯一一组数据源与处理管道，经本地Unix套接字向
+所有API工作进程发布行情，轮询需求为各工作进程订阅的并集，上游请求量不随工作进程数增加。
+
+运行: python -m app.ingest
+"""
+
+import asyncio
+import signal
+
+from app.config.settings import get_settings
+from app.services.loop_bridge import LoopBridge
+from app.services.tick_broker import TickBrokerServer
+from app.services.tick_cache import get_tick_cache
+from models.market_data import MarketData
+from models.symbol_registry import get_symbol_registry
+from pipeline.factory import build_default_pipelines, build_default_sources
+from utils.logger_config import setup_market_data_logger
+from utils.scheduler import get_scheduler
+
+market_logger = setup_market_data_logger()
+settings = get_settings()
+
+
+def stop_sources(source_list) -> None:
+    """停止数据源与共享调度器."""
+    for source in source_list:
+        try:
+            source.stop()
+        except Exception as e:
+            market_logger.error(f"❌ 停止数据源失败: {str(e)}")
+    get_scheduler().shutdown()
+
+
+async def run() -> None:
+    """启动数据源与行情发布端，收到退出信号后停止."""
+    market_logger.info("🚀 启动行情采集进程")
+
+    if settings.symbol_registry_file:
+        count = get_symbol_registry().load_json(settings.symbol_registry_file)
+        market_logger.info(f"📋 已加载 {count} 个自选标的: {settings.symbol_registry_file}")
+
+    tick_cache = get_tick_cache()
+    server = TickBrokerServer(settings.broker_socket_path, tick_cache)
+    await server.start()
+
+    # 数据源回调运行在调度器线程中，经桥接在本事件循环中发布
+    bridge = LoopBridge(server.publish_batch, max_backlog=settings.tick_bridge_max_backlog, name="采集发布桥接")
+    bridge.start()
+
+    source_list = build_default_sources(settings.source_worker_mode)
+    pipelines = build_default_pipelines()
+
+    def data_handler(data: MarketData) -> None:
+        try:
+            # 工作进程模式下处理管道已在工作进程中运行
+            if not settings.source_worker_mode:
+                for pipeline in pipelines:
+                    pipeline.process(data)
+            tick_cache.update(data)
+            bridge.submit(data)
+        except Exception as e:
+            market_logger.error(f"❌ 数据处理失败: {str(e)}")
+
+    def pipelines_subscribe(source_id: str, symbol: str, data_type: str) -> bool:
+        return any(pipeline.subscribes(source_id, symbol, data_type) for pipeline in pipelines)
+
+    # 轮询需求: API工作进程订阅、处理管道订阅的并集
+    for source in source_list:
+        source.attach(data_handler)
+        source.demand.linger_seconds = settings.demand_linger_seconds
+        source.demand.warmup_seconds = settings.demand_warmup_seconds
+        source.demand.rest_interest_ttl = settings.demand_rest_ttl_seconds
+        source.demand.add_provider(server.has_subscriber)
+        source.demand.add_provider(pipelines_subscribe)
+
+    get_scheduler().max_workers = settings.scheduler_max_workers
+    for source in source_list:
+        market_logger.info(f"启动数据源: {source.get_source_info().source_name}")
+        source.start()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    market_logger.info("✅ 行情采集进程已就绪")
+    try:
+        await stop_event.wait()
+    finally:
+        market_logger.info("🛑 行情采集进程正在关闭...")
+        # 停止数据源与调度器需要等待线程结束，不能阻塞发布端事件循环
+        await asyncio.to_thread(stop_sources, source_list)
+        await bridge.stop()
+        await server.stop()
+        market_logger.info("✅ 行情采集进程已停止")
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
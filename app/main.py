@@ -3,6 +3,7 @@
 import asyncio
 import uvicorn
 from datetime import datetime
+from typing import List, Optional, Tuple
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
@@ -13,16 +14,23 @@ from fastapi import Request
 from app.config.settings import get_settings
 from app.middleware.cors import setup_cors
 from app.middleware.exception_handler import setup_exception_handlers
-from app.controllers import health_router, sources_router, market_router
+from app.controllers import health_router, sources_router, market_router, latest_router
 from app.services import SourceService, MarketService
 from app.services.sse_manager import get_sse_manager
+from app.services.tick_cache import get_tick_cache
+from app.services.loop_bridge import get_tick_bridge
+from app.services.stream_compression import get_compression_budget
+
+from app.services.tick_broker import TickBrokerClient
 
 # 导入原有的数据源和处理器
-from markt.impl.WenCaiSource import WenCaiSource
-from pipeline.ConsoleLogHandler import ConsoleLogHandler
-from pipeline.KlinkCustomNotifyHandler import KlinkCustomNotifyHandler
+from pipeline.factory import build_default_pipelines, build_default_sources
 from models.market_data import MarketData
+from models.symbol_registry import get_symbol_registry
 from utils.logger_config import setup_market_data_logger, setup_api_logger
+from utils.scheduler import get_scheduler
+from utils.single_flight import get_single_flight
+from wen_cai.async_http import close_async_client
 
 # 设置日志器
 market_logger = setup_market_data_logger()
@@ -31,68 +39,108 @@ api_logger = setup_api_logger()
 # 获取配置
 settings = get_settings()
 
-# 数据源列表
-source_list = [
-    WenCaiSource(),
-]
+# 数据源列表，工作进程模式下每个数据源及其处理管道运行在独立进程中
+# 发布/订阅模式下数据源由采集进程运行，这里的实例只用于REST查询，不启动轮询
+source_list = build_default_sources(settings.source_worker_mode and not settings.broker_enabled)
 
 # 数据分发链
-pipelines = [
-    ConsoleLogHandler(format_type='detailed'),
-    KlinkCustomNotifyHandler(),
-]
+pipelines = build_default_pipelines()
 
 # 服务实例
 source_service = SourceService(source_list)
-market_service = MarketService(source_service)
+get_single_flight().max_workers = settings.upstream_max_workers
+market_service = MarketService(source_service, get_tick_cache(), settings.latest_max_staleness_seconds,
+                               fetch_timeouts=settings.upstream_timeouts,
+                               batch_max_items=settings.latest_batch_max_items)
 
 
 def data_handler(data: MarketData) -> None:
     """数据处理回调函数."""
     try:
-        # 处理原有的数据管道
-        for pipeline in pipelines:
-            pipeline.process(data)
+        # 处理原有的数据管道（工作进程模式下已在工作进程中处理）
+        if not settings.source_worker_mode:
+            for pipeline in pipelines:
+                pipeline.process(data)
         
-        # 广播数据到SSE连接
-        sse_manager = get_sse_manager()
-        try:
-            loop = asyncio.get_running_loop()
-            # 创建任务来广播数据
-            task = asyncio.create_task(sse_manager.broadcast_data(data))
-            market_logger.debug(f"📡 创建SSE广播任务: {data.symbol.value} - {data.price}")
-        except RuntimeError:
-            # 没有运行的事件循环，使用线程池执行
-            import concurrent.futures
-            import threading
-            
-            def run_broadcast():
-                try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(sse_manager.broadcast_data(data))
-                    loop.close()
-                    market_logger.debug(f"📡 后台线程SSE广播完成: {data.symbol.value}")
-                except Exception as e:
-                    market_logger.error(f"SSE广播异常: {str(e)}")
-            
-            # 在后台线程中运行
-            threading.Thread(target=run_broadcast, daemon=True).start()
+        # 更新最新行情缓存，供新连接的快照使用
+        get_tick_cache().update(data)
+        
+        # 交给服务事件循环广播到SSE连接（本回调运行在调度器线程中）
+        get_tick_bridge().submit(data)
 
     except Exception as e:
         market_logger.error(f"❌ 数据处理失败: {str(e)}")
 
 
+def broker_tick_handler(data: MarketData, event_id: Optional[int]) -> None:
+    """发布/订阅模式下处理采集进程发来的行情（在服务事件循环中调用）.
+
+    使用采集进程分配的事件ID广播；连接时的快照行情没有事件ID，只更新缓存。
+    """
+    get_tick_cache().update(data)
+    if event_id is not None:
+        get_sse_manager().publish(data, event_id)
+
+
+def worker_demand_keys() -> List[Tuple[str, str, str]]:
+    """本工作进程的订阅需求: SSE/WebSocket订阅与近期REST访问."""
+    keys = get_sse_manager().subscription_keys()
+    for source in source_list:
+        source_id = source.get_source_info().source_id
+        keys.extend((source_id, symbol, data_type) for symbol, data_type in source.demand.rest_interest_keys())
+    return keys
+
+
+# 发布/订阅模式下的行情订阅端
+broker_client = TickBrokerClient(settings.broker_socket_path, broker_tick_handler, worker_demand_keys)
+
+
+def pipelines_subscribe(source_id: str, symbol: str, data_type: str) -> bool:
+    """检查是否有处理管道消费指定数据."""
+    return any(pipeline.subscribes(source_id, symbol, data_type) for pipeline in pipelines)
+
+
 def init_data_core() -> None:
     """初始化市场数据核心系统."""
     market_logger.info("🚀 初始化市场数据核心系统")
     
+    # 加载自选标的
+    if settings.symbol_registry_file:
+        count = get_symbol_registry().load_json(settings.symbol_registry_file)
+        market_logger.info(f"📋 已加载 {count} 个自选标的: {settings.symbol_registry_file}")
+    
+    sse_manager = get_sse_manager()
+    sse_manager.replay_size = settings.sse_replay_buffer_size
+    sse_manager.idle_timeout = settings.sse_idle_timeout_seconds
+    admission = sse_manager.admission
+    admission.max_connections = settings.stream_max_connections
+    admission.max_per_ip = settings.stream_max_connections_per_ip
+    admission.max_queued_events = settings.stream_max_queued_events
+    admission.policy = settings.stream_overload_policy
+    admission.retry_after = settings.stream_retry_after_seconds
+    get_compression_budget().max_cpu_fraction = settings.sse_compression_max_cpu
+    
+    if settings.broker_enabled:
+        for source in source_list:
+            source.demand.rest_interest_ttl = settings.demand_rest_ttl_seconds
+        market_logger.info(f"✅ 行情由采集进程提供: {settings.broker_socket_path}")
+        return
+    
     # 注册回调
     for source in source_list:
         market_logger.info(f"注册数据源: {source.get_source_info().source_name}")
         source.attach(data_handler)
     
-    # 启动数据源
+    # 注册轮询需求: SSE订阅、处理管道订阅与REST访问的并集
+    for source in source_list:
+        source.demand.linger_seconds = settings.demand_linger_seconds
+        source.demand.warmup_seconds = settings.demand_warmup_seconds
+        source.demand.rest_interest_ttl = settings.demand_rest_ttl_seconds
+        source.demand.add_provider(sse_manager.has_subscriber)
+        source.demand.add_provider(pipelines_subscribe)
+    
+    # 启动数据源，所有定时任务共享同一个调度器
+    get_scheduler().max_workers = settings.scheduler_max_workers
     for source in source_list:
         market_logger.info(f"启动数据源: {source.get_source_info().source_name}")
         source.start()
@@ -100,12 +148,31 @@ def init_data_core() -> None:
     market_logger.info("✅ 市场数据核心系统初始化完成")
 
 
+def shutdown_data_core() -> None:
+    """停止数据源与共享调度器."""
+    if settings.broker_enabled:
+        return
+    for source in source_list:
+        try:
+            source.stop()
+        except Exception as e:
+            market_logger.error(f"❌ 停止数据源失败: {str(e)}")
+    get_scheduler().shutdown()
+    market_logger.info("✅ 市场数据核心系统已停止")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理."""
     # 启动时执行
     try:
+        # 先记录服务事件循环，数据源线程产生的数据经桥接在此循环中广播
+        bridge = get_tick_bridge()
+        bridge.max_backlog = settings.tick_bridge_max_backlog
+        bridge.start(asyncio.get_running_loop())
         init_data_core()
+        if settings.broker_enabled:
+            broker_client.start()
         api_logger.info("🚀 MarketStockMonitor API 服务启动成功")
     except Exception as e:
         api_logger.error(f"❌ 启动失败: {str(e)}")
@@ -116,7 +183,11 @@ async def lifespan(app: FastAPI):
     # 关闭时执行清理工作
     try:
         api_logger.info("🛑 MarketStockMonitor API 服务正在关闭...")
-        # 在这里添加清理逻辑，如停止定时任务、关闭连接等
+        # 停止数据源与调度器需要等待线程结束，不能阻塞服务事件循环
+        await asyncio.to_thread(shutdown_data_core)
+        await get_tick_bridge().stop()
+        await broker_client.stop()
+        await close_async_client()
     except Exception as e:
         api_logger.error(f"❌ 关闭时出现错误: {str(e)}")
 
@@ -151,6 +222,7 @@ def create_app() -> FastAPI:
     app.include_router(health_router)
     app.include_router(sources_router, prefix=settings.api_prefix)
     app.include_router(market_router, prefix=settings.api_prefix)
+    app.include_router(latest_router, prefix=settings.api_prefix)
     
     return app
 
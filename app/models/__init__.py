@@ -10,6 +10,8 @@ __all__ = [
     "SourceInfoResponse",
     "PriceData",
     "LatestPriceResponse",
+    "LatestBatchError",
+    "LatestBatchResponse",
     "TradingHour",
     "TradingHoursResponse",
     "MatchedRule",
@@ -19,4 +21,5 @@ __all__ = [
     
     # 请求模型
     "MarketStatusRequest",
+    "LatestBatchRequest",
 ]
\ No newline at end of file
@@ -1,7 +1,7 @@
 """API请求模型定义."""
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, validator
 
 
@@ -17,4 +17,11 @@ class MarketStatusRequest(BaseModel):
                 datetime.fromisoformat(v.replace('Z', '+00:00'))
             except ValueError:
                 raise ValueError("无效的时间格式，请使用ISO格式，如: 2024-01-15T09:00:00")
-        return v
\ No newline at end of file
+        return v
+
+
+class LatestBatchRequest(BaseModel):
+    """批量最新价格查询请求模型，未指定的维度表示全部."""
+    sources: Optional[List[str]] = Field(None, description="数据源ID列表，为空则查询所有数据源")
+    markets: Optional[List[str]] = Field(None, description="市场代码列表，为空则查询数据源支持的所有市场")
+    data_types: Optional[List[str]] = Field(None, description="数据类型列表，为空则只查询实时行情")
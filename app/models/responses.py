@@ -43,6 +43,24 @@ class LatestPriceResponse(BaseModel):
     market: str = Field(..., description="市场代码")
     data_type: str = Field(..., description="数据类型")
     data: PriceData = Field(..., description="价格数据")
+    cached: bool = Field(False, description="是否来自最新行情缓存")
+    age_seconds: Optional[float] = Field(None, description="缓存数据距最近一次更新的秒数")
+
+
+class LatestBatchError(BaseModel):
+    """批量最新价格中获取失败的条目."""
+    source_id: str = Field(..., description="数据源ID")
+    market: str = Field(..., description="市场代码")
+    data_type: str = Field(..., description="数据类型")
+    detail: str = Field(..., description="错误详情")
+
+
+class LatestBatchResponse(BaseModel):
+    """批量最新价格响应模型."""
+    items: List[LatestPriceResponse] = Field(..., description="最新价格列表")
+    errors: List[LatestBatchError] = Field(default_factory=list, description="获取失败的条目")
+    cached: int = Field(0, description="来自最新行情缓存的条数")
+    fetched: int = Field(0, description="本次请求上游的条数")
 
 
 class TradingHour(BaseModel):
@@ -0,0 +1,113 @@
+"""交易日历类接口的响应缓存.
+
+交易时间表、下一个开盘时间与市场状态只依赖交易规则与当前所处的交易时段，
+渲染后的响应按 (接口, 数据源, 市场, 规则版本) 缓存到规则刷新或交易时段切换为止，
+并提供 ETag / Last-Modified / Cache-Control，客户端重复轮询只需比较请求头。
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Hashable, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+@dataclass
+class RenderedResponse:
+    """已序列化的响应及其缓存元数据."""
+    body: bytes
+    etag: str
+    # 内容最近一次变化的时间 (epoch秒)
+    last_modified: float
+    # 内容可能变化的最早时间 (epoch秒)
+    expires_at: float
+    # 渲染前的模型，需要按请求填写部分字段时在其基础上重新渲染
+    model: Optional[BaseModel] = None
+
+    def max_age(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        return max(0, int(self.expires_at - now))
+
+    def headers(self, now: Optional[float] = None) -> Dict[str, str]:
+        max_age = self.max_age(now)
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={max_age}" if max_age else "no-cache"
+        }
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """条件请求是否命中；同时提供两者时按规范只比较 If-None-Match（弱比较）."""
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+        if if_modified_since:
+            try:
+                return int(self.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def respond(self, if_none_match: Optional[str] = None, if_modified_since: Optional[str] = None,
+                now: Optional[float] = None) -> Response:
+        """条件请求命中时返回 304，否则返回完整响应."""
+        headers = self.headers(now)
+        if self.not_modified(if_none_match, if_modified_since):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class CalendarResponseCache:
+    """按键缓存渲染后的响应，到期或超出容量（最久未使用）时淘汰."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, RenderedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def render(model: BaseModel, last_modified: float, expires_at: float) -> RenderedResponse:
+        body = model.model_dump_json().encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        return RenderedResponse(body, etag, last_modified, expires_at, model)
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[RenderedResponse]:
+        now = time.time() if now is None else now
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, model: BaseModel, last_modified: float, expires_at: float) -> RenderedResponse:
+        entry = self.render(model, last_modified, expires_at)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses}
+
+
+# 全局交易日历响应缓存实例
+_calendar_cache = None
+
+
+def get_calendar_cache() -> CalendarResponseCache:
+    """获取交易日历响应缓存实例."""
+    global _calendar_cache
+    if _calendar_cache is None:
+        _calendar_cache = CalendarResponseCache()
+    return _calendar_cache
@@ -0,0 +1,156 @@
+"""线程到事件循环的数据桥接.
+
+数据源回调运行在调度器线程中，而SSE连接队列属于服务事件循环，
+只能在该循环中操作。桥接器在启动时记录服务事件循环，生产者线程只把数据
+放入有界积压队列，并通过 call_soon_threadsafe 唤醒唯一的消费任务，
+由消费任务在事件循环中分批投递。
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.sse_manager import get_sse_manager
+from utils.logger_config import setup_api_logger
+
+api_logger = setup_api_logger()
+
+
+class LoopBridge:
+    """把任意线程产生的数据分批交给事件循环中的消费函数.
+
+    积压超过上限时丢弃最旧的数据；事件循环启动前产生的数据同样暂存在积压队列中。
+    """
+
+    def __init__(self, consumer: Callable[[List[Any]], None], max_backlog: int = 10000,
+                 batch_size: int = 256, name: str = "loop-bridge"):
+        self.consumer = consumer
+        self.max_backlog = max_backlog
+        self.batch_size = batch_size
+        self.name = name
+        # (入队时间, 数据)
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup_scheduled = False
+
+        self.submitted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """在服务事件循环中启动消费任务."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+        if self._pending:
+            self._ready.set()
+        api_logger.info(f"🌉 {self.name} 已启动，积压上限 {self.max_backlog}")
+
+    async def stop(self) -> None:
+        """停止消费任务."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._loop = None
+        self._wakeup_scheduled = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def submit(self, item: Any) -> None:
+        """投递数据，可在任意线程中调用，不阻塞."""
+        with self._lock:
+            if len(self._pending) >= self.max_backlog:
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append((time.perf_counter(), item))
+            self.submitted += 1
+            if self._wakeup_scheduled or self._loop is None:
+                return
+            self._wakeup_scheduled = True
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # 事件循环已关闭
+            self._wakeup_scheduled = False
+
+    def _take_batch(self) -> List[Any]:
+        with self._lock:
+            count = min(len(self._pending), self.batch_size)
+            batch = [self._pending.popleft() for _ in range(count)]
+        if batch:
+            latency = time.perf_counter() - batch[0][0]
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+        return [item for _, item in batch]
+
+    async def _run(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            # 先复位唤醒标记再取数据，之后入队的数据会再次唤醒
+            with self._lock:
+                self._wakeup_scheduled = False
+
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    break
+                try:
+                    self.consumer(batch)
+                except Exception as e:
+                    api_logger.error(f"❌ {self.name} 投递失败: {str(e)}")
+                self.delivered += len(batch)
+                self.batches += 1
+                self.max_batch = max(self.max_batch, len(batch))
+                # 批次之间让出事件循环，避免积压时阻塞请求处理
+                await asyncio.sleep(0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "backlog": len(self._pending),
+            "max_backlog": self.max_backlog,
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "last_latency_ms": round(self.last_latency * 1000, 3),
+            "max_latency_ms": round(self.max_latency * 1000, 3)
+        }
+
+
+def _publish_batch(batch: List[Any]) -> None:
+    sse_manager = get_sse_manager()
+    for data in batch:
+        sse_manager.publish(data)
+
+
+# 全局行情桥接实例
+_tick_bridge = None
+
+
+def get_tick_bridge() -> LoopBridge:
+    """获取行情数据到SSE广播的桥接实例."""
+    global _tick_bridge
+    if _tick_bridge is None:
+        _tick_bridge = LoopBridge(_publish_batch, name="行情桥接")
+    return _tick_bridge
@@ -1,14 +1,19 @@
 """市场数据服务层."""
 
-from datetime import datetime
-from typing import Optional
-from models.market_data import MarketSymbol, MarketDataType
+import asyncio
+import time
+from datetime import datetime, tzinfo
+from typing import Dict, List, Optional, Tuple
+from models.market_data import MarketSymbol, MarketDataType, TickRecord
+from app.services.calendar_cache import CalendarResponseCache, RenderedResponse, get_calendar_cache
+from app.services.tick_cache import TickCache, get_tick_cache
 from app.models.responses import (
-    LatestPriceResponse, PriceData, TradingHoursResponse, TradingHour,
+    LatestPriceResponse, LatestBatchError, LatestBatchResponse, PriceData, TradingHoursResponse, TradingHour,
     MarketStatusResponse, MarketStatusInfo, MatchedRule, NextOpeningTimeResponse
 )
-from app.utils.exceptions import DataFetchError
+from app.utils.exceptions import DataFetchError, InvalidParameterError
 from utils.logger_config import setup_logger
+from utils.single_flight import SingleFlight, get_single_flight
 
 logger = setup_logger('market_service')
 
@@ -16,55 +21,202 @@ logger = setup_logger('market_service')
 class MarketService:
     """市场数据服务类."""
     
-    def __init__(self, source_service):
+    def __init__(self, source_service, tick_cache: Optional[TickCache] = None,
+                 max_staleness: Optional[Dict[str, float]] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 fetch_timeouts: Optional[Dict[str, float]] = None,
+                 batch_max_items: int = 200,
+                 calendar_cache: Optional[CalendarResponseCache] = None):
         """初始化市场数据服务.
         
         Args:
             source_service: 数据源服务实例
+            tick_cache: 由行情回调更新的最新行情缓存
+            max_staleness: 数据类型 -> 缓存数据可直接返回的最长时间(秒)，未配置的类型不使用缓存
+            single_flight: 合并相同的并发上游请求
+            fetch_timeouts: 请求类别(latest/latest_batch/trading_hours/next_opening_time) -> 等待上游的最长时间(秒)
+            batch_max_items: 批量最新价格单次请求的条目数上限
+            calendar_cache: 交易日历类接口的响应缓存
         """
         self.source_service = source_service
+        self.tick_cache = tick_cache if tick_cache is not None else get_tick_cache()
+        self.max_staleness: Dict[str, float] = max_staleness or {}
+        self.single_flight = single_flight if single_flight is not None else get_single_flight()
+        self.fetch_timeouts: Dict[str, float] = fetch_timeouts or {}
+        self.batch_max_items = batch_max_items
+        self.calendar_cache = calendar_cache if calendar_cache is not None else get_calendar_cache()
+        # (数据源, 市场) -> 市场时区，缓存的市场状态按请求时间填写市场时间
+        self._market_timezones: Dict[Tuple[str, str], tzinfo] = {}
+        self.cache_hits = 0
+        self.upstream_fetches = 0
         logger.info("初始化市场数据服务")
     
-    def get_latest_price(self, source_id: str, market: MarketSymbol, 
-                        data_type: MarketDataType) -> LatestPriceResponse:
+    async def get_latest_price(self, source_id: str, market: MarketSymbol, 
+                               data_type: MarketDataType) -> LatestPriceResponse:
         """获取最新价格数据."""
         logger.info(f"获取最新价格: {source_id}/{market.value}/{data_type.value}")
         
         try:
             source = self.source_service.get_source_by_id(source_id)
-            latest_data = source.get_latest_data(market, data_type)
+            # 记录REST访问需求，使数据源在有效期内持续轮询该标的
+            source.demand.touch(market, data_type)
             
-            logger.info(f"成功获取 {market.value} 最新价格: {latest_data.price}")
+            cached = await self._cached_latest(source, source_id, market, data_type)
+            if cached is not None:
+                record, age = cached
+                self.cache_hits += 1
+                logger.debug(f"命中最新行情缓存: {market.value}/{data_type.value} ({age:.1f}秒前)")
+                return self._cached_response(source_id, market, data_type, record, age)
             
-            # 安全处理时间字段
-            time_str = latest_data.time.isoformat() if hasattr(latest_data.time, 'isoformat') else str(latest_data.time)
+            self.upstream_fetches += 1
+            latest_data = await self._fetch(
+                "latest", (source_id, market.value, data_type.value),
+                lambda: source.get_latest_data_async(market, data_type))
             
-            return LatestPriceResponse(
-                source_id=source_id,
-                market=market.value,
-                data_type=data_type.value,
-                data=PriceData(
-                    name=getattr(latest_data, 'name', f"{market.value}"),
-                    time=time_str,
-                    price=getattr(latest_data, 'price', 0.0),
-                    volume=getattr(latest_data, 'volume', None),
-                    change=getattr(latest_data, 'change', None),
-                    change_percent=getattr(latest_data, 'change_percent', None)
-                )
-            )
+            logger.info(f"成功获取 {market.value} 最新价格: {latest_data.price}")
+            return self._latest_response(source_id, market, data_type, latest_data)
         except Exception as e:
             logger.error(f"获取最新价格失败: {str(e)}")
             import traceback
             logger.error(f"详细错误信息: {traceback.format_exc()}")
             raise DataFetchError(f"获取最新价格失败: {str(e)}")
     
-    def get_trading_hours(self, source_id: str, market: MarketSymbol) -> TradingHoursResponse:
+    async def get_latest_batch(self, source_ids: Optional[List[str]], markets: Optional[List[MarketSymbol]],
+                               data_types: List[MarketDataType]) -> LatestBatchResponse:
+        """批量获取最新价格: 优先使用缓存，未命中的条目按数据源合并为一次上游请求并发获取.
+        
+        Args:
+            source_ids: 数据源ID列表，为空则查询所有数据源
+            markets: 市场列表，为空则查询数据源支持的所有市场；数据源不支持的市场被忽略
+            data_types: 数据类型列表
+        """
+        sources = ([self.source_service.get_source_by_id(source_id) for source_id in dict.fromkeys(source_ids)]
+                   if source_ids else self.source_service.source_list)
+        
+        plan = []
+        for source in sources:
+            info = source.get_source_info()
+            supported = info.supported_markets
+            targets = [market for market in dict.fromkeys(markets) if market in supported] if markets else supported
+            plan.append((source, info, targets))
+        total = sum(len(targets) for _, _, targets in plan) * len(data_types)
+        if total > self.batch_max_items:
+            raise InvalidParameterError(f"单次最多查询 {self.batch_max_items} 条，当前 {total} 条，请缩小查询范围")
+        
+        items: List[LatestPriceResponse] = []
+        misses = []
+        for source, info, targets in plan:
+            keys = []
+            for market in targets:
+                for data_type in data_types:
+                    source.demand.touch(market, data_type)
+                    cached = await self._cached_latest(source, info.source_id, market, data_type)
+                    if cached is None:
+                        keys.append((market, data_type))
+                    else:
+                        items.append(self._cached_response(info.source_id, market, data_type, *cached))
+            if keys:
+                misses.append((source, info.source_id, keys))
+        
+        cached_count = len(items)
+        self.cache_hits += cached_count
+        errors: List[LatestBatchError] = []
+        for fetched, failed in await asyncio.gather(*(self._fetch_latest_batch(*miss) for miss in misses)):
+            items.extend(fetched)
+            errors.extend(failed)
+        
+        fetched_count = sum(len(keys) for _, _, keys in misses)
+        logger.info(f"批量获取最新价格: {len(items)} 条 (缓存 {cached_count}，上游 {fetched_count}，失败 {len(errors)})")
+        return LatestBatchResponse(items=items, errors=errors, cached=cached_count, fetched=fetched_count)
+    
+    async def _fetch_latest_batch(self, source, source_id: str, keys: List[Tuple[MarketSymbol, MarketDataType]]):
+        """请求一个数据源的多条最新数据，单条失败不影响其他条目."""
+        self.upstream_fetches += len(keys)
+        flight_key = (source_id,) + tuple(sorted((market.value, data_type.value) for market, data_type in keys))
+        try:
+            results = await self._fetch("latest_batch", flight_key, lambda: source.get_latest_batch_async(keys))
+        except Exception as e:
+            logger.error(f"批量获取 {source_id} 最新价格失败: {str(e)}")
+            results = {key: e for key in keys}
+        
+        items, errors = [], []
+        for market, data_type in keys:
+            result = results.get((market, data_type))
+            if result is None or isinstance(result, Exception):
+                errors.append(LatestBatchError(source_id=source_id, market=market.value, data_type=data_type.value,
+                                               detail=str(result) if result is not None else "未获取到数据"))
+            else:
+                items.append(self._latest_response(source_id, market, data_type, result))
+        return items, errors
+    
+    async def _fetch(self, kind: str, key: tuple, func):
+        """经 single-flight 请求上游，相同的并发请求共享一次调用."""
+        return await self.single_flight.do_async((kind,) + key, func, self.fetch_timeouts.get(kind))
+    
+    async def _cached_latest(self, source, source_id: str, market: MarketSymbol, data_type: MarketDataType):
+        """可直接返回的缓存行情及其年龄: 足够新，或已休市（价格不再变化）."""
+        max_staleness = self.max_staleness.get(data_type.value)
+        if max_staleness is None:
+            return None
+        cached = self.tick_cache.get_with_age(source_id, market.value, data_type.value)
+        if cached is None:
+            return None
+        if cached[1] <= max_staleness:
+            return cached
+        try:
+            is_open = (await source.get_market_status_async(datetime.now(), market)).is_open
+        except Exception as e:
+            logger.warning(f"获取 {market.value} 市场状态失败，按开市处理: {str(e)}")
+            return None
+        return None if is_open else cached
+    
+    @staticmethod
+    def _latest_response(source_id: str, market: MarketSymbol, data_type: MarketDataType,
+                         latest_data) -> LatestPriceResponse:
+        # 安全处理时间字段
+        time_str = latest_data.time.isoformat() if hasattr(latest_data.time, 'isoformat') else str(latest_data.time)
+        
+        return LatestPriceResponse(
+            source_id=source_id,
+            market=market.value,
+            data_type=data_type.value,
+            data=PriceData(
+                name=getattr(latest_data, 'name', f"{market.value}"),
+                time=time_str,
+                price=getattr(latest_data, 'price', 0.0),
+                volume=getattr(latest_data, 'volume', None),
+                change=getattr(latest_data, 'change', None),
+                change_percent=getattr(latest_data, 'change_percent', None)
+            )
+        )
+    
+    @staticmethod
+    def _cached_response(source_id: str, market: MarketSymbol, data_type: MarketDataType,
+                         record: TickRecord, age: float) -> LatestPriceResponse:
+        return LatestPriceResponse(
+            source_id=source_id,
+            market=market.value,
+            data_type=data_type.value,
+            data=PriceData(
+                name=market.value,
+                time=record.timestamp.isoformat(),
+                price=record.price,
+                volume=record.volume,
+                change=record.change,
+                change_percent=record.change_percent
+            ),
+            cached=True,
+            age_seconds=round(age, 3)
+        )
+    
+    async def get_trading_hours(self, source_id: str, market: MarketSymbol) -> TradingHoursResponse:
         """获取交易时间表."""
         logger.info(f"获取交易时间表: {source_id}/{market.value}")
         
         try:
             source = self.source_service.get_source_by_id(source_id)
-            trading_hours = source.get_trading_hours(market)
+            trading_hours = await self._fetch(
+                "trading_hours", (source_id, market.value), lambda: source.get_trading_hours_async(market))
             
             logger.info(f"成功获取 {market.value} 交易时间表: {len(trading_hours)} 条记录")
             
@@ -84,8 +236,8 @@ class MarketService:
             logger.error(f"获取交易时间表失败: {str(e)}")
             raise DataFetchError(f"获取交易时间表失败: {str(e)}")
     
-    def get_market_status(self, source_id: str, market: MarketSymbol, 
-                         check_time: Optional[datetime] = None) -> MarketStatusResponse:
+    async def get_market_status(self, source_id: str, market: MarketSymbol, 
+                                check_time: Optional[datetime] = None) -> MarketStatusResponse:
         """获取市场状态."""
         if check_time is None:
             check_time = datetime.now()
@@ -95,7 +247,9 @@ class MarketService:
         
         try:
             source = self.source_service.get_source_by_id(source_id)
-            status_info = source.get_market_status(check_time, market)
+            status_info = await source.get_market_status_async(check_time, market)
+            if status_info.market_time is not None and status_info.market_time.tzinfo is not None:
+                self._market_timezones[(source_id, market.value)] = status_info.market_time.tzinfo
             
             status_emoji = "🟢" if status_info.is_open else "🔴"
             logger.info(f"成功获取 {market.value} 市场状态: {status_emoji} {status_info.status_text}")
@@ -120,13 +274,14 @@ class MarketService:
             logger.error(f"获取市场状态失败: {str(e)}")
             raise DataFetchError(f"获取市场状态失败: {str(e)}")
     
-    def get_next_opening_time(self, source_id: str, market: MarketSymbol) -> NextOpeningTimeResponse:
+    async def get_next_opening_time(self, source_id: str, market: MarketSymbol) -> NextOpeningTimeResponse:
         """获取下一个开盘时间."""
         logger.info(f"获取下一个开盘时间: {source_id}/{market.value}")
         
         try:
             source = self.source_service.get_source_by_id(source_id)
-            next_opening_time = source.get_next_opening_time(market)
+            next_opening_time = await self._fetch(
+                "next_opening_time", (source_id, market.value), lambda: source.get_next_opening_time_async(market))
             
             logger.info(f"成功获取 {market.value} 下一个开盘时间: {next_opening_time.date_pattern} {next_opening_time.start_time} - {next_opening_time.end_time}")
             
@@ -140,4 +295,69 @@ class MarketService:
             )
         except Exception as e:
             logger.error(f"获取下一个开盘时间失败: {str(e)}")
-            raise DataFetchError(f"获取下一个开盘时间失败: {str(e)}")
\ No newline at end of file
+            raise DataFetchError(f"获取下一个开盘时间失败: {str(e)}")
+    
+    async def get_calendar_response(self, kind: str, source_id: str, market: MarketSymbol) -> RenderedResponse:
+        """交易日历类接口的渲染结果，规则版本未变且未到期时直接返回缓存.
+        
+        Args:
+            kind: trading_hours / next_opening_time / market_status
+        
+        交易时间表缓存到规则下次刷新；下一个开盘时间与市场状态还依赖当前时间，
+        缓存到市场状态下一次可能变化的时间为止。市场状态只缓存状态部分，检查时间与市场时间
+        按每次请求的当前时间填写。数据源不提供规则版本或状态变化时间时不缓存。
+        """
+        render = {
+            "trading_hours": self.get_trading_hours,
+            "next_opening_time": self.get_next_opening_time,
+            "market_status": self.get_market_status
+        }[kind]
+        source = self.source_service.get_source_by_id(source_id)
+        try:
+            version = await source.get_rules_version_async(market)
+        except Exception as e:
+            logger.warning(f"获取 {market.value} 交易规则版本失败，不使用缓存: {str(e)}")
+            version = None
+        
+        key = (kind, source_id, market.value, version.version if version else None)
+        if version is not None:
+            cached = self.calendar_cache.get(key)
+            if cached is not None:
+                return self._market_status_response(source_id, market, cached) if kind == "market_status" else cached
+        
+        model = await render(source_id, market)
+        now = time.time()
+        if version is None:
+            return self.calendar_cache.render(model, now, now)
+        
+        last_modified, expires_at = version.modified, version.refresh_at
+        if kind != "trading_hours":
+            last_modified = now
+            try:
+                change = await source.get_next_status_change_async(market)
+            except Exception as e:
+                logger.warning(f"获取 {market.value} 市场状态变化时间失败，不使用缓存: {str(e)}")
+                change = None
+            expires_at = min(expires_at, change.timestamp()) if change is not None else now
+        if expires_at <= now:
+            return self.calendar_cache.render(model, last_modified, now)
+        if kind == "market_status":
+            status = self.calendar_cache.put(key, model.status.model_copy(update={"market_time": None}),
+                                             last_modified, expires_at)
+            return self._market_status_response(source_id, market, status)
+        return self.calendar_cache.put(key, model, last_modified, expires_at)
+    
+    def _market_status_response(self, source_id: str, market: MarketSymbol,
+                                status: RenderedResponse) -> RenderedResponse:
+        """以缓存的状态部分与当前时间组装市场状态响应，ETag 只反映状态部分，为弱校验值."""
+        timezone = self._market_timezones.get((source_id, market.value))
+        model = MarketStatusResponse(
+            source_id=source_id,
+            market=market.value,
+            check_time=datetime.now().isoformat(),
+            status=status.model.model_copy(update={
+                "market_time": datetime.now(timezone).isoformat() if timezone is not None else None
+            })
+        )
+        return RenderedResponse(model.model_dump_json().encode(), f"W/{status.etag}", status.last_modified,
+                                status.expires_at, model)
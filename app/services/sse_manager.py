@@ -1,15 +1,71 @@
 """SSE数据广播管理器 - 优化版本."""
 
+import heapq
 import json
+import time
 import asyncio
-from typing import Dict, List, Set, Optional, Any
+from collections import deque
+from itertools import islice, product
+from typing import Dict, Iterator, List, Set, Optional, Any, Tuple, Union
 from dataclasses import dataclass
-from datetime import datetime
-from models.market_data import MarketData, MarketSymbol, MarketDataType
+from datetime import datetime, timedelta
+from models.market_data import MarketData, MarketSymbol, MarketDataType, to_epoch_ms
+from app.services.sse_queues import ConflatingEventQueue, FifoEventQueue, QueuedEventCounter
+from app.services.stream_admission import AdmissionController
+from app.services.stream_stats import StreamStats
+from app.services.timing_wheel import TimingWheel
 from utils.logger_config import setup_api_logger
 
 api_logger = setup_api_logger()
 
+# 订阅索引中表示“全部”的通配符
+WILDCARD = "*"
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """编码为可直接发送的SSE帧."""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"event: {event}\n{id_line}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+def market_data_payload(data: MarketData) -> Dict[str, Any]:
+    """构造行情事件的数据体."""
+    return {
+        "event": "market_data",
+        "source": data.source,
+        "symbol": data.symbol.value,
+        "type": data.type.value,
+        "price": data.price,
+        "timestamp": data.timestamp.isoformat(),
+        "volume": data.volume,
+        "open_price": data.open_price,
+        "high_price": data.high_price,
+        "low_price": data.low_price,
+        "close_price": data.close_price,
+        "change": data.change,
+        "change_percent": data.change_percent
+    }
+
+
+class SSEEvent:
+    """广播事件，SSE帧只编码一次并被所有订阅连接共享."""
+    __slots__ = ('event_id', 'event', 'key', 'ts_ms', 'payload', 'frame', 'packed', 'published_at')
+    
+    def __init__(self, event_id: int, event: str, payload: Dict[str, Any],
+                 key: Optional[Tuple[str, str, str]] = None, ts_ms: Optional[int] = None):
+        self.event_id = event_id
+        self.event = event
+        # (数据源, 市场, 数据类型)，用于按键合并
+        self.key = key
+        # 行情时间的毫秒时间戳，供二进制与紧凑格式使用
+        self.ts_ms = ts_ms
+        self.payload = payload
+        self.frame = format_sse(event, payload, event_id)
+        # WebSocket二进制记录，首次需要时编码一次并共享
+        self.packed: Optional[bytes] = None
+        # 发布时的单调时钟秒数，用于统计入队到发送的延迟
+        self.published_at = time.monotonic()
+
 
 @dataclass
 class SSEFilter:
@@ -20,55 +76,132 @@ class SSEFilter:
     
     def matches(self, data: MarketData) -> bool:
         """检查数据是否匹配过滤条件."""
+        return self.accepts(data.source, data.symbol.value, data.type.value)
+    
+    def accepts(self, source_id: str, market: str, data_type: str) -> bool:
+        """检查数据源/市场/数据类型组合是否匹配过滤条件."""
         # 检查数据源
-        if self.source_ids and data.source not in self.source_ids:
+        if self.source_ids and source_id not in self.source_ids:
             return False
         
-        # 检查市场（转换为字符串比较）
-        if self.markets and data.symbol.value not in self.markets:
+        # 检查市场（字符串比较）
+        if self.markets and market not in self.markets:
             return False
         
-        # 检查数据类型（转换为字符串比较）
-        if self.data_types and data.type.value not in self.data_types:
+        # 检查数据类型（字符串比较）
+        if self.data_types and data_type not in self.data_types:
             return False
         
         return True
+    
+    def index_keys(self) -> Iterator[Tuple[str, str, str]]:
+        """生成订阅索引键，未过滤的维度使用通配符."""
+        return product(
+            self.source_ids or (WILDCARD,),
+            self.markets or (WILDCARD,),
+            self.data_types or (WILDCARD,)
+        )
+    
+    def label(self) -> str:
+        """用于按过滤条件分组统计的标签: 数据源|市场|数据类型."""
+        return "|".join(
+            ",".join(sorted(values)) if values else WILDCARD
+            for values in (self.source_ids, self.markets, self.data_types)
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source_ids": list(self.source_ids) if self.source_ids else None,
+            "markets": list(self.markets) if self.markets else None,
+            "data_types": list(self.data_types) if self.data_types else None
+        }
+
+
+class SubscriptionSet:
+    """按 (数据源, 市场, 数据类型) 逐项订阅的过滤条件，任一维度可为通配符.
+    
+    与 SSEFilter 接口一致，可直接用于订阅索引；不可变，增删订阅返回新实例。
+    """
+    
+    def __init__(self, keys=()):
+        self.keys: frozenset = frozenset(keys)
+    
+    def matches(self, data: MarketData) -> bool:
+        return self.accepts(data.source, data.symbol.value, data.type.value)
+    
+    def accepts(self, source_id: str, market: str, data_type: str) -> bool:
+        return any(
+            key in self.keys
+            for key in product((source_id, WILDCARD), (market, WILDCARD), (data_type, WILDCARD))
+        )
+    
+    def index_keys(self) -> Iterator[Tuple[str, str, str]]:
+        return iter(self.keys)
+    
+    def with_keys(self, keys) -> 'SubscriptionSet':
+        return SubscriptionSet(self.keys.union(keys))
+    
+    def without_keys(self, keys) -> 'SubscriptionSet':
+        return SubscriptionSet(self.keys.difference(keys))
+    
+    def label(self) -> str:
+        return ";".join("|".join(key) for key in sorted(self.keys))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"subscriptions": [list(key) for key in sorted(self.keys)]}
+
+
+# 连接可使用的过滤条件，须提供 accepts / index_keys / label / to_dict。
+# index_keys() 生成的键可以互相重叠（同一条数据命中多个键），订阅索引按连接去重，
+# 新增的过滤条件类型无需保证各键互不重叠
+StreamFilter = Union[SSEFilter, SubscriptionSet]
 
 
 class SSEConnection:
     """SSE连接管理."""
     
-    def __init__(self, connection_id: str, filter_config: SSEFilter, queue_size: int = 100):
+    def __init__(self, connection_id: str, filter_config: StreamFilter, queue_size: int = 100,
+                 conflate: bool = False, client_ip: Optional[str] = None,
+                 counter: Optional[QueuedEventCounter] = None, kind: str = "sse"):
         self.connection_id = connection_id
         self.filter_config = filter_config
-        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.client_ip = client_ip
+        # 连接类型: sse / ws
+        self.kind = kind
+        # 合并模式下每个(数据源, 市场, 类型)只保留最新的待发送事件
+        self.conflate = conflate
+        queue_class = ConflatingEventQueue if conflate else FifoEventQueue
+        self.queue = queue_class(queue_size, counter)
         self.connected = True
         self.created_at = datetime.now()
-        self.last_activity = datetime.now()
+        # 单调时钟秒数，入队时只写一个浮点数
+        self.last_activity = time.monotonic()
         self.data_count = 0
+        # 投递任务中的限速器、紧凑格式编码器与压缩器，用于统计
+        self.throttle = None
+        self.codec = None
+        self.compressor = None
         
-    async def send_data(self, data: Dict[str, Any]) -> bool:
-        """发送数据到连接队列."""
+    def enqueue(self, data: SSEEvent) -> bool:
+        """非阻塞地将事件放入连接队列，队列满时丢弃最旧的数据."""
         if not self.connected:
             return False
         
         try:
-            # 非阻塞发送，如果队列满了就丢弃旧数据
-            if self.queue.full():
-                try:
-                    self.queue.get_nowait()  # 移除最旧的数据
-                except asyncio.QueueEmpty:
-                    pass
-            
-            await self.queue.put(data)
-            self.last_activity = datetime.now()
+            # FIFO队列满时丢弃最旧的数据，合并队列覆盖同键的待发送事件
+            self.queue.put_nowait(data, data.key)
+            self.last_activity = time.monotonic()
             self.data_count += 1
             return True
         except Exception as e:
             api_logger.error(f"❌ SSE连接 {self.connection_id} 发送数据失败: {str(e)}")
             return False
     
-    async def get_data(self) -> Optional[Dict[str, Any]]:
+    async def send_data(self, data: SSEEvent) -> bool:
+        """发送事件到连接队列."""
+        return self.enqueue(data)
+    
+    async def get_data(self) -> Optional[SSEEvent]:
         """从队列获取数据 - 支持长时间等待."""
         try:
             # 等待更长时间，支持实时推送
@@ -86,9 +219,25 @@ class SSEConnection:
 class SSEManager:
     """SSE数据广播管理器."""
     
-    def __init__(self):
+    def __init__(self, replay_size: int = 1000, idle_timeout: float = 300.0, tick_seconds: float = 1.0):
         self.connections: Dict[str, SSEConnection] = {}
+        # 订阅索引: (数据源, 市场, 数据类型) -> 订阅连接，未过滤的维度为通配符；
+        # 同一连接可位于多个键下，查询时由 subscribers 去重
+        self._index: Dict[Tuple[str, str, str], Set[SSEConnection]] = {}
         self.connection_counter = 0
+        # 事件ID从启动时的毫秒时间戳开始单调递增，服务重启后旧ID不会与新事件混淆
+        self.event_counter = int(time.time() * 1000)
+        # 重放缓冲区: 最近的行情事件，ID连续，供断线重连的客户端补发
+        self._replay: deque = deque(maxlen=replay_size)
+        # 空闲超时: 时间轮按到期时间调度连接，每次推进只处理到期的连接
+        self.idle_timeout = idle_timeout
+        self.tick_seconds = tick_seconds
+        self._idle_wheel = TimingWheel(tick_seconds, now=time.monotonic())
+        self.idle_evicted = 0
+        # 准入控制: 连接数上限与待发送事件的内存预算
+        self.admission = AdmissionController()
+        # 聚合统计，与连接队列共享计数
+        self.stats = StreamStats(self.admission.counter)
         self._cleanup_task = None
         self._initialized = False
     
@@ -107,39 +256,90 @@ class SSEManager:
                 pass
     
     async def _cleanup_connections(self):
-        """定期清理断开的连接."""
+        """按时间轮推进，断开空闲超时的连接."""
         while True:
             try:
-                await asyncio.sleep(30)  # 每30秒清理一次
-                
-                disconnected = []
-                for conn_id, conn in self.connections.items():
-                    if not conn.connected:
-                        disconnected.append(conn_id)
-                    elif (datetime.now() - conn.last_activity).seconds > 300:  # 5分钟无活动
-                        api_logger.warning(f"⚠️ SSE连接 {conn_id} 超时，自动断开")
-                        conn.disconnect()
-                        disconnected.append(conn_id)
-                
-                for conn_id in disconnected:
-                    self.connections.pop(conn_id, None)
-                    api_logger.info(f"🗑️ 清理SSE连接: {conn_id}")
-                
-                if disconnected:
-                    api_logger.info(f"📊 当前活跃SSE连接数: {len(self.connections)}")
-                    
+                await asyncio.sleep(self.tick_seconds)
+                self.expire_idle(time.monotonic())
+                self.enforce_memory_budget()
             except Exception as e:
                 api_logger.error(f"❌ SSE连接清理异常: {str(e)}")
     
-    def create_connection(self, filter_config: SSEFilter) -> str:
-        """创建新的SSE连接."""
+    def expire_idle(self, now: float) -> int:
+        """断开空闲超过 idle_timeout 的连接，返回断开的连接数.
+        
+        入队只更新 last_activity，不重新调度；到期时若期间有活动则按最后活动时间
+        重新调度，每个连接每个超时周期至多被访问一次。
+        """
+        evicted = 0
+        for connection_id in self._idle_wheel.advance(now):
+            connection = self.connections.get(connection_id)
+            if connection is None:
+                continue
+            deadline = connection.last_activity + self.idle_timeout
+            if deadline > now:
+                self._idle_wheel.schedule(connection_id, deadline)
+                continue
+            api_logger.warning(f"⚠️ SSE连接 {connection_id} 超时，自动断开")
+            self.disconnect_connection(connection_id)
+            evicted += 1
+        
+        if evicted:
+            self.idle_evicted += evicted
+            api_logger.info(f"📊 当前活跃SSE连接数: {len(self.connections)}")
+        return evicted
+    
+    def enforce_memory_budget(self) -> int:
+        """evict 策略下待发送事件超出内存预算时断开积压最多的连接，返回断开的连接数."""
+        admission = self.admission
+        excess = admission.counter.queued - admission.max_queued_events
+        if admission.policy != "evict" or excess <= 0:
+            return 0
+        evicted = 0
+        for connection in self.slowest_connections(len(self.connections)):
+            if excess <= 0:
+                break
+            excess -= connection.queue.qsize()
+            self._evict(connection, "待发送事件超出内存预算")
+            evicted += 1
+        return evicted
+    
+    def slowest_connections(self, count: int) -> List[SSEConnection]:
+        """积压最多的连接（按待发送事件数、丢弃数排序）."""
+        return heapq.nlargest(count, self.connections.values(),
+                              key=lambda conn: (conn.queue.qsize(), getattr(conn.queue, 'dropped', 0)))
+    
+    def _evict(self, connection: SSEConnection, reason: str) -> None:
+        api_logger.warning(f"⚠️ 断开慢速SSE连接 {connection.connection_id}: {reason}，"
+                           f"积压 {connection.queue.qsize()} 条")
+        self.admission.evicted += 1
+        self.disconnect_connection(connection.connection_id)
+    
+    def create_connection(self, filter_config: StreamFilter, conflate: bool = False,
+                          queue_size: int = 100, prefix: str = "sse",
+                          client_ip: Optional[str] = None) -> str:
+        """创建新的SSE连接.
+        
+        超出连接数或内存预算且策略为拒绝时抛出 AdmissionRejected；
+        conflate 策略下可能降级为合并模式，以连接的 conflate 属性为准。
+        """
         self._ensure_cleanup_task()
         
+        conflate, evict = self.admission.admit(client_ip, conflate, len(self.connections))
+        if evict:
+            for connection in self.slowest_connections(evict):
+                self._evict(connection, "连接数或内存超出上限")
+        
         self.connection_counter += 1
-        connection_id = f"sse_{self.connection_counter}_{int(datetime.now().timestamp())}"
+        connection_id = f"{prefix}_{self.connection_counter}_{int(datetime.now().timestamp())}"
         
-        connection = SSEConnection(connection_id, filter_config)
+        connection = SSEConnection(connection_id, filter_config, queue_size, conflate=conflate,
+                                   client_ip=client_ip, counter=self.admission.counter, kind=prefix)
         self.connections[connection_id] = connection
+        self.admission.register(client_ip)
+        self.stats.connection_opened(prefix, filter_config.label())
+        self._index_add(connection)
+        self._idle_wheel.schedule(connection_id, connection.last_activity + self.idle_timeout)
         
         api_logger.info(f"🔗 创建SSE连接: {connection_id}")
         api_logger.info(f"📊 当前SSE连接数: {len(self.connections)}")
@@ -151,72 +351,189 @@ class SSEManager:
         return self.connections.get(connection_id)
     
     def disconnect_connection(self, connection_id: str):
-        """断开指定连接."""
-        if connection_id in self.connections:
-            self.connections[connection_id].disconnect()
-            api_logger.info(f"❌ 断开SSE连接: {connection_id}")
+        """断开并立即移除指定连接."""
+        connection = self.connections.pop(connection_id, None)
+        if connection is None:
+            return
+        connection.disconnect()
+        # 立即释放待发送事件占用的内存预算
+        connection.queue.close()
+        self.stats.connection_closed(connection.kind, connection.filter_config.label())
+        self._index_remove(connection)
+        self._idle_wheel.cancel(connection_id)
+        self.admission.release(connection.client_ip)
+        api_logger.info(f"❌ 断开SSE连接: {connection_id}")
+    
+    def update_filter(self, connection_id: str, filter_config: StreamFilter) -> bool:
+        """更新连接的过滤条件并重建其订阅索引."""
+        connection = self.connections.get(connection_id)
+        if not connection or not connection.connected:
+            return False
+        self._index_remove(connection)
+        self.stats.filter_changed(connection.filter_config.label(), filter_config.label())
+        connection.filter_config = filter_config
+        self._index_add(connection)
+        return True
+    
+    def _index_add(self, connection: SSEConnection) -> None:
+        for key in connection.filter_config.index_keys():
+            self._index.setdefault(key, set()).add(connection)
+    
+    def _index_remove(self, connection: SSEConnection) -> None:
+        for key in connection.filter_config.index_keys():
+            bucket = self._index.get(key)
+            if bucket is not None:
+                bucket.discard(connection)
+                if not bucket:
+                    del self._index[key]
+    
+    def _index_lookup_keys(self, source_id: str, market: str, data_type: str) -> Iterator[Tuple[str, str, str]]:
+        return product((source_id, WILDCARD), (market, WILDCARD), (data_type, WILDCARD))
+    
+    def subscribers(self, source_id: str, market: str, data_type: str) -> List[SSEConnection]:
+        """获取订阅指定数据的连接，每个连接只返回一次.
+        
+        订阅有重叠时（如 ("*", "*", "*") 与 ("*", "HSI", "*")）同一连接会命中多个索引键，按首次命中的顺序去重。
+        """
+        buckets = [bucket for bucket in map(self._index.get, self._index_lookup_keys(source_id, market, data_type))
+                   if bucket]
+        if len(buckets) == 1:
+            return list(buckets[0])
+        result: List[SSEConnection] = []
+        seen = set()
+        for bucket in buckets:
+            for connection in bucket:
+                if connection not in seen:
+                    seen.add(connection)
+                    result.append(connection)
+        return result
+    
+    def subscription_keys(self) -> List[Tuple[str, str, str]]:
+        """当前所有连接的订阅索引键（含通配符）."""
+        return list(self._index.keys())
+    
+    def has_subscriber(self, source_id: str, market: str, data_type: str) -> bool:
+        """检查是否存在订阅指定数据的活跃连接（可在调度线程中调用）."""
+        return any(self._index.get(key) for key in self._index_lookup_keys(source_id, market, data_type))
+    
+    @property
+    def replay_size(self) -> int:
+        return self._replay.maxlen
+    
+    @replay_size.setter
+    def replay_size(self, size: int) -> None:
+        self._replay = deque(self._replay, maxlen=size)
+    
+    def replay_since(self, last_event_id: int, filter_config: StreamFilter) -> Optional[List[SSEEvent]]:
+        """获取 last_event_id 之后错过的、匹配过滤条件的事件.
+        
+        缺口已超出重放缓冲区（或ID不属于本次运行）时返回 None，调用方应发送重置标记。
+        """
+        if last_event_id == self.event_counter:
+            return []
+        if not self._replay or last_event_id > self.event_counter:
+            return None
+        oldest = self._replay[0].event_id
+        if last_event_id < oldest - 1:
+            return None
+        return [
+            event for event in islice(self._replay, last_event_id - oldest + 1, None)
+            if filter_config.accepts(*event.key)
+        ]
     
     async def broadcast_data(self, data: MarketData):
         """广播数据到所有匹配的连接."""
-        if not self.connections:
-            return
+        self.publish(data)
+    
+    def publish(self, data: MarketData, event_id: Optional[int] = None) -> int:
+        """广播数据到订阅索引命中的连接，非阻塞入队，返回成功发送的连接数.
         
-        # 构造广播数据
-        broadcast_data = {
-            "event": "market_data",
-            "source": data.source,
-            "symbol": data.symbol.value,
-            "type": data.type.value,
-            "price": data.price,
-            "timestamp": data.timestamp.isoformat(),
-            "volume": data.volume,
-            "open_price": data.open_price,
-            "high_price": data.high_price,
-            "low_price": data.low_price,
-            "close_price": data.close_price,
-            "change": data.change,
-            "change_percent": data.change_percent
-        }
+        event_id 为采集进程统一分配的事件ID（发布/订阅模式），未提供时按本地计数编号。
+        必须在服务事件循环中调用。
+        """
+        # 无订阅者时同样记录事件，供断线期间的客户端重连后补发
+        subscribers = self.subscribers(data.source, data.symbol.value, data.type.value)
+        
+        if event_id is None:
+            event_id = self.event_counter + 1
+        elif event_id != self.event_counter + 1:
+            # 外部ID不连续（刚连接采集进程或断线期间丢失事件），此前的事件不能再按ID补发
+            self._replay.clear()
+        self.event_counter = event_id
+        
+        # 构造广播数据，编码为SSE帧后由所有匹配的连接共享
+        broadcast_data = market_data_payload(data)
+        event = SSEEvent(event_id, "market_data", broadcast_data,
+                         (data.source, data.symbol.value, data.type.value), to_epoch_ms(data.timestamp))
+        self._replay.append(event)
         
         # 发送到匹配的连接
         sent_count = 0
-        for conn_id, connection in self.connections.items():
-            if connection.connected:
-                if connection.filter_config.matches(data):
-                    success = await connection.send_data(broadcast_data)
-                    if success:
-                        sent_count += 1
-                    else:
-                        api_logger.error(f"❌ 数据发送失败到连接 {conn_id}")
+        for connection in subscribers:
+            if connection.enqueue(event):
+                sent_count += 1
+            else:
+                api_logger.error(f"❌ 数据发送失败到连接 {connection.connection_id}")
         
         if sent_count > 0:
             api_logger.debug(f"📡 广播数据到 {sent_count} 个连接: {data.symbol.value} - {data.price}")
+        return sent_count
     
     async def get_stats(self) -> Dict[str, Any]:
-        """获取SSE管理器统计信息."""
-        active_connections = sum(1 for conn in self.connections.values() if conn.connected)
-        total_data_sent = sum(conn.data_count for conn in self.connections.values())
-        
+        """获取SSE管理器聚合统计，代价与连接数无关."""
         return {
             "total_connections": len(self.connections),
-            "active_connections": active_connections,
-            "total_data_sent": total_data_sent,
-            "connections_detail": [
+            "active_connections": len(self.connections),
+            "last_event_id": self.event_counter,
+            "replay_buffered": len(self._replay),
+            "idle_timeout": self.idle_timeout,
+            "idle_evicted": self.idle_evicted,
+            "admission": self.admission.get_stats(len(self.connections)),
+            **self.stats.get_stats()
+        }
+    
+    def connection_details(self, offset: int = 0, limit: int = 100, kind: Optional[str] = None,
+                           client_ip: Optional[str] = None, market: Optional[str] = None,
+                           min_queue: int = 0) -> Dict[str, Any]:
+        """分页获取匹配条件的连接详情，按创建顺序排列."""
+        matched = [
+            conn for conn in self.connections.values()
+            if (kind is None or conn.kind == kind)
+            and (client_ip is None or conn.client_ip == client_ip)
+            and (market is None or self._filter_has_market(conn.filter_config, market))
+            and conn.queue.qsize() >= min_queue
+        ]
+        now = time.monotonic()
+        wall_now = datetime.now()
+        return {
+            "total": len(matched),
+            "offset": offset,
+            "limit": limit,
+            "items": [
                 {
                     "id": conn.connection_id,
-                    "connected": conn.connected,
+                    "kind": conn.kind,
+                    "client_ip": conn.client_ip,
                     "created_at": conn.created_at.isoformat(),
-                    "last_activity": conn.last_activity.isoformat(),
+                    "last_activity": (wall_now - timedelta(seconds=now - conn.last_activity)).isoformat(),
+                    "idle_seconds": round(now - conn.last_activity, 3),
                     "data_count": conn.data_count,
-                    "filter": {
-                        "source_ids": list(conn.filter_config.source_ids) if conn.filter_config.source_ids else None,
-                        "markets": list(conn.filter_config.markets) if conn.filter_config.markets else None,
-                        "data_types": list(conn.filter_config.data_types) if conn.filter_config.data_types else None
-                    }
+                    "conflate": conn.conflate,
+                    "queue_size": conn.queue.qsize(),
+                    "dropped": conn.queue.dropped,
+                    "throttle": conn.throttle.get_stats() if conn.throttle else None,
+                    "codec": conn.codec.get_stats() if conn.codec else None,
+                    "compression": conn.compressor.get_stats() if conn.compressor else None,
+                    "filter": conn.filter_config.to_dict()
                 }
-                for conn in self.connections.values()
+                for conn in matched[offset:offset + limit]
             ]
         }
+    
+    @staticmethod
+    def _filter_has_market(filter_config: StreamFilter, market: str) -> bool:
+        """过滤条件是否可能包含指定市场（含通配符）."""
+        return any(key[1] in (market, WILDCARD) for key in filter_config.index_keys())
 
 
 # 全局SSE管理器实例
@@ -0,0 +1,165 @@
+"""SSE连接事件队列.
+
+队列只在服务事件循环中使用，入队为非阻塞操作。
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, Optional
+
+
+# 队列深度分布的桶数: 0, 1, 2-3, 4-7, ..., 最后一个桶包含更深的队列
+DEPTH_BUCKETS = 12
+
+
+def _depth_bucket(depth: int) -> int:
+    return min(depth.bit_length(), DEPTH_BUCKETS - 1)
+
+
+class QueuedEventCounter:
+    """所有连接队列共享的计数，由各队列在入队/出队时增量更新.
+
+    包括待发送事件总数、累计入队/丢弃/合并次数，以及按2的幂分桶的队列深度分布。
+    """
+    __slots__ = ('queued', 'enqueued', 'dropped', 'conflated', 'depths')
+
+    def __init__(self):
+        self.queued = 0
+        self.enqueued = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.depths = [0] * DEPTH_BUCKETS
+
+    def track(self, depth: int) -> None:
+        self.depths[_depth_bucket(depth)] += 1
+
+    def untrack(self, depth: int) -> None:
+        self.depths[_depth_bucket(depth)] -= 1
+
+    def moved(self, old: int, new: int) -> None:
+        """队列深度由 old 变为 new."""
+        old_bucket = _depth_bucket(old)
+        new_bucket = _depth_bucket(new)
+        if old_bucket != new_bucket:
+            self.depths[old_bucket] -= 1
+            self.depths[new_bucket] += 1
+
+    def depth_histogram(self) -> Dict[str, int]:
+        histogram = {"0": self.depths[0]}
+        for bucket in range(1, DEPTH_BUCKETS):
+            low = 1 << (bucket - 1)
+            high = (1 << bucket) - 1
+            if bucket == DEPTH_BUCKETS - 1:
+                label = f"{low}+"
+            else:
+                label = str(low) if low == high else f"{low}-{high}"
+            histogram[label] = self.depths[bucket]
+        return histogram
+
+
+class FifoEventQueue:
+    """先进先出队列，满时丢弃最旧的事件."""
+
+    def __init__(self, maxsize: int = 100, counter: Optional[QueuedEventCounter] = None):
+        self.maxsize = maxsize
+        self._items: deque = deque()
+        self._ready = asyncio.Event()
+        self.counter = counter or QueuedEventCounter()
+        self.counter.track(0)
+        self.dropped = 0
+
+    def put_nowait(self, item: Any, key: Optional[Hashable] = None) -> None:
+        """入队，key 仅为与合并队列保持接口一致."""
+        counter = self.counter
+        counter.enqueued += 1
+        depth = len(self._items)
+        if depth >= self.maxsize:
+            self._items.popleft()
+            self.dropped += 1
+            counter.dropped += 1
+        else:
+            counter.queued += 1
+            counter.moved(depth, depth + 1)
+        self._items.append(item)
+        self._ready.set()
+
+    def get_nowait(self) -> Any:
+        if not self._items:
+            raise asyncio.QueueEmpty
+        item = self._items.popleft()
+        self.counter.queued -= 1
+        self.counter.moved(len(self._items) + 1, len(self._items))
+        if not self._items:
+            self._ready.clear()
+        return item
+
+    async def get(self) -> Any:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self.get_nowait()
+
+    def clear(self) -> None:
+        """丢弃所有待发送事件."""
+        self.counter.queued -= len(self._items)
+        self.counter.moved(len(self._items), 0)
+        self._items.clear()
+        self._ready.clear()
+
+    def close(self) -> None:
+        """连接断开: 立即释放待发送事件并移出深度统计."""
+        self.clear()
+        self.counter.untrack(0)
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+
+class ConflatingEventQueue(FifoEventQueue):
+    """按键合并的队列：每个键只保留最新的待发送事件.
+
+    新事件覆盖同键的待发送事件并保留其原有位置，按键首次入队的顺序输出，
+    内存占用以键的数量为上限，慢速客户端始终收敛到最新值。
+    没有键的事件(如控制事件)不参与合并。
+    """
+
+    def __init__(self, maxsize: int = 100, counter: Optional[QueuedEventCounter] = None):
+        super().__init__(maxsize, counter)
+        self._items: OrderedDict = OrderedDict()
+        self._sequence = 0
+        self.conflated = 0
+
+    def put_nowait(self, item: Any, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._sequence += 1
+            key = ('__unkeyed__', self._sequence)
+        counter = self.counter
+        counter.enqueued += 1
+        if key in self._items:
+            self._items[key] = item
+            self.conflated += 1
+            counter.conflated += 1
+        else:
+            self._items[key] = item
+            counter.queued += 1
+            counter.moved(len(self._items) - 1, len(self._items))
+        self._ready.set()
+
+    def get_nowait(self) -> Any:
+        if not self._items:
+            raise asyncio.QueueEmpty
+        _, item = self._items.popitem(last=False)
+        self.counter.queued -= 1
+        self.counter.moved(len(self._items) + 1, len(self._items))
+        if not self._items:
+            self._ready.clear()
+        return item
+
+    def full(self) -> bool:
+        return False
@@ -0,0 +1,212 @@
+"""SSE数据流会话."""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.sse_manager import (
+    SSEEvent, SSEFilter, SSEManager, format_sse, get_sse_manager, market_data_payload
+)
+from app.services.stream_codec import CompactEncoder
+from app.services.stream_compression import StreamCompressor
+from app.services.stream_throttle import StreamThrottle
+from app.services.tick_cache import TickCache, get_tick_cache
+from models.market_data import TickRecord
+from utils.logger_config import setup_api_logger
+
+api_logger = setup_api_logger()
+
+
+async def next_batch(queue, until: float, throttle: Optional[StreamThrottle] = None,
+                     max_batch: int = 256) -> List[SSEEvent]:
+    """取出待发送的事件，没有数据时等待至新数据到达、限速窗口结束或 until（单调时钟）.
+
+    到达 until 仍无数据时返回空列表。
+    """
+    ready: List[SSEEvent] = []
+
+    def accept(event: SSEEvent) -> None:
+        ready.extend(throttle.offer(event, time.monotonic()) if throttle else (event,))
+
+    while True:
+        now = time.monotonic()
+        while not queue.empty() and len(ready) < max_batch:
+            accept(queue.get_nowait())
+        if throttle:
+            ready.extend(throttle.flush_due(now))
+        if ready or now >= until:
+            return ready
+
+        wake = until
+        deadline = throttle.next_deadline() if throttle else None
+        if deadline is not None and deadline < wake:
+            wake = deadline
+        try:
+            accept(await asyncio.wait_for(queue.get(), timeout=max(wake - now, 0)))
+        except asyncio.TimeoutError:
+            pass
+
+
+class SSEStreamSession:
+    """单个SSE连接的事件输出.
+
+    心跳按独立的截止时间发送，不影响数据的投递：数据入队后立即输出，
+    等待数据的超时时间即为距下一次心跳的剩余时间。
+    """
+
+    def __init__(self, filter_config: SSEFilter, filter_info: Optional[Dict[str, Any]] = None,
+                 conflate: bool = False, last_event_id: Optional[int] = None,
+                 heartbeat_interval: float = 30.0, throttle: Optional[StreamThrottle] = None,
+                 codec: Optional[CompactEncoder] = None, compressor: Optional[StreamCompressor] = None,
+                 manager: Optional[SSEManager] = None, tick_cache: Optional[TickCache] = None,
+                 client_ip: Optional[str] = None):
+        self.filter_config = filter_config
+        self.filter_info = filter_info or {}
+        self.conflate = conflate
+        self.last_event_id = last_event_id
+        self.heartbeat_interval = heartbeat_interval
+        # 按键限速与采样，None 表示不限速
+        self.throttle = throttle
+        # 紧凑增量格式编码器，None 表示完整JSON格式（共享帧）
+        self.codec = codec
+        # 逐连接流式压缩，None 表示不压缩
+        self.compressor = compressor
+        self.manager = manager or get_sse_manager()
+        self.tick_cache = tick_cache if tick_cache is not None else get_tick_cache()
+        self.client_ip = client_ip
+        self.connection = None
+        # open() 生成的首批帧，在返回响应前调用 open() 时由事件生成器输出
+        self._prelude: Optional[List[bytes]] = None
+
+    def open(self) -> List[bytes]:
+        """创建连接并生成连接确认、补发/重置与快照帧.
+
+        订阅与取重放事件、快照之间没有让出，之后的新事件都在连接队列中，不重不漏。
+        连接未被准入时抛出 AdmissionRejected，应在返回响应之前调用以便回复503。
+        """
+        connection_id = self.manager.create_connection(self.filter_config, conflate=self.conflate,
+                                                       client_ip=self.client_ip)
+        self.connection = self.manager.get_connection(connection_id)
+        # 过载时可能被降级为合并模式
+        self.conflate = self.connection.conflate
+        self.connection.throttle = self.throttle
+        self.connection.codec = self.codec
+        self.connection.compressor = self.compressor
+
+        replay = None
+        if self.last_event_id is not None:
+            replay = self.manager.replay_since(self.last_event_id, self.filter_config)
+
+        frames = [format_sse("connected", {
+            "message": "已连接到数据流",
+            "connection_id": connection_id,
+            "filter": {"mode": "realtime", **self.filter_info},
+            "conflate": self.conflate,
+            "heartbeat": self.heartbeat_interval,
+            "throttle": self.throttle.get_stats() if self.throttle else None,
+            "schema": self.codec.schema() if self.codec else None,
+            "compression": self.compressor.encoding if self.compressor else None
+        })]
+
+        # 断线重连: 补发错过的事件或发送重置标记
+        if self.last_event_id is not None:
+            if replay is None:
+                api_logger.info(f"♻️ SSE连接 {connection_id} 重连缺口过大，发送重置标记")
+                frames.append(format_sse("reset", {
+                    "message": "断线期间的事件已无法补发，请重新获取最新数据",
+                    "connection_id": connection_id,
+                    "last_event_id": self.last_event_id
+                }, self.manager.event_counter))
+            else:
+                api_logger.info(f"♻️ SSE连接 {connection_id} 重连，补发 {len(replay)} 条事件")
+                frames.extend(self.frame(event) for event in replay)
+
+        # 新连接或缺口过大时发送最新行情快照，已补发的重连不再需要
+        if replay is None:
+            frames.append(format_sse("snapshot", {
+                "event": "snapshot",
+                "connection_id": connection_id,
+                "items": [
+                    self.snapshot_item(record)
+                    for record in self.tick_cache.snapshot(self.filter_config.accepts)
+                ]
+            }))
+        self._prelude = frames
+        return frames
+
+    def frame(self, event: SSEEvent) -> bytes:
+        """事件在本连接上的SSE帧."""
+        if not self.codec:
+            return event.frame
+        frame = self.codec.frame(event)
+        self.manager.stats.record_compact(len(event.frame), len(frame))
+        return frame
+
+    def snapshot_item(self, record: TickRecord) -> Dict[str, Any]:
+        payload = market_data_payload(record.to_market_data())
+        if self.codec:
+            return self.codec.encode_payload(payload, record.key, record.ts_ms)
+        return payload
+
+    def heartbeat_frame(self) -> bytes:
+        return format_sse("heartbeat", {
+            "event": "heartbeat",
+            "connection_id": self.connection.connection_id,
+            "timestamp": datetime.now().isoformat()
+        })
+
+    async def events(self) -> AsyncIterator[bytes]:
+        """SSE事件生成器，启用压缩时每个事件压缩后同步刷新."""
+        if self.compressor is None:
+            async for frame in self._events():
+                yield frame
+            return
+
+        frames = self._events()
+        try:
+            async for frame in frames:
+                yield self.compressor.compress(frame)
+            # 服务端正常结束数据流时输出压缩流结尾（gzip 含校验和与长度），客户端可完整解压
+            yield self.compressor.close()
+        finally:
+            await frames.aclose()
+
+    async def _events(self) -> AsyncIterator[bytes]:
+        try:
+            for frame in self._prelude if self._prelude is not None else self.open():
+                yield frame
+
+            connection = self.connection
+            next_heartbeat = time.monotonic() + self.heartbeat_interval
+
+            # 实时推送: 数据入队后立即输出，等待时间不超过下一次心跳或限速窗口结束
+            while connection.connected:
+                try:
+                    batch = await next_batch(connection.queue, next_heartbeat, self.throttle)
+                    for event in batch:
+                        yield self.frame(event)
+                    if batch:
+                        self.manager.stats.record_sent(batch)
+
+                    if time.monotonic() >= next_heartbeat:
+                        yield self.heartbeat_frame()
+                        next_heartbeat = time.monotonic() + self.heartbeat_interval
+
+                except Exception as e:
+                    yield format_sse("error", {
+                        "message": str(e),
+                        "connection_id": connection.connection_id,
+                        "timestamp": datetime.now().isoformat()
+                    })
+                    api_logger.error(f"❌ SSE数据流异常: {str(e)}")
+                    break
+
+        except Exception as e:
+            api_logger.error(f"❌ SSE流异常: {str(e)}")
+            yield format_sse("error", {"message": f"数据流异常: {str(e)}"})
+        finally:
+            # 清理连接
+            if self.connection:
+                self.manager.disconnect_connection(self.connection.connection_id)
+                api_logger.info(f"🔌 SSE连接已断开: {self.connection.connection_id}")
@@ -0,0 +1,109 @@
+"""数据流连接的准入控制与过载保护.
+
+限制全局与单个客户端IP的连接数，以及所有连接队列中待发送事件的总数（内存预算）。
+达到上限时按策略处理:
+    reject    拒绝新连接（HTTP 503 + Retry-After / SSE retry 提示）
+    conflate  内存压力较高时新连接降级为合并模式（内存以键数量为上限），连接数超限时拒绝
+    evict     断开积压最多的慢速连接，为新连接腾出空间
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.sse_queues import QueuedEventCounter
+
+OVERLOAD_POLICIES = ("reject", "conflate", "evict")
+
+
+class AdmissionRejected(Exception):
+    """连接被拒绝，客户端应在 retry_after 秒后重试."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """连接准入判断与压力统计，连接的登记与注销由 SSEManager 调用."""
+
+    def __init__(self, max_connections: int = 1000, max_per_ip: int = 20,
+                 max_queued_events: int = 100000, policy: str = "reject",
+                 conflate_threshold: float = 0.8, retry_after: float = 5.0):
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"不支持的过载策略: {policy}")
+        self.max_connections = max_connections
+        self.max_per_ip = max_per_ip
+        self.max_queued_events = max_queued_events
+        self.policy = policy
+        # conflate 策略下内存压力达到该比例时新连接降级为合并模式
+        self.conflate_threshold = conflate_threshold
+        self.retry_after = retry_after
+        # 所有连接队列共享的待发送事件计数
+        self.counter = QueuedEventCounter()
+        self._per_ip: Dict[str, int] = {}
+        self.rejected = 0
+        self.downgraded = 0
+        self.evicted = 0
+
+    def memory_pressure(self) -> float:
+        return self.counter.queued / self.max_queued_events if self.max_queued_events else 0.0
+
+    def admit(self, client_ip: Optional[str], conflate: bool, connections: int) -> Tuple[bool, int]:
+        """判断是否接受新连接，返回 (是否使用合并模式, 需驱逐的慢速连接数).
+
+        超出限制且不能按策略处理时抛出 AdmissionRejected。
+        """
+        if client_ip and self._per_ip.get(client_ip, 0) >= self.max_per_ip:
+            self._reject(f"客户端 {client_ip} 连接数已达上限 {self.max_per_ip}")
+
+        evict = 0
+        if connections >= self.max_connections:
+            if self.policy != "evict":
+                self._reject(f"连接数已达上限 {self.max_connections}")
+            evict = connections - self.max_connections + 1
+
+        pressure = self.memory_pressure()
+        if pressure >= 1.0:
+            if self.policy == "reject":
+                self._reject(f"待发送事件超出内存预算 {self.max_queued_events}")
+            if self.policy == "evict":
+                evict = max(evict, 1)
+        if not conflate and self.policy == "conflate" and pressure >= self.conflate_threshold:
+            conflate = True
+            self.downgraded += 1
+        return conflate, evict
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        raise AdmissionRejected(reason, self.retry_after)
+
+    def register(self, client_ip: Optional[str]) -> None:
+        if client_ip:
+            self._per_ip[client_ip] = self._per_ip.get(client_ip, 0) + 1
+
+    def release(self, client_ip: Optional[str]) -> None:
+        if client_ip:
+            count = self._per_ip.get(client_ip, 0) - 1
+            if count > 0:
+                self._per_ip[client_ip] = count
+            else:
+                self._per_ip.pop(client_ip, None)
+
+    def get_stats(self, connections: int) -> Dict[str, Any]:
+        connection_pressure = connections / self.max_connections if self.max_connections else 0.0
+        memory_pressure = self.memory_pressure()
+        return {
+            "policy": self.policy,
+            "pressure": round(max(connection_pressure, memory_pressure), 3),
+            "connections": connections,
+            "max_connections": self.max_connections,
+            "connection_pressure": round(connection_pressure, 3),
+            "queued_events": self.counter.queued,
+            "max_queued_events": self.max_queued_events,
+            "memory_pressure": round(memory_pressure, 3),
+            "client_ips": len(self._per_ip),
+            "max_per_ip": self.max_per_ip,
+            "rejected": self.rejected,
+            "downgraded": self.downgraded,
+            "evicted": self.evicted
+        }
@@ -0,0 +1,102 @@
+"""SSE紧凑增量格式.
+
+每个连接按 (数据源, 市场, 数据类型) 分配键序号，每个键首次发送完整记录，
+之后只发送变化的字段；值为 None 的字段不发送，字段变为 None 时发送 null 清除。
+字段名使用短键，对照表在 connected 事件中下发。
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.sse_manager import SSEEvent, format_sse
+
+# 完整字段名 -> 短键，k 为连接内的键序号
+COMPACT_FIELDS: Dict[str, str] = {
+    "source": "s",
+    "symbol": "m",
+    "type": "y",
+    "price": "p",
+    "timestamp": "t",
+    "volume": "v",
+    "open_price": "o",
+    "high_price": "h",
+    "low_price": "l",
+    "close_price": "c",
+    "change": "d",
+    "change_percent": "r",
+    "sample": "a",
+    "sample_count": "n"
+}
+
+# 每条记录都带的字段，其余字段只在变化时发送
+_KEY_FIELDS = ("source", "symbol", "type")
+
+
+class CompactEncoder:
+    """单个连接的增量编码状态."""
+
+    def __init__(self):
+        self._key_ids: Dict[Tuple[str, str, str], int] = {}
+        # 键序号 -> 已发送的字段值（短键）
+        self._last: Dict[int, Dict[str, Any]] = {}
+        self.events = 0
+        self.full_bytes = 0
+        self.compact_bytes = 0
+
+    @staticmethod
+    def schema() -> Dict[str, Any]:
+        return {
+            "format": "compact",
+            "key": "k",
+            "fields": COMPACT_FIELDS,
+            "timestamp": "毫秒时间戳",
+            "delta": "每个键首条为完整记录，之后只包含变化的字段，null 表示字段被清除"
+        }
+
+    def encode_payload(self, payload: Dict[str, Any], key: Tuple[str, str, str], ts_ms: int) -> Dict[str, Any]:
+        """编码一条行情数据为紧凑增量记录."""
+        values = {}
+        for name, value in payload.items():
+            short = COMPACT_FIELDS.get(name)
+            if short is None or name in _KEY_FIELDS:
+                continue
+            values[short] = ts_ms if name == "timestamp" else value
+
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._key_ids)
+            self._key_ids[key] = key_id
+            record = {"k": key_id, "s": key[0], "m": key[1], "y": key[2]}
+            record.update((short, value) for short, value in values.items() if value is not None)
+            self._last[key_id] = values
+            return record
+
+        last = self._last[key_id]
+        record = {"k": key_id}
+        for short, value in values.items():
+            if last.get(short) != value:
+                record[short] = value
+        for short in last.keys() - values.keys():
+            if last[short] is not None:
+                record[short] = None
+        self._last[key_id] = values
+        return record
+
+    def frame(self, event: SSEEvent) -> bytes:
+        """编码广播事件为该连接的SSE帧，并统计相对完整格式节省的字节数."""
+        frame = format_sse(event.event, self.encode_payload(event.payload, event.key, event.ts_ms),
+                           event.event_id)
+        self.events += 1
+        self.full_bytes += len(event.frame)
+        self.compact_bytes += len(frame)
+        return frame
+
+    def get_stats(self) -> Dict[str, Any]:
+        saved = self.full_bytes - self.compact_bytes
+        return {
+            "format": "compact",
+            "events": self.events,
+            "full_bytes": self.full_bytes,
+            "compact_bytes": self.compact_bytes,
+            "saved_bytes_per_event": round(saved / self.events, 1) if self.events else 0.0,
+            "saved_ratio": round(saved / self.full_bytes, 3) if self.full_bytes else 0.0
+        }
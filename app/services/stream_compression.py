@@ -0,0 +1,151 @@
+"""SSE数据流的逐连接流式压缩.
+
+每个连接持有一个 zlib 压缩上下文，后续事件可引用之前事件中的重复内容；
+每个事件后执行 Z_SYNC_FLUSH，客户端立即可解出完整事件，推送延迟不变。
+压缩耗时计入全局预算，超出预算时新连接不再启用压缩（已建立的连接无法中途切换编码）。
+"""
+
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Dict, Optional
+
+# 按优先顺序排列的支持编码
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+_WBITS_FORMAT = {
+    "gzip": 16,     # gzip 头
+    "deflate": 0    # zlib 头（HTTP deflate）
+}
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """根据 Accept-Encoding 选择压缩编码，不支持或 q=0 时返回 None."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        fields = part.strip().split(';')
+        name = fields[0].strip().lower()
+        quality = 1.0
+        for param in fields[1:]:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name] = quality
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = accepted[encoding] if encoding in accepted else accepted.get('*', 0.0)
+        if quality > 0:
+            return encoding
+    return None
+
+
+class CompressionBudget:
+    """滑动窗口内压缩耗时占单核时间的比例上限."""
+
+    def __init__(self, max_cpu_fraction: float = 0.25, window_seconds: float = 10.0):
+        self.max_cpu_fraction = max_cpu_fraction
+        self.window_seconds = window_seconds
+        # (秒级时间片, 该时间片内的压缩耗时)
+        self._buckets: deque = deque()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def record(self, seconds: float, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        bucket = int(now)
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] == bucket:
+                self._buckets[-1][1] += seconds
+            else:
+                self._buckets.append([bucket, seconds])
+            self._expire(now)
+
+    def _expire(self, now: float) -> None:
+        oldest = now - self.window_seconds
+        while self._buckets and self._buckets[0][0] < oldest:
+            self._buckets.popleft()
+
+    def usage(self, now: Optional[float] = None) -> float:
+        """窗口内压缩耗时占比."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            spent = sum(seconds for _, seconds in self._buckets)
+        return spent / self.window_seconds
+
+    def allow_new(self, now: Optional[float] = None) -> bool:
+        """是否允许新连接启用压缩."""
+        if self.usage(now) < self.max_cpu_fraction:
+            return True
+        self.rejected += 1
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_cpu_fraction": self.max_cpu_fraction,
+            "cpu_fraction": round(self.usage(), 4),
+            "rejected_connections": self.rejected
+        }
+
+
+class StreamCompressor:
+    """单个连接的流式压缩器.
+
+    默认使用较小的窗口与内存级别，每个连接的压缩状态约数十KB，
+    事件帧之间的重复内容（字段名、数据源、市场代码）仍在窗口范围内。
+    """
+
+    def __init__(self, encoding: str, level: int = 1, window_bits: int = 12, mem_level: int = 5,
+                 budget: Optional[CompressionBudget] = None):
+        if encoding not in _WBITS_FORMAT:
+            raise ValueError(f"不支持的压缩编码: {encoding}")
+        self.encoding = encoding
+        self.level = level
+        self.budget = budget
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, window_bits + _WBITS_FORMAT[encoding], mem_level)
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.cpu_seconds = 0.0
+
+    def compress(self, frame: bytes) -> bytes:
+        """压缩一个事件帧并同步刷新，返回可立即发送的数据."""
+        started = time.perf_counter()
+        data = self._compressor.compress(frame) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        elapsed = time.perf_counter() - started
+        self.cpu_seconds += elapsed
+        if self.budget is not None:
+            self.budget.record(elapsed)
+        self.raw_bytes += len(frame)
+        self.compressed_bytes += len(data)
+        return data
+
+    def close(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "encoding": self.encoding,
+            "level": self.level,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "ratio": round(self.compressed_bytes / self.raw_bytes, 3) if self.raw_bytes else None,
+            "cpu_ms": round(self.cpu_seconds * 1000, 3)
+        }
+
+
+# 全局压缩预算实例
+_compression_budget = None
+
+
+def get_compression_budget() -> CompressionBudget:
+    """获取压缩CPU预算实例."""
+    global _compression_budget
+    if _compression_budget is None:
+        _compression_budget = CompressionBudget()
+    return _compression_budget
@@ -0,0 +1,146 @@
+"""数据流聚合统计.
+
+连接数、按过滤条件的连接分布、入队/发送计数、队列深度分布与入队到发送的延迟分位数
+均在事件发生时增量更新，读取统计的代价与连接数无关。
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.sse_queues import QueuedEventCounter
+
+# 延迟直方图: 以微秒为单位的对数分桶，每个2倍区间分为4个桶（相对误差约19%）
+_BUCKETS_PER_OCTAVE = 4
+_LATENCY_BUCKETS = 27 * _BUCKETS_PER_OCTAVE  # 上限约 2^27 微秒（134秒）
+
+
+class LatencyHistogram:
+    """对数分桶的延迟直方图，记录与计算分位数的代价与样本数无关.
+
+    保留当前与上一个时间窗口的计数，分位数反映最近一到两个窗口内的延迟。
+    """
+
+    def __init__(self, window_seconds: float = 60.0, now: Optional[float] = None):
+        self.window_seconds = window_seconds
+        self._current = [0] * _LATENCY_BUCKETS
+        self._previous = [0] * _LATENCY_BUCKETS
+        self._window_start = time.monotonic() if now is None else now
+
+    def _rotate(self, now: float) -> None:
+        elapsed = now - self._window_start
+        if elapsed < self.window_seconds:
+            return
+        # 超过两个窗口没有样本时上一个窗口同样过期
+        self._previous = self._current if elapsed < 2 * self.window_seconds else [0] * _LATENCY_BUCKETS
+        self._current = [0] * _LATENCY_BUCKETS
+        self._window_start = now
+
+    def record(self, seconds: float, now: Optional[float] = None) -> None:
+        self._rotate(time.monotonic() if now is None else now)
+        micros = seconds * 1e6
+        bucket = 0 if micros < 1 else min(int(math.log2(micros) * _BUCKETS_PER_OCTAVE) + 1, _LATENCY_BUCKETS - 1)
+        self._current[bucket] += 1
+
+    def percentiles(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99),
+                    now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """各分位数所在桶的上界（毫秒），没有样本时为 None."""
+        self._rotate(time.monotonic() if now is None else now)
+        counts = [current + previous for current, previous in zip(self._current, self._previous)]
+        total = sum(counts)
+        result: Dict[str, Optional[float]] = {}
+        for quantile in quantiles:
+            name = f"p{quantile * 100:g}"
+            if not total:
+                result[name] = None
+                continue
+            rank = quantile * total
+            seen = 0
+            for bucket, count in enumerate(counts):
+                seen += count
+                if seen >= rank:
+                    upper_micros = 2 ** (bucket / _BUCKETS_PER_OCTAVE) if bucket else 1.0
+                    result[name] = round(upper_micros / 1000, 3)
+                    break
+        return result
+
+    def count(self) -> int:
+        return sum(self._current) + sum(self._previous)
+
+
+class StreamStats:
+    """数据流聚合统计，由 SSEManager 与各数据流会话增量更新."""
+
+    def __init__(self, counter: QueuedEventCounter):
+        # 与连接队列共享的入队、丢弃、深度计数
+        self.counter = counter
+        self.opened = 0
+        self.closed = 0
+        # 连接类型(sse/ws) -> 当前连接数
+        self.by_kind: Dict[str, int] = {}
+        # 过滤条件标签 -> 当前连接数
+        self.by_filter: Dict[str, int] = {}
+        self.events_sent = 0
+        self.latency = LatencyHistogram()
+        # 紧凑格式相对完整JSON格式的字节数
+        self.compact_events = 0
+        self.full_bytes = 0
+        self.compact_bytes = 0
+
+    @staticmethod
+    def _increment(counts: Dict[str, int], key: str, delta: int) -> None:
+        value = counts.get(key, 0) + delta
+        if value > 0:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+
+    def connection_opened(self, kind: str, filter_label: str) -> None:
+        self.opened += 1
+        self._increment(self.by_kind, kind, 1)
+        self._increment(self.by_filter, filter_label, 1)
+
+    def connection_closed(self, kind: str, filter_label: str) -> None:
+        self.closed += 1
+        self._increment(self.by_kind, kind, -1)
+        self._increment(self.by_filter, filter_label, -1)
+
+    def filter_changed(self, old_label: str, new_label: str) -> None:
+        if old_label != new_label:
+            self._increment(self.by_filter, old_label, -1)
+            self._increment(self.by_filter, new_label, 1)
+
+    def record_sent(self, events: List[Any], now: Optional[float] = None) -> None:
+        """记录已交给传输层的事件及其自发布以来的延迟."""
+        now = time.monotonic() if now is None else now
+        self.events_sent += len(events)
+        for event in events:
+            self.latency.record(now - event.published_at, now)
+
+    def record_compact(self, full_bytes: int, compact_bytes: int) -> None:
+        self.compact_events += 1
+        self.full_bytes += full_bytes
+        self.compact_bytes += compact_bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        counter = self.counter
+        return {
+            "connections_opened": self.opened,
+            "connections_closed": self.closed,
+            "connections_by_kind": dict(self.by_kind),
+            "connections_by_filter": dict(self.by_filter),
+            "events_enqueued": counter.enqueued,
+            "events_dropped": counter.dropped,
+            "events_conflated": counter.conflated,
+            "events_queued": counter.queued,
+            "events_sent": self.events_sent,
+            "queue_depth_histogram": counter.depth_histogram(),
+            "latency_ms": self.latency.percentiles(),
+            "compact": {
+                "events": self.compact_events,
+                "full_bytes": self.full_bytes,
+                "compact_bytes": self.compact_bytes,
+                "saved_bytes_per_event": round((self.full_bytes - self.compact_bytes) / self.compact_events, 1)
+                if self.compact_events else 0.0
+            }
+        }
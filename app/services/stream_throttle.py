@@ -0,0 +1,134 @@
+"""推送数据流的按连接限速与采样.
+
+在连接的投递任务中按 (数据源, 市场, 数据类型) 限制推送频率：空闲键的第一条数据立即发送，
+之后一个窗口内的数据合并为一条，在窗口结束时发送。合并方式:
+    latest  窗口内最新的一条
+    first   窗口内最早的一条
+    ohlc    以窗口内的价格构造开高低收，价格为收盘价
+
+窗口只保留首尾两条数据与开高低收的累计值，内存占用与窗口内的数据条数无关。
+合并后的数据总是使用窗口内最新的事件ID，客户端携带 Last-Event-ID 重连时不会重复收到已合并的数据。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.sse_manager import SSEEvent
+
+SAMPLE_MODES = ("latest", "first", "ohlc")
+
+
+class _Window:
+    """一个键当前限速窗口内待发送数据的累计值."""
+    __slots__ = ('end', 'count', 'first', 'last', 'high', 'low')
+
+    def __init__(self, end: float):
+        self.end = end
+        self.count = 0
+        self.first: Optional[SSEEvent] = None
+        self.last: Optional[SSEEvent] = None
+        self.high = 0.0
+        self.low = 0.0
+
+    def add(self, event: SSEEvent) -> None:
+        payload = event.payload
+        high = payload["high_price"] if payload["high_price"] is not None else payload["price"]
+        low = payload["low_price"] if payload["low_price"] is not None else payload["price"]
+        if self.count == 0:
+            self.first = event
+            self.high = high
+            self.low = low
+        else:
+            self.high = max(self.high, high)
+            self.low = min(self.low, low)
+        self.last = event
+        self.count += 1
+
+    def reset(self, end: float) -> None:
+        self.end = end
+        self.count = 0
+        self.first = self.last = None
+
+
+class StreamThrottle:
+    """每个键每秒最多发送 max_rate 条数据."""
+
+    def __init__(self, max_rate: float, sample: str = "latest"):
+        if max_rate <= 0:
+            raise ValueError("max_rate 必须大于0")
+        if sample not in SAMPLE_MODES:
+            raise ValueError(f"不支持的采样方式: {sample}，可选: {', '.join(SAMPLE_MODES)}")
+        self.max_rate = max_rate
+        self.sample = sample
+        self.interval = 1.0 / max_rate
+        self._windows: Dict[Tuple[str, str, str], _Window] = {}
+        self.received = 0
+        self.emitted = 0
+
+    def offer(self, event: SSEEvent, now: float) -> List[SSEEvent]:
+        """接收一条数据，返回需要立即发送的数据."""
+        self.received += 1
+        if event.key is None:
+            # 控制事件不限速
+            return [event]
+        window = self._windows.get(event.key)
+        if window is None or now >= window.end and not window.count:
+            self._windows[event.key] = _Window(now + self.interval)
+            self.emitted += 1
+            return [event]
+        window.add(event)
+        if now >= window.end:
+            return self.flush_due(now)
+        return []
+
+    def flush_due(self, now: float) -> List[SSEEvent]:
+        """发送窗口已结束的合并数据，并为其开启下一个窗口."""
+        ready = []
+        expired = []
+        for key, window in self._windows.items():
+            if now < window.end:
+                continue
+            if window.count:
+                ready.append(self._merge(window))
+                window.reset(now + self.interval)
+            else:
+                expired.append(key)
+        for key in expired:
+            del self._windows[key]
+        self.emitted += len(ready)
+        return ready
+
+    def next_deadline(self) -> Optional[float]:
+        """最近一个有待发送数据的窗口结束时间."""
+        deadlines = [window.end for window in self._windows.values() if window.count]
+        return min(deadlines) if deadlines else None
+
+    def _merge(self, window: _Window) -> SSEEvent:
+        last = window.last
+        if window.count == 1 or self.sample == "latest":
+            return last
+        if self.sample == "first":
+            first = window.first
+            merged = SSEEvent(last.event_id, first.event, first.payload, first.key, first.ts_ms)
+        else:
+            first = window.first.payload
+            payload: Dict[str, Any] = dict(last.payload)
+            payload.update({
+                "open_price": first["open_price"] if first["open_price"] is not None else first["price"],
+                "high_price": window.high,
+                "low_price": window.low,
+                "close_price": payload["close_price"] if payload["close_price"] is not None else payload["price"],
+                "sample": "ohlc",
+                "sample_count": window.count
+            })
+            merged = SSEEvent(last.event_id, last.event, payload, last.key, last.ts_ms)
+        # 延迟从窗口内最后一条发布时计算
+        merged.published_at = last.published_at
+        return merged
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_rate": self.max_rate,
+            "sample": self.sample,
+            "received": self.received,
+            "emitted": self.emitted
+        }
@@ -0,0 +1,260 @@
+"""采集进程与API工作进程之间的本地行情发布/订阅.
+
+采集进程运行唯一一组数据源，通过Unix域套接字向所有API工作进程发布行情；
+每个工作进程将行情分发给自己的SSE/WebSocket连接，并定期回传自己的订阅需求，
+采集进程按所有工作进程需求的并集决定轮询哪些标的。
+
+事件ID由采集进程统一分配并随行情下发，各工作进程的事件ID一致，客户端携带
+Last-Event-ID 重连到任一工作进程都能正确补发或收到重置标记。
+
+帧格式: 4字节大端长度 + 1字节类型 + 负载
+    T  快照行情，负载为 TickRecord JSON，只用于更新缓存
+    E  行情事件，负载为 8字节大端事件ID + TickRecord JSON
+    D  订阅需求，负载为 {"keys": [[数据源, 市场, 数据类型], ...]}，维度可为通配符
+"""
+
+import asyncio
+import json
+import os
+import struct
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.sse_manager import SubscriptionSet
+from app.services.tick_cache import TickCache
+from models.market_data import MarketData, TickRecord
+from utils.logger_config import setup_api_logger
+
+api_logger = setup_api_logger()
+
+FRAME_HEADER = struct.Struct('>IB')
+KIND_TICK = ord('T')
+KIND_EVENT = ord('E')
+EVENT_ID = struct.Struct('>Q')
+KIND_DEMAND = ord('D')
+
+# 单帧上限，防止异常数据导致超大内存分配
+MAX_FRAME_SIZE = 1 << 20
+
+
+def encode_frame(kind: int, payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload), kind) + payload
+
+
+def encode_tick(data: MarketData) -> bytes:
+    return encode_frame(KIND_TICK, TickRecord.from_market_data(data).to_json().encode('utf-8'))
+
+
+def encode_event(event_id: int, data: MarketData) -> bytes:
+    return encode_frame(KIND_EVENT, EVENT_ID.pack(event_id) + TickRecord.from_market_data(data).to_json().encode('utf-8'))
+
+
+def decode_event(payload: bytes) -> Tuple[int, MarketData]:
+    return EVENT_ID.unpack_from(payload)[0], decode_tick(payload[EVENT_ID.size:])
+
+
+def decode_tick(payload: bytes) -> MarketData:
+    return TickRecord.from_dict(json.loads(payload)).to_market_data()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """读取一帧，连接关闭时抛出 asyncio.IncompleteReadError."""
+    length, kind = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"帧长度超出上限: {length}")
+    return kind, await reader.readexactly(length)
+
+
+class _Subscriber:
+    __slots__ = ('name', 'writer', 'subscriptions')
+
+    def __init__(self, name: str, writer: asyncio.StreamWriter):
+        self.name = name
+        self.writer = writer
+        self.subscriptions = SubscriptionSet()
+
+
+class TickBrokerServer:
+    """采集进程中的行情发布端."""
+
+    def __init__(self, socket_path: str, tick_cache: Optional[TickCache] = None,
+                 max_buffer: int = 4 << 20):
+        self.socket_path = socket_path
+        self.tick_cache = tick_cache
+        # 订阅端写缓冲超过上限时断开，由其重连后从快照恢复
+        self.max_buffer = max_buffer
+        self._subscribers: Dict[str, _Subscriber] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._counter = 0
+        # 事件ID从启动时的毫秒时间戳开始单调递增，与 SSEManager 的本地编号规则一致
+        self.event_counter = int(time.time() * 1000)
+        self.published = 0
+        self.evicted = 0
+
+    async def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        api_logger.info(f"📡 行情发布端已启动: {self.socket_path}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for subscriber in list(self._subscribers.values()):
+            subscriber.writer.close()
+        self._subscribers.clear()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def publish_batch(self, batch: List[MarketData]) -> None:
+        """向所有订阅端发布行情，必须在发布端事件循环中调用."""
+        if not self._subscribers:
+            return
+        first_id = self.event_counter + 1
+        self.event_counter += len(batch)
+        frames = b''.join(encode_event(first_id + i, data) for i, data in enumerate(batch))
+        for subscriber in list(self._subscribers.values()):
+            transport = subscriber.writer.transport
+            if transport.get_write_buffer_size() > self.max_buffer:
+                api_logger.warning(f"⚠️ 订阅端 {subscriber.name} 积压过多，断开连接")
+                self.evicted += 1
+                self._subscribers.pop(subscriber.name, None)
+                subscriber.writer.close()
+                continue
+            subscriber.writer.write(frames)
+        self.published += len(batch)
+
+    def has_subscriber(self, source_id: str, symbol: str, data_type: str) -> bool:
+        """是否有API工作进程订阅指定数据（可在调度线程中调用）."""
+        return any(subscriber.subscriptions.accepts(source_id, symbol, data_type)
+                   for subscriber in list(self._subscribers.values()))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._counter += 1
+        subscriber = _Subscriber(f"worker_{self._counter}", writer)
+        self._subscribers[subscriber.name] = subscriber
+        api_logger.info(f"🔗 API工作进程已连接: {subscriber.name}，当前 {len(self._subscribers)} 个")
+        try:
+            # 先发送最新行情快照，工作进程的缓存与新连接快照立即可用
+            if self.tick_cache is not None:
+                records = self.tick_cache.snapshot()
+                if records:
+                    writer.write(b''.join(
+                        encode_frame(KIND_TICK, record.to_json().encode('utf-8')) for record in records))
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind == KIND_DEMAND:
+                    keys = json.loads(payload)["keys"]
+                    subscriber.subscriptions = SubscriptionSet(tuple(key) for key in keys)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            api_logger.error(f"❌ 订阅端 {subscriber.name} 异常: {str(e)}")
+        finally:
+            self._subscribers.pop(subscriber.name, None)
+            writer.close()
+            api_logger.info(f"🔌 API工作进程已断开: {subscriber.name}，当前 {len(self._subscribers)} 个")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "socket_path": self.socket_path,
+            "subscribers": {
+                subscriber.name: subscriber.subscriptions.to_dict()["subscriptions"]
+                for subscriber in self._subscribers.values()
+            },
+            "published": self.published,
+            "evicted": self.evicted
+        }
+
+
+class TickBrokerClient:
+    """API工作进程中的行情订阅端，断线后自动重连."""
+
+    def __init__(self, socket_path: str, on_tick: Callable[[MarketData, Optional[int]], None],
+                 demand_keys: Callable[[], Iterable[Tuple[str, str, str]]],
+                 demand_interval: float = 1.0, max_backoff: float = 5.0):
+        self.socket_path = socket_path
+        # 回调参数为行情与采集进程分配的事件ID，快照行情的事件ID为 None
+        self.on_tick = on_tick
+        self.demand_keys = demand_keys
+        self.demand_interval = demand_interval
+        self.max_backoff = max_backoff
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.received = 0
+        self.reconnects = 0
+
+    def start(self) -> None:
+        """在服务事件循环中启动订阅任务."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        backoff = 0.1
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            except OSError as e:
+                api_logger.warning(f"⚠️ 无法连接行情发布端 {self.socket_path}: {str(e)}，{backoff:.1f}秒后重试")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = 0.1
+            self.connected = True
+            api_logger.info(f"🔗 已连接行情发布端: {self.socket_path}")
+            demand_task = asyncio.create_task(self._send_demand(writer))
+            try:
+                while True:
+                    kind, payload = await read_frame(reader)
+                    if kind in (KIND_TICK, KIND_EVENT):
+                        self.received += 1
+                        try:
+                            if kind == KIND_EVENT:
+                                event_id, data = decode_event(payload)
+                                self.on_tick(data, event_id)
+                            else:
+                                self.on_tick(decode_tick(payload), None)
+                        except Exception as e:
+                            api_logger.error(f"❌ 处理行情失败: {str(e)}")
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                api_logger.warning(f"⚠️ 与行情发布端的连接断开: {str(e)}")
+            except Exception as e:
+                # 帧格式错误后字节流已无法对齐，断开重连并从快照恢复
+                api_logger.error(f"❌ 行情发布端数据异常，重新连接: {str(e)}")
+            finally:
+                self.connected = False
+                demand_task.cancel()
+                writer.close()
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+
+    async def _send_demand(self, writer: asyncio.StreamWriter) -> None:
+        """订阅需求变化时回传给发布端，新连接时立即发送一次."""
+        last = None
+        while True:
+            keys = sorted(set(self.demand_keys()))
+            if keys != last:
+                writer.write(encode_frame(KIND_DEMAND, json.dumps({"keys": keys}).encode('utf-8')))
+                await writer.drain()
+                last = keys
+            await asyncio.sleep(self.demand_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "socket_path": self.socket_path,
+            "connected": self.connected,
+            "received": self.received,
+            "reconnects": self.reconnects
+        }
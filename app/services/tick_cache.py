@@ -0,0 +1,72 @@
+"""最新行情缓存.
+
+按 (数据源, 市场, 数据类型) 保存最新一条行情，由数据回调更新，
+新的SSE连接建立时据此发送快照，REST最新价格接口在数据足够新时直接读取。
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.market_data import MarketData, TickRecord
+
+
+class TickCache:
+    """最新值表，可在数据源线程中更新、在服务事件循环中读取."""
+
+    def __init__(self):
+        self._latest: Dict[Tuple[str, str, str], TickRecord] = {}
+        # 每个键最近一次写入的单调时钟秒数，用于判断数据新鲜度
+        self._received: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def update(self, data: MarketData) -> None:
+        """写入一条行情，覆盖同键的旧值."""
+        record = TickRecord.from_market_data(data)
+        received = time.monotonic()
+        with self._lock:
+            self._latest[record.key] = record
+            self._received[record.key] = received
+
+    def get(self, source_id: str, market: str, data_type: str) -> Optional[TickRecord]:
+        """获取指定键的最新行情."""
+        return self._latest.get((source_id, market, data_type))
+
+    def get_with_age(self, source_id: str, market: str, data_type: str,
+                     now: Optional[float] = None) -> Optional[Tuple[TickRecord, float]]:
+        """获取指定键的最新行情及其写入后经过的秒数，没有数据时返回 None."""
+        key = (source_id, market, data_type)
+        with self._lock:
+            record = self._latest.get(key)
+            received = self._received.get(key)
+        if record is None:
+            return None
+        return record, (time.monotonic() if now is None else now) - received
+
+    def snapshot(self, accepts: Optional[Callable[[str, str, str], bool]] = None) -> List[TickRecord]:
+        """获取最新行情，accepts(数据源, 市场, 数据类型) 用于过滤."""
+        with self._lock:
+            records = list(self._latest.values())
+        if accepts is None:
+            return records
+        return [record for record in records if accepts(*record.key)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._latest.clear()
+            self._received.clear()
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+
+# 全局最新行情缓存实例
+_tick_cache = None
+
+
+def get_tick_cache() -> TickCache:
+    """获取最新行情缓存实例."""
+    global _tick_cache
+    if _tick_cache is None:
+        _tick_cache = TickCache()
+    return _tick_cache
@@ -0,0 +1,71 @@
+"""哈希时间轮.
+
+按到期时间把任务散列到固定数量的槽中，每次推进只访问当前槽中到期的条目，
+添加、取消与每次推进的代价与总条目数无关。时间使用单调时钟秒数。
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional
+
+
+class TimingWheel:
+    """单层哈希时间轮.
+
+    只处理已完整走过的tick，条目在到期后一个tick内被取出；到期时间超过一圈的条目
+    留在槽中直到对应的圈数，超时时长小于 tick_seconds * slots 时每个条目只被访问一次。
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512, now: float = 0.0):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self._wheel: List[Dict[Hashable, float]] = [{} for _ in range(slots)]
+        # 条目 -> 所在槽号，用于O(1)取消与重新调度
+        self._slot_of: Dict[Hashable, int] = {}
+        # 下一个待处理的tick序号，之前的tick均已处理
+        self._cursor = self._tick(now)
+
+    def _tick(self, when: float) -> int:
+        return math.floor(when / self.tick_seconds)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """在 deadline 之后到期，已存在的条目会被重新调度."""
+        self.cancel(key)
+        # 已过期的条目放入下一个待处理的槽，下次推进时立即到期
+        slot = max(self._tick(deadline), self._cursor) % self.slots
+        self._wheel[slot][key] = deadline
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return False
+        del self._wheel[slot][key]
+        return True
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        slot = self._slot_of.get(key)
+        return None if slot is None else self._wheel[slot][key]
+
+    def advance(self, now: float) -> List[Hashable]:
+        """推进到 now，移除并返回已走过的tick中到期的条目（最多延迟一个tick）."""
+        expired: List[Hashable] = []
+        target = self._tick(now)
+        # 长时间未推进时最多转一圈即可覆盖所有槽
+        start = max(self._cursor, target - self.slots)
+        for tick in range(start, target):
+            bucket = self._wheel[tick % self.slots]
+            if not bucket:
+                continue
+            due = [key for key, deadline in bucket.items() if self._tick(deadline) <= tick]
+            for key in due:
+                del bucket[key]
+                del self._slot_of[key]
+            expired.extend(due)
+        self._cursor = max(self._cursor, target)
+        return expired
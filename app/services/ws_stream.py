@@ -0,0 +1,273 @@
+"""WebSocket行情推送会话.
+
+与SSE数据流共用订阅索引与合并队列，客户端可在连接期间发送订阅/退订消息。
+行情以二进制帧批量推送，控制消息为JSON文本。
+
+二进制帧布局（小端）:
+    帧头   '<BBH'  版本(1), 帧类型(1=行情, 2=快照), 记录数
+    记录   '<IdqB' 键ID, 价格, 毫秒时间戳, 可选字段掩码
+           之后按 OPTIONAL_FIELDS 顺序为掩码中每个置位字段追加一个 '<d'
+
+键ID到 (数据源, 市场, 数据类型) 的映射在首次出现前以 {"type": "keys"} 文本消息下发。
+"""
+
+import asyncio
+import json
+import struct
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.services.sse_manager import SSEEvent, SSEManager, SubscriptionSet, WILDCARD, get_sse_manager
+from app.services.sse_stream import next_batch
+from app.services.stream_admission import AdmissionRejected
+from app.services.stream_throttle import StreamThrottle
+from app.services.tick_cache import TickCache, get_tick_cache
+from models.market_data import OPTIONAL_FIELDS, TickRecord
+from utils.logger_config import setup_api_logger
+
+api_logger = setup_api_logger()
+
+FRAME_VERSION = 1
+FRAME_TICKS = 1
+FRAME_SNAPSHOT = 2
+
+FRAME_HEADER = struct.Struct('<BBH')
+RECORD_HEADER = struct.Struct('<IdqB')
+FIELD = struct.Struct('<d')
+
+MAX_BATCH = 256
+
+# 过载时关闭连接的状态码: Try Again Later
+WS_TRY_AGAIN_LATER = 1013
+
+
+class KeyTable:
+    """(数据源, 市场, 数据类型) 与键ID的映射，进程内所有连接共享."""
+
+    def __init__(self):
+        self._ids: Dict[Tuple[str, str, str], int] = {}
+        self._keys: List[Tuple[str, str, str]] = []
+
+    def id_for(self, key: Tuple[str, str, str]) -> int:
+        key_id = self._ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._ids[key] = key_id
+            self._keys.append(key)
+        return key_id
+
+    def key(self, key_id: int) -> Tuple[str, str, str]:
+        return self._keys[key_id]
+
+
+_key_table = KeyTable()
+
+
+def pack_record(key_id: int, price: float, ts_ms: int, values: Sequence[Optional[float]]) -> bytes:
+    """编码一条行情记录，values 按 OPTIONAL_FIELDS 顺序."""
+    mask = 0
+    fields = []
+    for bit, value in enumerate(values):
+        if value is not None:
+            mask |= 1 << bit
+            fields.append(FIELD.pack(value))
+    return RECORD_HEADER.pack(key_id, price, ts_ms, mask) + b''.join(fields)
+
+
+def pack_event(event: SSEEvent, key_table: KeyTable = _key_table) -> bytes:
+    """编码广播事件，结果缓存在事件上供所有连接共享."""
+    if event.packed is None:
+        payload = event.payload
+        event.packed = pack_record(
+            key_table.id_for(event.key),
+            payload["price"],
+            event.ts_ms,
+            [payload[name] for name in OPTIONAL_FIELDS]
+        )
+    return event.packed
+
+
+def pack_tick(record: TickRecord, key_table: KeyTable = _key_table) -> bytes:
+    """编码缓存中的最新行情."""
+    return pack_record(key_table.id_for(record.key), record.price, record.ts_ms,
+                       [getattr(record, name) for name in OPTIONAL_FIELDS])
+
+
+def pack_frame(frame_type: int, records: List[bytes]) -> bytes:
+    return FRAME_HEADER.pack(FRAME_VERSION, frame_type, len(records)) + b''.join(records)
+
+
+def decode_frame(frame: bytes) -> Tuple[int, List[Dict[str, Any]]]:
+    """解码二进制帧，返回 (帧类型, 记录列表)."""
+    version, frame_type, count = FRAME_HEADER.unpack_from(frame, 0)
+    if version != FRAME_VERSION:
+        raise ValueError(f"不支持的帧版本: {version}")
+    offset = FRAME_HEADER.size
+    records = []
+    for _ in range(count):
+        key_id, price, ts_ms, mask = RECORD_HEADER.unpack_from(frame, offset)
+        offset += RECORD_HEADER.size
+        record = {"key_id": key_id, "price": price, "timestamp": ts_ms}
+        for bit, name in enumerate(OPTIONAL_FIELDS):
+            if mask & (1 << bit):
+                record[name] = FIELD.unpack_from(frame, offset)[0]
+                offset += FIELD.size
+        records.append(record)
+    return frame_type, records
+
+
+def parse_subscriptions(items: Iterable[Dict[str, Any]]) -> Set[Tuple[str, str, str]]:
+    """解析订阅消息中的订阅项，缺省的维度为通配符."""
+    keys = set()
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("订阅项必须是对象，如 {\"source\": \"wen_cai\", \"symbol\": \"HSI\", \"type\": \"realtime\"}")
+        keys.add((
+            str(item.get("source") or WILDCARD),
+            str(item.get("symbol") or WILDCARD),
+            str(item.get("type") or WILDCARD)
+        ))
+    return keys
+
+
+class WSStreamSession:
+    """单个WebSocket连接的订阅管理与批量推送."""
+
+    def __init__(self, websocket: WebSocket, conflate: bool = False, heartbeat_interval: float = 30.0,
+                 max_batch: int = MAX_BATCH, throttle: Optional[StreamThrottle] = None,
+                 manager: Optional[SSEManager] = None,
+                 tick_cache: Optional[TickCache] = None, key_table: KeyTable = _key_table):
+        self.websocket = websocket
+        self.conflate = conflate
+        self.heartbeat_interval = heartbeat_interval
+        self.max_batch = max_batch
+        self.throttle = throttle
+        self.manager = manager or get_sse_manager()
+        self.tick_cache = tick_cache if tick_cache is not None else get_tick_cache()
+        self.key_table = key_table
+        self.connection = None
+        # 已下发给客户端的键ID
+        self._sent_keys: Set[int] = set()
+        # 接收与推送两个任务都会发送消息；键映射与引用它的帧须在同一把锁内连续发送，
+        # 否则另一任务可能在键映射发出前就发送引用该键的帧
+        self._send_lock = asyncio.Lock()
+
+    async def run(self) -> None:
+        await self.websocket.accept()
+        client = self.websocket.client
+        try:
+            connection_id = self.manager.create_connection(SubscriptionSet(), conflate=self.conflate, prefix="ws",
+                                                           client_ip=client.host if client else None)
+        except AdmissionRejected as e:
+            api_logger.warning(f"⚠️ 拒绝WebSocket连接: {e.reason}")
+            await self.websocket.send_json({"type": "rejected", "message": e.reason, "retry_after": e.retry_after})
+            await self.websocket.close(code=WS_TRY_AGAIN_LATER)
+            return
+        self.connection = self.manager.get_connection(connection_id)
+        self.conflate = self.connection.conflate
+        self.connection.throttle = self.throttle
+        tasks = []
+        try:
+            await self.websocket.send_json({
+                "type": "connected",
+                "connection_id": connection_id,
+                "conflate": self.conflate,
+                "heartbeat": self.heartbeat_interval,
+                "throttle": self.throttle.get_stats() if self.throttle else None,
+                "format": {
+                    "version": FRAME_VERSION,
+                    "header": FRAME_HEADER.format,
+                    "record": RECORD_HEADER.format,
+                    "optional_fields": list(OPTIONAL_FIELDS)
+                }
+            })
+            tasks = [asyncio.create_task(self._receive_loop()), asyncio.create_task(self._send_loop())]
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None \
+                        and not isinstance(task.exception(), WebSocketDisconnect):
+                    api_logger.error(f"❌ WebSocket数据流异常: {str(task.exception())}")
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.manager.disconnect_connection(connection_id)
+            api_logger.info(f"🔌 WebSocket连接已断开: {connection_id}")
+
+    async def _receive_loop(self) -> None:
+        while True:
+            text = await self.websocket.receive_text()
+            try:
+                await self.handle_message(json.loads(text))
+            except (ValueError, TypeError, AttributeError) as e:
+                await self._send_json({"type": "error", "message": str(e)})
+
+    async def handle_message(self, message: Dict[str, Any]) -> None:
+        """处理客户端消息: subscribe / unsubscribe / ping."""
+        action = message.get("action")
+        if action == "ping":
+            await self._send_json({"type": "pong", "timestamp": datetime.now().isoformat()})
+            return
+        if action not in ("subscribe", "unsubscribe"):
+            raise ValueError(f"未知的操作: {action}")
+
+        keys = parse_subscriptions(message.get("subscriptions") or [{}])
+        subscriptions = self.connection.filter_config
+        if action == "subscribe":
+            added = keys - subscriptions.keys
+            self.manager.update_filter(self.connection.connection_id, subscriptions.with_keys(keys))
+        else:
+            added = set()
+            self.manager.update_filter(self.connection.connection_id, subscriptions.without_keys(keys))
+
+        await self._send_json({"type": "subscriptions", **self.connection.filter_config.to_dict()})
+
+        # 新订阅立即推送缓存中的最新行情
+        if added:
+            new_subscriptions = SubscriptionSet(added)
+            records = self.tick_cache.snapshot(new_subscriptions.accepts)
+            if records:
+                async with self._send_lock:
+                    await self._send_keys(record.key for record in records)
+                    await self.websocket.send_bytes(
+                        pack_frame(FRAME_SNAPSHOT, [pack_tick(record, self.key_table) for record in records]))
+
+    async def _send_json(self, message: Dict[str, Any]) -> None:
+        async with self._send_lock:
+            await self.websocket.send_json(message)
+
+    async def _send_keys(self, keys: Iterable[Tuple[str, str, str]]) -> None:
+        """下发尚未下发的键映射，调用方须持有发送锁."""
+        new_keys = {}
+        for key in keys:
+            key_id = self.key_table.id_for(key)
+            if key_id not in self._sent_keys:
+                self._sent_keys.add(key_id)
+                new_keys[str(key_id)] = list(key)
+        if new_keys:
+            await self.websocket.send_json({"type": "keys", "keys": new_keys})
+
+    async def _send_batch(self, events: List[SSEEvent]) -> None:
+        async with self._send_lock:
+            await self._send_keys(event.key for event in events)
+            await self.websocket.send_bytes(
+                pack_frame(FRAME_TICKS, [pack_event(event, self.key_table) for event in events]))
+
+    async def _send_loop(self) -> None:
+        connection = self.connection
+        next_heartbeat = time.monotonic() + self.heartbeat_interval
+
+        # 与SSE相同: 已入队的数据立即批量发送，等待时间不超过下一次心跳或限速窗口结束
+        while connection.connected:
+            batch = await next_batch(connection.queue, next_heartbeat, self.throttle, self.max_batch)
+            if batch:
+                await self._send_batch(batch)
+                self.manager.stats.record_sent(batch)
+
+            if time.monotonic() >= next_heartbeat:
+                await self._send_json({"type": "heartbeat", "timestamp": datetime.now().isoformat()})
+                next_heartbeat = time.monotonic() + self.heartbeat_interval
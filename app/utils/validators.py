@@ -3,18 +3,21 @@
 from typing import List
 from fastapi import HTTPException, status
 from models.market_data import MarketSymbol, MarketDataType
+from models.symbol_registry import get_symbol_registry
 from app.utils.exceptions import SourceNotFoundError, InvalidParameterError
 
 
 def validate_market_symbol(market: str) -> MarketSymbol:
-    """验证并转换市场代码."""
-    try:
-        return MarketSymbol(market.upper())
-    except ValueError:
-        valid_markets = [symbol.value for symbol in MarketSymbol]
+    """验证并转换市场代码（支持标的注册表中的全部标的）."""
+    registry = get_symbol_registry()
+    symbol = registry.symbol(market)
+    if symbol is None:
+        valid_markets = [symbol.value for symbol in registry.symbols()]
+        hint = ', '.join(valid_markets[:20]) + (" 等" if len(valid_markets) > 20 else "")
         raise InvalidParameterError(
-            f"无效的市场代码: {market}。支持的市场: {', '.join(valid_markets)}"
+            f"无效的市场代码: {market}。支持的市场: {hint}"
         )
+    return symbol
 
 
 def validate_data_type(data_type: str) -> MarketDataType:
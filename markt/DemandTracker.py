@@ -0,0 +1,108 @@
+"""数据需求跟踪器."""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 需求提供者: (source_id, symbol, data_type) -> 是否存在消费者
+DemandProvider = Callable[[str, str, str], bool]
+
+
+def _key_part(value: Any) -> str:
+    """枚举成员统一转换为字符串值."""
+    return getattr(value, 'value', value)
+
+
+class DemandTracker:
+    """根据消费者需求决定数据源需要轮询的标的.
+
+    需求为已注册提供者(SSE过滤器、处理管道订阅等)与近期REST访问的并集。
+    未注册任何提供者且没有REST访问时视为全部需要，保持原有的全量轮询行为。
+    """
+
+    def __init__(self, linger_seconds: float = 60.0, warmup_seconds: float = 30.0,
+                 rest_interest_ttl: float = 300.0) -> None:
+        """初始化需求跟踪器.
+
+        Args:
+            linger_seconds: 最后一个消费者离开后继续轮询的时间(秒)
+            warmup_seconds: 启动后全量轮询的预热时间(秒)，等待消费者完成注册
+            rest_interest_ttl: 一次REST访问产生的需求有效期(秒)
+        """
+        self.linger_seconds = linger_seconds
+        self.warmup_seconds = warmup_seconds
+        self.rest_interest_ttl = rest_interest_ttl
+        self._providers: List[DemandProvider] = []
+        self._rest_interest: Dict[Tuple[str, str], float] = {}
+        self._last_demanded: Dict[Tuple[str, str], float] = {}
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_provider(self, provider: DemandProvider) -> None:
+        """注册需求提供者."""
+        with self._lock:
+            self._providers.append(provider)
+
+    def remove_provider(self, provider: DemandProvider) -> None:
+        """移除需求提供者."""
+        with self._lock:
+            if provider in self._providers:
+                self._providers.remove(provider)
+
+    def touch(self, symbol: Any, data_type: Any, ttl: Optional[float] = None) -> None:
+        """记录一次REST访问产生的需求."""
+        expires_at = time.monotonic() + (self.rest_interest_ttl if ttl is None else ttl)
+        with self._lock:
+            self._rest_interest[(_key_part(symbol), _key_part(data_type))] = expires_at
+
+    def rest_interest_keys(self) -> List[Tuple[str, str]]:
+        """获取仍在有效期内的REST访问需求 (symbol, data_type)."""
+        now = time.monotonic()
+        with self._lock:
+            return [key for key, expires_at in self._rest_interest.items() if expires_at > now]
+
+    def has_consumer(self, source_id: str, symbol: Any, data_type: Any) -> bool:
+        """检查当前是否存在消费者(不考虑预热与滞留窗口)."""
+        key = (_key_part(symbol), _key_part(data_type))
+        expires_at = self._rest_interest.get(key)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                return True
+            with self._lock:
+                if self._rest_interest.get(key) == expires_at:
+                    del self._rest_interest[key]
+
+        for provider in list(self._providers):
+            try:
+                if provider(source_id, key[0], key[1]):
+                    return True
+            except Exception:
+                # 提供者异常时保守处理，视为存在需求
+                return True
+        return False
+
+    @property
+    def unconstrained(self) -> bool:
+        """未注册提供者且没有REST访问时不限制轮询."""
+        return not self._providers and not self._rest_interest
+
+    def is_demanded(self, source_id: str, symbol: Any, data_type: Any) -> bool:
+        """检查标的是否需要轮询(包含预热与滞留窗口)."""
+        if self.unconstrained:
+            return True
+
+        now = time.monotonic()
+        if now - self._started_at < self.warmup_seconds:
+            return True
+
+        key = (_key_part(symbol), _key_part(data_type))
+        if self.has_consumer(source_id, symbol, data_type):
+            self._last_demanded[key] = now
+            return True
+
+        last_demanded = self._last_demanded.get(key)
+        return last_demanded is not None and now - last_demanded < self.linger_seconds
+
+    def filter_symbols(self, source_id: str, symbols: Iterable[Any], data_type: Any) -> List[Any]:
+        """筛选出需要轮询的标的列表."""
+        return [symbol for symbol in symbols if self.is_demanded(source_id, symbol, data_type)]
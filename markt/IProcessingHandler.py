@@ -4,4 +4,11 @@ from models.market_data import MarketData
 
 class AbstractProcessingHandler:
     def process(self, data: MarketData) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    def subscribes(self, source_id: str, symbol: str, data_type: str) -> bool:
+        """是否消费指定数据源/市场/类型的数据，用于按需轮询.
+
+        默认消费全部数据，被动处理器(如日志)可返回False以免维持轮询。
+        """
+        return True
\ No newline at end of file
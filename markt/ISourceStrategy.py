@@ -1,11 +1,13 @@
 """数据获取相关接口."""
 
 import abc
+import asyncio
 from datetime import datetime
-from typing import Any, List, Callable
+from typing import Any, Dict, List, Callable, Optional, Tuple
 
+from markt.DemandTracker import DemandTracker
 from models.market_data import MarketData, MarketDataType, MarketSourceInfo, MarketSymbol
-from wen_cai.price_data_point import ParsedTradingRule
+from wen_cai.price_data_point import ParsedTradingRule, RulesVersion
 from wen_cai.trading_hours_client import CurrentStatus, TradingDay
 
 
@@ -86,12 +88,51 @@ class ISourceStrategy(abc.ABC):
         """
         pass
 
+    # 异步版本供REST接口在事件循环中直接调用，默认在线程中执行同步实现，
+    # 有异步上游客户端的数据源应覆盖这些方法
+
+    async def get_market_status_async(self, check_time: datetime, market: MarketSymbol) -> CurrentStatus:
+        """异步获取指定时间的指定市场状态."""
+        return await asyncio.to_thread(self.get_market_status, check_time, market)
+
+    async def get_trading_hours_async(self, market: MarketSymbol) -> List[TradingDay]:
+        """异步获取指定市场交易时间表."""
+        return await asyncio.to_thread(self.get_trading_hours, market)
+
+    async def get_latest_data_async(self, market: MarketSymbol, type: MarketDataType) -> MarketData:
+        """异步获取指定市场的最新数据."""
+        return await asyncio.to_thread(self.get_latest_data, market, type)
+
+    async def get_next_opening_time_async(self, market: MarketSymbol) -> ParsedTradingRule:
+        """异步获取指定市场的下一个开盘时间."""
+        return await asyncio.to_thread(self.get_next_opening_time, market)
+
+    async def get_latest_batch_async(self, keys: List[Tuple[MarketSymbol, MarketDataType]]
+                                     ) -> Dict[Tuple[MarketSymbol, MarketDataType], Any]:
+        """批量获取最新数据，返回 (市场, 类型) -> 数据或获取失败的异常.
+
+        默认并发调用 get_latest_data_async，能合并上游请求的数据源应覆盖此方法。
+        """
+        results = await asyncio.gather(*(self.get_latest_data_async(market, data_type) for market, data_type in keys),
+                                       return_exceptions=True)
+        return dict(zip(keys, results))
+
+    async def get_rules_version_async(self, market: MarketSymbol) -> Optional[RulesVersion]:
+        """获取指定市场交易规则的版本，用于缓存交易日历类响应；返回 None 时不缓存."""
+        return None
+
+    async def get_next_status_change_async(self, market: MarketSymbol) -> Optional[datetime]:
+        """获取指定市场状态下一次可能变化的时间；返回 None 时依赖当前时间的响应不缓存."""
+        return None
+
 
 class AbstractFetcher(ISourceStrategy):
     """抽象数据获取器，实现观察者模式."""
 
     def __init__(self) -> None:
         self._observers: List[Callable[[MarketData], None]] = []
+        # 消费者需求跟踪，决定轮询哪些标的
+        self.demand = DemandTracker()
 
     def attach(self, observer: Callable[[MarketData], None]) -> None:
         self._observers.append(observer)
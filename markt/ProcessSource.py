@@ -0,0 +1,268 @@
+"""工作进程数据源.
+
+将数据源的轮询、解析与处理管道放到独立的工作进程中运行，工作进程通过共享内存
+环形缓冲区把 MarketData 传回API进程，API进程只负责数据分发，避免与其他数据源或
+请求处理争用同一个GIL。
+"""
+
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from markt.ISourceStrategy import AbstractFetcher, ISourceStrategy
+from models.market_data import MarketData, MarketDataType, MarketSourceInfo, MarketSymbol, TickRecord
+from models.symbol_registry import SymbolSpec, get_symbol_registry
+from utils.logger_config import setup_logger
+from utils.shm_ring import RingOverflowError, ShmRingBuffer
+from wen_cai.price_data_point import ParsedTradingRule, RulesVersion
+from wen_cai.trading_hours_client import CurrentStatus, TradingDay
+
+logger = setup_logger('process_source')
+
+# 向工作进程同步需求的数据类型
+_DEMAND_TYPES = [MarketDataType.REALTIME, MarketDataType.KLINE1M]
+
+
+def _encode_market_data(data: MarketData) -> bytes:
+    """编码为传输负载."""
+    return TickRecord.from_market_data(data).to_json().encode('utf-8')
+
+
+def _decode_market_data(payload: bytes) -> MarketData:
+    """从传输负载解码."""
+    return TickRecord.from_dict(json.loads(payload)).to_market_data()
+
+
+def _worker_main(source_factory: Callable[[], ISourceStrategy], ring_name: str,
+                 control_queue: multiprocessing.Queue, specs: List[SymbolSpec],
+                 handler_factory: Optional[Callable[[], List[Any]]]) -> None:
+    """工作进程入口."""
+    from utils.scheduler import get_scheduler
+
+    registry = get_symbol_registry()
+    for spec in specs:
+        registry.register(spec)
+
+    ring = ShmRingBuffer.attach(ring_name)
+    source = source_factory()
+    handlers = handler_factory() if handler_factory else []
+    source_name = source.get_source_info().source_name
+
+    def publish(data: MarketData) -> None:
+        for handler in handlers:
+            try:
+                handler.process(data)
+            except Exception as e:
+                logger.error(f"❌ 工作进程处理管道异常: {e}")
+        try:
+            ring.publish(_encode_market_data(data))
+        except RingOverflowError as e:
+            logger.error(f"❌ 工作进程发布数据失败: {e}")
+
+    # 需求由API进程同步，None表示不限制
+    demand: Dict[str, Any] = {"keys": None}
+
+    def demand_provider(source_id: str, symbol: str, data_type: str) -> bool:
+        keys = demand["keys"]
+        return keys is None or (symbol, data_type) in keys
+
+    source.attach(publish)
+    source.demand.add_provider(demand_provider)
+    source.start()
+    logger.info(f"✅ 工作进程已启动: {source_name}")
+
+    try:
+        while True:
+            command, payload = control_queue.get()
+            if command == 'demand':
+                demand["keys"] = payload
+            elif command == 'stop':
+                break
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        source.stop()
+        get_scheduler().shutdown()
+        ring.close()
+        logger.info(f"🛑 工作进程已退出: {source_name}")
+
+
+class ProcessSource(AbstractFetcher):
+    """在独立工作进程中运行的数据源代理.
+
+    行情轮询与处理管道在工作进程中执行；交易时间、最新数据等查询接口由API进程内的
+    本地实例直接处理。
+    """
+
+    # 读取方空闲时的轮询间隔(秒)
+    POLL_INTERVAL = 0.005
+    # 向工作进程同步需求的间隔(秒)
+    DEMAND_SYNC_INTERVAL = 1.0
+
+    def __init__(self, source_factory: Callable[[], ISourceStrategy],
+                 handler_factory: Optional[Callable[[], List[Any]]] = None,
+                 capacity: int = 4096, slot_size: int = 512) -> None:
+        """初始化工作进程数据源.
+
+        Args:
+            source_factory: 数据源工厂（需可被pickle，如数据源类）
+            handler_factory: 在工作进程中构建处理管道的工厂函数（需可被pickle）
+            capacity: 环形缓冲区槽位数
+            slot_size: 槽位大小(字节)
+        """
+        super().__init__()
+        self.source_factory = source_factory
+        self.handler_factory = handler_factory
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self._local = source_factory()
+        self._ring: Optional[ShmRingBuffer] = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._control_queue = None
+        self._reader: Optional[threading.Thread] = None
+        self._running = False
+        self.received = 0
+
+    def start(self) -> None:
+        """启动工作进程与读取线程."""
+        ctx = multiprocessing.get_context('spawn')
+        self._ring = ShmRingBuffer.create(self.capacity, self.slot_size)
+        self._control_queue = ctx.Queue()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(self.source_factory, self._ring.name, self._control_queue,
+                  get_symbol_registry().specs(), self.handler_factory),
+            name=f"source-{self.get_source_info().source_id}",
+            daemon=True
+        )
+        self._process.start()
+
+        self._running = True
+        self._reader = threading.Thread(target=self._read_loop, name='process-source-reader', daemon=True)
+        self._reader.start()
+        logger.info(f"🚀 启动工作进程数据源: {self.get_source_info().source_name} (pid={self._process.pid})")
+
+    def stop(self) -> None:
+        """停止工作进程并释放共享内存."""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._control_queue.put(('stop', None))
+        except Exception:
+            pass
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._reader.join(timeout=2)
+        self._ring.close()
+        logger.warning(f"🛑 工作进程数据源已停止: {self.get_source_info().source_name}")
+
+    def get_transport_stats(self) -> Dict[str, Any]:
+        """获取共享内存传输统计."""
+        return {
+            "worker_alive": bool(self._process and self._process.is_alive()),
+            "received": self.received,
+            "dropped": self._ring.dropped if self._ring else 0,
+            "read_seq": self._ring.read_seq if self._ring else 0,
+            "write_seq": self._ring.write_seq if self._ring and self._running else 0,
+        }
+
+    def _read_loop(self) -> None:
+        idle_sleep = self.POLL_INTERVAL
+        last_sync = 0.0
+        last_demand: Any = ()
+        while self._running:
+            now = time.monotonic()
+            if now - last_sync >= self.DEMAND_SYNC_INTERVAL:
+                last_sync = now
+                last_demand = self._sync_demand(last_demand)
+
+            messages, dropped = self._ring.read()
+            if dropped:
+                logger.warning(f"⚠️ 共享内存缓冲区溢出，丢失 {dropped} 条数据")
+            for payload in messages:
+                try:
+                    self.received += 1
+                    self.notify(_decode_market_data(payload))
+                except Exception as e:
+                    logger.error(f"❌ 处理工作进程数据失败: {e}")
+
+            if messages:
+                idle_sleep = self.POLL_INTERVAL
+            else:
+                time.sleep(idle_sleep)
+                idle_sleep = min(idle_sleep * 2, 0.05)
+
+    def _sync_demand(self, last_demand: Any) -> Any:
+        """将API进程的消费需求同步给工作进程，仅在变化时发送."""
+        source_id = self.get_source_info().source_id
+        if self.demand.unconstrained:
+            keys = None
+        else:
+            keys = {
+                (symbol.value, data_type.value)
+                for symbol in get_symbol_registry().symbols()
+                for data_type in _DEMAND_TYPES
+                if self.demand.has_consumer(source_id, symbol, data_type)
+            }
+        if keys != last_demand:
+            try:
+                self._control_queue.put_nowait(('demand', keys))
+            except queue.Full:
+                return last_demand
+        return keys
+
+    # 查询接口由本地实例处理
+    def get_source_info(self) -> MarketSourceInfo:
+        """获取数据源信息."""
+        return self._local.get_source_info()
+
+    def get_market_status(self, check_time: datetime, market: MarketSymbol) -> CurrentStatus:
+        """获取指定时间的指定市场状态."""
+        return self._local.get_market_status(check_time, market)
+
+    def get_trading_hours(self, market: MarketSymbol) -> List[TradingDay]:
+        """获取指定市场交易时间表."""
+        return self._local.get_trading_hours(market)
+
+    def get_latest_data(self, market: MarketSymbol, type: MarketDataType) -> MarketData:
+        """获取指定市场的最新数据."""
+        return self._local.get_latest_data(market, type)
+
+    def get_next_opening_time(self, market: MarketSymbol) -> ParsedTradingRule:
+        """获取指定市场的下一个开盘时间."""
+        return self._local.get_next_opening_time(market)
+
+    async def get_market_status_async(self, check_time: datetime, market: MarketSymbol) -> CurrentStatus:
+        """异步获取指定时间的指定市场状态."""
+        return await self._local.get_market_status_async(check_time, market)
+
+    async def get_trading_hours_async(self, market: MarketSymbol) -> List[TradingDay]:
+        """异步获取指定市场交易时间表."""
+        return await self._local.get_trading_hours_async(market)
+
+    async def get_latest_data_async(self, market: MarketSymbol, type: MarketDataType) -> MarketData:
+        """异步获取指定市场的最新数据."""
+        return await self._local.get_latest_data_async(market, type)
+
+    async def get_next_opening_time_async(self, market: MarketSymbol) -> ParsedTradingRule:
+        """异步获取指定市场的下一个开盘时间."""
+        return await self._local.get_next_opening_time_async(market)
+
+    async def get_latest_batch_async(self, keys: List[Tuple[MarketSymbol, MarketDataType]]
+                                     ) -> Dict[Tuple[MarketSymbol, MarketDataType], Any]:
+        """批量获取最新数据，返回 (市场, 类型) -> 数据或获取失败的异常."""
+        return await self._local.get_latest_batch_async(keys)
+
+    async def get_rules_version_async(self, market: MarketSymbol) -> Optional[RulesVersion]:
+        """获取指定市场交易规则的版本."""
+        return await self._local.get_rules_version_async(market)
+
+    async def get_next_status_change_async(self, market: MarketSymbol) -> Optional[datetime]:
+        """获取指定市场状态下一次可能变化的时间."""
+        return await self._local.get_next_status_change_async(market)
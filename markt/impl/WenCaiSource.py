@@ -1,14 +1,17 @@
+import asyncio
 from datetime import datetime
-from typing import List, Dict, Optional
-from apscheduler.schedulers.background import BackgroundScheduler
+from typing import Any, List, Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
 
 from markt.ISourceStrategy import AbstractFetcher
-from models.market_data import MarketDataType, MarketSourceInfo, MarketSymbol, MarketData
-from wen_cai.price_data_point import ParsedTradingRule, SinaPriceDataPoint
+from models.market_data import MarketDataType, MarketSourceInfo, MarketSymbol, MarketData, normalize_timestamp
+from models.symbol_registry import Symbol, SymbolSpec, get_symbol_registry
+from wen_cai.price_data_point import ParsedTradingRule, RulesVersion, SinaPriceDataPoint
 from wen_cai.sina_realtime_quote_client import SinaRealtimeQuoteClient
 from wen_cai.trading_hours_client import CurrentStatus, TradingDay, TradingHoursClient
 from wen_cai.wen_cai_client import WenCaiClient
 from utils.logger_config import setup_logger
+from utils.scheduler import get_scheduler
 
 logger = setup_logger('wen_cai_source')
 
@@ -18,15 +21,12 @@ class WenCaiSource(AbstractFetcher):
 
     def __init__(self):
         super().__init__()
-        self.mapping = {
-            'rt_hkHSI': MarketSymbol.HSI.value,
-            'gb_ixic': MarketSymbol.NASDAQ.value,
-            '176_HSI': MarketSymbol.HSI.value,
-            '88_IXIC': MarketSymbol.NASDAQ.value,
-            '纳斯达克': MarketSymbol.NASDAQ.value,
-            '恒生指数': MarketSymbol.HSI.value,
-        }
-        self.lastUpdateTime: Optional[datetime] = None
+        # 标的ID与新浪、同花顺代码及交易日历的映射
+        self.registry = get_symbol_registry()
+        # 标的 -> 已推送的最新分钟K线时间（北京时间）
+        self._kline_watermarks: Dict[Symbol, datetime] = {}
+        # 在共享调度器中注册的任务
+        self._job_ids: List[str] = []
 
         # Clients
         self.wen_cai_client = WenCaiClient()
@@ -38,115 +38,208 @@ class WenCaiSource(AbstractFetcher):
         source_info = self.get_source_info()
         logger.info(f"🚀 启动数据源: {source_info.source_name} ({source_info.source_id})")
         
-        scheduler1 = BackgroundScheduler()
-        scheduler1.add_job(self._tick_update_realtime, 'interval', seconds=2)
-        scheduler1.start()
+        scheduler = get_scheduler()
+        self._job_ids.append(scheduler.add_interval_job(
+            self._tick_update_realtime, seconds=2, job_id=f"{source_info.source_id}.realtime",
+            jitter=0.2, misfire_grace=2))
         logger.info("✅ 实时数据更新任务已启动 (每2秒)")
 
-        scheduler2 = BackgroundScheduler()
-        scheduler2.add_job(self._tick_update_kline, 'interval', seconds=15)
-        scheduler2.start()
+        self._job_ids.append(scheduler.add_interval_job(
+            self._tick_update_kline, seconds=15, job_id=f"{source_info.source_id}.kline",
+            jitter=1.0, misfire_grace=15))
         logger.info("✅ K线数据更新任务已启动 (每15秒)")
 
     def stop(self) -> None:
         """停止数据源."""
         logger.warning("🛑 停止问财数据源")
+        scheduler = get_scheduler()
+        for job_id in self._job_ids:
+            scheduler.remove_job(job_id)
+        self._job_ids.clear()
 
     def get_source_info(self) -> MarketSourceInfo:
         """获取数据源ID."""
         return MarketSourceInfo(
             source_id="wen_cai",
             source_name="问财",
-            supported_markets=[MarketSymbol.HSI, MarketSymbol.NASDAQ]
+            supported_markets=self.registry.symbols()
         )
 
     def get_market_status(self, check_time: datetime, market: MarketSymbol) -> CurrentStatus:
         """获取指定时间的指定市场状态."""
-        return self.trading_hours_client.get_current_trading_status(market.value)
+        return self.trading_hours_client.get_current_trading_status(self.registry.spec(market).calendar)
 
     def get_trading_hours(self, market: MarketSymbol) -> List[TradingDay]:
         """获取指定市场交易时间表."""
-        return self.trading_hours_client.get_all_trading_days(market.value)
+        return self.trading_hours_client.get_all_trading_days(self.registry.spec(market).calendar)
 
     def get_latest_data(self, market: MarketSymbol, data_type: MarketDataType) -> SinaPriceDataPoint:
         """获取指定市场指定类型的最新数据."""
-        if data_type not in [MarketDataType.REALTIME, MarketDataType.KLINE1M]:
-            raise ValueError(f"不支持的数据类型: {data_type}")
-
+        spec = self._latest_spec(market, data_type)
         if data_type == MarketDataType.REALTIME:
-            result = self._get_sina_realtime_quote([market])
-            _, first_value = next(iter(result.items()))
-            return self._mapping(first_value)
-        else:
-            if market == MarketSymbol.HSI:
-                return self._mapping(self.wen_cai_client.get_hsi_kline()[-1])
-            elif market == MarketSymbol.NASDAQ:
-                return self._mapping(self.wen_cai_client.get_nasdaq_kline()[-1])
+            return self._latest_realtime(spec, self._get_sina_realtime_quote([market]))
+        return self._latest_kline(spec, self.wen_cai_client.get_data(spec.ths_code))
             
     def get_next_opening_time(self, market: MarketSymbol) -> ParsedTradingRule:
         """获取指定市场的下一个开盘时间."""
-        return self.trading_hours_client.get_next_opening_time(market.value)
+        return self.trading_hours_client.get_next_opening_time(self.registry.spec(market).calendar)
+
+    async def get_market_status_async(self, check_time: datetime, market: MarketSymbol) -> CurrentStatus:
+        """异步获取指定时间的指定市场状态."""
+        return await self.trading_hours_client.get_current_trading_status_async(self.registry.spec(market).calendar)
 
-    def _get_sina_realtime_quote(self, markets: List[MarketSymbol]) -> Dict[str, SinaPriceDataPoint]:
+    async def get_trading_hours_async(self, market: MarketSymbol) -> List[TradingDay]:
+        """异步获取指定市场交易时间表."""
+        return await self.trading_hours_client.get_all_trading_days_async(self.registry.spec(market).calendar)
+
+    async def get_latest_data_async(self, market: MarketSymbol, data_type: MarketDataType) -> SinaPriceDataPoint:
+        """异步获取指定市场指定类型的最新数据."""
+        spec = self._latest_spec(market, data_type)
+        if data_type == MarketDataType.REALTIME:
+            quotes = await self.sina_realtime_quote_client.fetch_sina_quotes_async([spec.sina_code])
+            return self._latest_realtime(spec, quotes)
+        return self._latest_kline(spec, await self.wen_cai_client.get_data_async(spec.ths_code))
+
+    async def get_next_opening_time_async(self, market: MarketSymbol) -> ParsedTradingRule:
+        """异步获取指定市场的下一个开盘时间."""
+        return await self.trading_hours_client.get_next_opening_time_async(self.registry.spec(market).calendar)
+
+    async def get_rules_version_async(self, market: MarketSymbol) -> Optional[RulesVersion]:
+        """获取指定市场交易规则的版本."""
+        return await self.trading_hours_client.get_rules_version_async(self.registry.spec(market).calendar)
+
+    async def get_next_status_change_async(self, market: MarketSymbol) -> Optional[datetime]:
+        """获取指定市场状态下一次可能变化的时间."""
+        return await self.trading_hours_client.get_next_status_change_async(self.registry.spec(market).calendar)
+
+    async def get_latest_batch_async(self, keys: List[Tuple[MarketSymbol, MarketDataType]]
+                                     ) -> Dict[Tuple[MarketSymbol, MarketDataType], Any]:
+        """批量获取最新数据: 实时行情合并为一次新浪请求，分钟K线并发请求."""
+        results: Dict[Tuple[MarketSymbol, MarketDataType], Any] = {}
+        realtime, kline = [], []
+        for key in keys:
+            try:
+                spec = self._latest_spec(*key)
+            except ValueError as e:
+                results[key] = e
+                continue
+            (realtime if key[1] == MarketDataType.REALTIME else kline).append((key, spec))
+
+        quotes, kline_lists = await asyncio.gather(
+            self.sina_realtime_quote_client.fetch_sina_quotes_async([spec.sina_code for _, spec in realtime]),
+            asyncio.gather(*(self.wen_cai_client.get_data_async(spec.ths_code) for _, spec in kline),
+                           return_exceptions=True))
+        for key, spec in realtime:
+            try:
+                results[key] = self._latest_realtime(spec, quotes)
+            except ValueError as e:
+                results[key] = e
+        for (key, spec), kline_list in zip(kline, kline_lists):
+            try:
+                results[key] = kline_list if isinstance(kline_list, Exception) else self._latest_kline(spec, kline_list)
+            except ValueError as e:
+                results[key] = e
+        return results
+
+    def _latest_spec(self, market: MarketSymbol, data_type: MarketDataType) -> SymbolSpec:
+        if data_type not in [MarketDataType.REALTIME, MarketDataType.KLINE1M]:
+            raise ValueError(f"不支持的数据类型: {data_type}")
+        spec = self.registry.spec(market)
+        if data_type == MarketDataType.KLINE1M and not spec.ths_code:
+            raise ValueError(f"{spec.symbol_id} 不支持分钟K线数据")
+        return spec
+
+    def _latest_realtime(self, spec: SymbolSpec, quotes: Dict[str, SinaPriceDataPoint]) -> SinaPriceDataPoint:
+        if spec.sina_code not in quotes:
+            raise ValueError(f"未获取到 {spec.symbol_id} 的实时行情")
+        data_point = quotes[spec.sina_code]
+        data_point.time = self._source_time(spec, data_point.time)
+        return self._mapping(data_point)
+
+    def _latest_kline(self, spec: SymbolSpec, kline_list: Optional[List[SinaPriceDataPoint]]) -> SinaPriceDataPoint:
+        if not kline_list:
+            raise ValueError(f"未获取到 {spec.symbol_id} 的分钟K线数据")
+        data_point = kline_list[-1]
+        data_point.time = self._source_time(spec, data_point.time)
+        return self._mapping(data_point)
+
+    def _source_time(self, spec: SymbolSpec, value: datetime) -> datetime:
+        """行情时间统一为北京时间，无时区的时间（同花顺分钟K线）按标的交易日历所在时区解释."""
+        data_source = self.trading_hours_client.data_sources.get(spec.calendar)
+        return normalize_timestamp(value, ZoneInfo(data_source.timezone) if data_source else None)
+
+    def _get_sina_realtime_quote(self, markets: List[Symbol]) -> Dict[str, SinaPriceDataPoint]:
         stock_codes_to_fetch = []
         for m in markets:
-            if m == MarketSymbol.HSI:
-                stock_codes_to_fetch.append('rt_hkHSI')
-            elif m == MarketSymbol.NASDAQ:
-                stock_codes_to_fetch.append('gb_ixic')
+            spec = self.registry.get(m)
+            if spec:
+                stock_codes_to_fetch.append(spec.sina_code)
         return self.sina_realtime_quote_client.fetch_sina_quotes(stock_codes_to_fetch)
 
     def _mapping(self, data_point: SinaPriceDataPoint) -> SinaPriceDataPoint:
-        data_point.name = self.mapping.get(data_point.name, data_point.name)
+        symbol = self.registry.find(data_point.name)
+        if symbol is not None:
+            data_point.name = symbol.value
         return data_point
 
+    def _open_markets(self, markets: List[Symbol]) -> List[Symbol]:
+        """筛选出当前处于开盘状态的标的，每个交易日历只查询一次."""
+        calendar_status: Dict[str, bool] = {}
+        result = []
+        for market in markets:
+            calendar = self.registry.spec(market).calendar
+            if calendar not in calendar_status:
+                calendar_status[calendar] = self.trading_hours_client.get_current_trading_status(calendar).is_open
+            if calendar_status[calendar]:
+                result.append(market)
+        return result
+
     def _tick_update_realtime(self) -> None:
         """实时数据更新"""
-        now = datetime.now()
-        if not self.get_market_status(now, MarketSymbol.HSI).is_open and \
-                not self.get_market_status(now, MarketSymbol.NASDAQ).is_open:
+        source_id = self.get_source_info().source_id
+        markets = self.demand.filter_symbols(source_id, self.registry.symbols(), MarketDataType.REALTIME)
+        markets = self._open_markets(markets)
+        if not markets:
             return
 
-        results = self._get_sina_realtime_quote([MarketSymbol.HSI, MarketSymbol.NASDAQ])
+        results = self._get_sina_realtime_quote(markets)
         for key, value in results.items():
-            symbol_str = self.mapping.get(key)
-            if symbol_str:
-                # 从字符串转换为枚举成员
-                symbol_enum = MarketSymbol(symbol_str)
+            symbol = self.registry.find(key)
+            if symbol is not None:
                 self.notify(MarketData(
-                    source=self.get_source_info().source_id,
-                    symbol=symbol_enum,
+                    source=source_id,
+                    symbol=symbol,
                     type=MarketDataType.REALTIME,
                     price=value.price,
-                    timestamp=value.time
+                    timestamp=self._source_time(self.registry.spec(symbol), value.time)
                 ))
 
     def _tick_update_kline(self) -> None:
         """K线数据更新"""
-        all_data_sources = {
-            MarketSymbol.HSI: self.wen_cai_client.get_hsi_kline,
-            MarketSymbol.NASDAQ: self.wen_cai_client.get_nasdaq_kline
-        }
+        source_id = self.get_source_info().source_id
+        kline_symbols = [symbol for symbol in self.registry.symbols() if self.registry.spec(symbol).ths_code]
+        demanded = self.demand.filter_symbols(source_id, kline_symbols, MarketDataType.KLINE1M)
 
-        fetch_status = True
-        for symbol, data_fetcher in all_data_sources.items():
+        for symbol in demanded:
             try:
-                kline_list = data_fetcher()
+                spec = self.registry.spec(symbol)
+                kline_list = self.wen_cai_client.get_data(spec.ths_code)
                 if not kline_list:
                     continue
 
+                # 只推送晚于该标的上次已推送K线的数据，各标的互不影响
+                watermark = self._kline_watermarks.get(symbol)
                 for item in kline_list:
-                    if self.lastUpdateTime is None or item.time > self.lastUpdateTime:
+                    timestamp = self._source_time(spec, item.time)
+                    if watermark is None or timestamp > watermark:
                         self.notify(MarketData(
-                            source=self.get_source_info().source_id,
+                            source=source_id,
                             symbol=symbol,
                             type=MarketDataType.KLINE1M,
                             price=item.price,
-                            timestamp=item.time
+                            timestamp=timestamp
                         ))
+                        self._kline_watermarks[symbol] = watermark = timestamp
             except Exception as e:
-                fetch_status = False
                 logger.error(f"❌ 更新 {symbol.value} K线数据时出错: {e}")
-        if fetch_status:
-            self.lastUpdateTime = datetime.now()
         
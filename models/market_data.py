@@ -1,9 +1,13 @@
 """市场数据模型."""
-from dataclasses import dataclass, asdict
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
 from typing import List, Optional, Dict, Any
 from enum import Enum
 import json
+import sys
+
+# 数据源返回的无时区时间统一按北京时间解释
+BEIJING_TZ = timezone(timedelta(hours=8), 'Asia/Shanghai')
 
 class MarketDataType(Enum):
     """市场数据类型."""
@@ -25,12 +29,33 @@ class MarketSymbol(Enum):
     HSI = "HSI"
     NASDAQ = "NASDAQ"
 
+
+class InstrumentSymbol:
+    """运行时注册的标的代码，接口与 MarketSymbol 成员一致(name/value).
+
+    实例由标的注册表统一创建并复用，不应直接构造。
+    """
+    __slots__ = ('name', 'value')
+
+    def __init__(self, value: str) -> None:
+        self.name = value
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, InstrumentSymbol) and other.value == self.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return f"<InstrumentSymbol.{self.value}>"
+
 @dataclass
 class MarketData():
     """市场数据模型."""
     # 数据源
     source: str
-    # 市场代码
+    # 市场代码 (MarketSymbol 或注册表中的 InstrumentSymbol)
     symbol: MarketSymbol
     # 类型
     type: MarketDataType
@@ -55,13 +80,22 @@ class MarketData():
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典，用于JSON序列化."""
-        data = asdict(self)
-        # 转换枚举值
-        data['symbol'] = self.symbol.value
-        data['type'] = self.type.value
-        # 格式化时间戳
-        data['timestamp'] = self.timestamp.strftime('%Y-%m-%d %H:%M:%S')
-        return data
+        return {
+            'source': self.source,
+            # 转换枚举值
+            'symbol': self.symbol.value,
+            'type': self.type.value,
+            'price': self.price,
+            # 格式化时间戳
+            'timestamp': self.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            'volume': self.volume,
+            'open_price': self.open_price,
+            'high_price': self.high_price,
+            'low_price': self.low_price,
+            'close_price': self.close_price,
+            'change': self.change,
+            'change_percent': self.change_percent,
+        }
     
     def to_json(self) -> str:
         """转换为JSON字符串."""
@@ -79,6 +113,109 @@ class MarketData():
                 f"({self.type.value}) -> ¥{self.price:.2f}")
 
 
+# MarketData 中的可选字段
+OPTIONAL_FIELDS = ('volume', 'open_price', 'high_price', 'low_price', 'close_price', 'change', 'change_percent')
+
+
+def normalize_timestamp(value: datetime, tz: Optional[tzinfo] = None) -> datetime:
+    """统一为北京时间的带时区时间，无时区的时间按数据源所在时区 tz 解释（未指定时按北京时间）.
+
+    数据源在创建 MarketData 时调用一次，实时推送、快照与跨进程传输后的时间戳序列化结果一致。
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz or BEIJING_TZ)
+    return value.astimezone(BEIJING_TZ)
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """转换为毫秒时间戳，无时区的时间按北京时间处理."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=BEIJING_TZ)
+    return int(value.timestamp() * 1000)
+
+
+class TickRecord:
+    """紧凑的行情记录，用于热路径上的保留、传输与序列化.
+
+    使用 __slots__ 存储，时间戳为毫秒整数，枚举成员与数据源字符串复用同一对象，
+    序列化时跳过值为 None 的字段。
+    """
+    __slots__ = ('source', 'symbol', 'type', 'price', 'ts_ms') + OPTIONAL_FIELDS
+
+    def __init__(self, source: str, symbol: MarketSymbol, type: MarketDataType, price: float, ts_ms: int,
+                 volume: Optional[int] = None, open_price: Optional[float] = None,
+                 high_price: Optional[float] = None, low_price: Optional[float] = None,
+                 close_price: Optional[float] = None, change: Optional[float] = None,
+                 change_percent: Optional[float] = None) -> None:
+        self.source = sys.intern(source)
+        self.symbol = symbol
+        self.type = type
+        self.price = price
+        self.ts_ms = ts_ms
+        self.volume = volume
+        self.open_price = open_price
+        self.high_price = high_price
+        self.low_price = low_price
+        self.close_price = close_price
+        self.change = change
+        self.change_percent = change_percent
+
+    @classmethod
+    def from_market_data(cls, data: MarketData) -> 'TickRecord':
+        """从 MarketData 转换."""
+        return cls(data.source, data.symbol, data.type, data.price, to_epoch_ms(data.timestamp),
+                   data.volume, data.open_price, data.high_price, data.low_price,
+                   data.close_price, data.change, data.change_percent)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TickRecord':
+        """从 to_dict 的输出还原，标的代码通过注册表复用同一对象."""
+        from models.symbol_registry import get_symbol_registry
+
+        symbol = get_symbol_registry().symbol(data['symbol']) or InstrumentSymbol(data['symbol'])
+        return cls(data['source'], symbol, MarketDataType(data['type']), data['price'], data['timestamp'],
+                   **{name: data[name] for name in OPTIONAL_FIELDS if name in data})
+
+    @property
+    def timestamp(self) -> datetime:
+        """北京时间的时间戳."""
+        return datetime.fromtimestamp(self.ts_ms / 1000, BEIJING_TZ)
+
+    @property
+    def key(self) -> tuple:
+        """(数据源, 市场, 类型) 键."""
+        return (self.source, self.symbol.value, self.type.value)
+
+    def to_market_data(self) -> MarketData:
+        """转换为 MarketData."""
+        return MarketData(self.source, self.symbol, self.type, self.price, self.timestamp,
+                          self.volume, self.open_price, self.high_price, self.low_price,
+                          self.close_price, self.change, self.change_percent)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，跳过值为 None 的字段，时间戳为毫秒整数."""
+        data = {
+            'source': self.source,
+            'symbol': self.symbol.value,
+            'type': self.type.value,
+            'price': self.price,
+            'timestamp': self.ts_ms,
+        }
+        for name in OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    def to_json(self) -> str:
+        """转换为紧凑的JSON字符串."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    def __repr__(self) -> str:
+        return (f"TickRecord(source={self.source}, symbol={self.symbol.value}, type={self.type.value}, "
+                f"price={self.price}, ts_ms={self.ts_ms})")
+
+
 @dataclass
 class MarketSourceInfo():
     """市场数据源信息模型."""
@@ -0,0 +1,146 @@
+"""运行时标的注册表."""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from models.market_data import InstrumentSymbol, MarketSymbol
+
+Symbol = Union[MarketSymbol, InstrumentSymbol]
+
+
+@dataclass(frozen=True)
+class SymbolSpec:
+    """标的注册信息."""
+    # 系统内标的ID，如 HSI、NASDAQ、HK00700、AAPL
+    symbol_id: str
+    # 新浪行情代码，如 rt_hkHSI、gb_ixic
+    sina_code: str
+    # 同花顺(10jqka)分时代码，如 176_HSI；为空表示不支持分钟K线
+    ths_code: Optional[str] = None
+    # 交易日历，对应 TradingHoursClient 支持的市场(HK、NASDAQ)
+    calendar: str = "HK"
+    # 显示名称
+    name: Optional[str] = None
+    # 上游返回的其他名称，用于反查标的
+    aliases: Tuple[str, ...] = field(default_factory=tuple)
+
+
+class SymbolRegistry:
+    """标的注册表，维护系统标的ID与新浪、同花顺代码及交易日历的映射."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._specs: Dict[str, SymbolSpec] = {}
+        self._symbols: Dict[str, Symbol] = {}
+        self._lookup: Dict[str, str] = {}
+
+    def register(self, spec: SymbolSpec) -> Symbol:
+        """注册标的，返回对应的标的代码对象(内置市场返回 MarketSymbol 成员)."""
+        with self._lock:
+            if spec.symbol_id in self._specs:
+                self.unregister(spec.symbol_id)
+
+            try:
+                symbol: Symbol = MarketSymbol(spec.symbol_id)
+            except ValueError:
+                symbol = InstrumentSymbol(spec.symbol_id)
+
+            self._specs[spec.symbol_id] = spec
+            self._symbols[spec.symbol_id] = symbol
+            for key in self._lookup_keys(spec):
+                self._lookup[key] = spec.symbol_id
+            return symbol
+
+    def unregister(self, symbol_id: str) -> None:
+        """移除标的."""
+        with self._lock:
+            spec = self._specs.pop(symbol_id, None)
+            self._symbols.pop(symbol_id, None)
+            if spec:
+                for key in self._lookup_keys(spec):
+                    if self._lookup.get(key) == symbol_id:
+                        del self._lookup[key]
+
+    def get(self, symbol: Any) -> Optional[SymbolSpec]:
+        """获取标的注册信息，参数可为标的代码对象或标的ID."""
+        return self._specs.get(getattr(symbol, 'value', symbol))
+
+    def spec(self, symbol: Any) -> SymbolSpec:
+        """获取标的注册信息，未注册时抛出 ValueError."""
+        spec = self.get(symbol)
+        if spec is None:
+            raise ValueError(f"未注册的标的: {getattr(symbol, 'value', symbol)}")
+        return spec
+
+    def symbol(self, symbol_id: str) -> Optional[Symbol]:
+        """根据标的ID获取标的代码对象，大小写不敏感."""
+        symbol = self._symbols.get(symbol_id)
+        if symbol is None:
+            symbol = self._symbols.get(symbol_id.upper())
+        return symbol
+
+    def find(self, code: str) -> Optional[Symbol]:
+        """根据新浪代码、同花顺代码、名称或别名反查标的."""
+        symbol_id = self._lookup.get(code)
+        return self._symbols.get(symbol_id) if symbol_id else None
+
+    def symbols(self) -> List[Symbol]:
+        """获取全部已注册标的."""
+        with self._lock:
+            return list(self._symbols.values())
+
+    def specs(self) -> List[SymbolSpec]:
+        """获取全部标的注册信息."""
+        with self._lock:
+            return list(self._specs.values())
+
+    def load_json(self, path: str) -> int:
+        """从JSON文件批量注册标的，返回注册数量.
+
+        文件内容为对象列表，字段与 SymbolSpec 一致。
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+
+        for item in items:
+            item = dict(item)
+            item['aliases'] = tuple(item.get('aliases') or ())
+            self.register(SymbolSpec(**item))
+        return len(items)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @staticmethod
+    def _lookup_keys(spec: SymbolSpec) -> List[str]:
+        keys = [spec.symbol_id, spec.sina_code]
+        if spec.ths_code:
+            keys.append(spec.ths_code)
+        if spec.name:
+            keys.append(spec.name)
+        keys.extend(spec.aliases)
+        return keys
+
+
+# 内置标的
+DEFAULT_SYMBOLS = [
+    SymbolSpec(symbol_id="HSI", sina_code="rt_hkHSI", ths_code="176_HSI", calendar="HK",
+               name="恒生指数"),
+    SymbolSpec(symbol_id="NASDAQ", sina_code="gb_ixic", ths_code="88_IXIC", calendar="NASDAQ",
+               name="纳斯达克"),
+]
+
+# 全局标的注册表实例
+_symbol_registry = None
+
+
+def get_symbol_registry() -> SymbolRegistry:
+    """获取标的注册表实例."""
+    global _symbol_registry
+    if _symbol_registry is None:
+        _symbol_registry = SymbolRegistry()
+        for spec in DEFAULT_SYMBOLS:
+            _symbol_registry.register(spec)
+    return _symbol_registry
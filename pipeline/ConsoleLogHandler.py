@@ -22,6 +22,10 @@ class ConsoleLogHandler(AbstractProcessingHandler):
         """
         self.format_type = format_type
 
+    def subscribes(self, source_id: str, symbol: str, data_type: str) -> bool:
+        """日志处理器仅被动输出流经的数据，不产生轮询需求."""
+        return False
+
     def process(self, data: MarketData) -> Any:
         """处理数据，打印数据到控制台.
         
@@ -7,7 +7,7 @@ from typing import Any, Optional, Dict
 import requests
 
 from markt.IProcessingHandler import AbstractProcessingHandler
-from models.market_data import MarketData
+from models.market_data import MarketData, MarketDataType
 from utils.logger_config import setup_pipeline_logger
 
 logger = setup_pipeline_logger()
@@ -45,6 +45,10 @@ class KlinkCustomNotifyHandler(AbstractProcessingHandler):
         
         logger.info(f"🔧 初始化K线通知处理器 - URL: {notify_url}, 超时: {request_timeout}秒, 最大重试: {self.max_retries}次")
 
+    def subscribes(self, source_id: str, symbol: str, data_type: str) -> bool:
+        """仅消费分钟K线数据"""
+        return data_type == MarketDataType.KLINE1M.value
+
     def process(self, data: MarketData) -> None:
         """处理数据"""
         try:
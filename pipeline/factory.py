@@ -0,0 +1,33 @@
+"""数据源与处理管道构建."""
+
+from typing import List
+
+from markt.IProcessingHandler import AbstractProcessingHandler
+from markt.ISourceStrategy import AbstractFetcher
+from markt.ProcessSource import ProcessSource
+from markt.impl.WenCaiSource import WenCaiSource
+from pipeline.ConsoleLogHandler import ConsoleLogHandler
+from pipeline.KlinkCustomNotifyHandler import KlinkCustomNotifyHandler
+
+
+def build_default_pipelines() -> List[AbstractProcessingHandler]:
+    """构建默认数据分发链（API进程与工作进程共用）."""
+    return [
+        ConsoleLogHandler(format_type='detailed'),
+        KlinkCustomNotifyHandler(),
+    ]
+
+
+def build_default_sources(worker_mode: bool = False) -> List[AbstractFetcher]:
+    """构建数据源列表（API进程与采集进程共用）.
+
+    Args:
+        worker_mode: 每个数据源及其处理管道运行在独立进程中，经共享内存传回数据
+    """
+    if worker_mode:
+        return [
+            ProcessSource(WenCaiSource, handler_factory=build_default_pipelines),
+        ]
+    return [
+        WenCaiSource(),
+    ]
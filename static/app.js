@@ -3,8 +3,10 @@ class MarketMonitor {
         this.eventSource = null;
         this.isConnected = false;
         this.isPaused = false;
+        this.lastEventId = null;
         this.klineChart = null;
         this.marketData = new Map();
+        this.marketStatus = new Map();
         this.klineData = new Map();
         this.maxStreamItems = 50;
         
@@ -122,8 +124,8 @@ class MarketMonitor {
             this.updateSourceFilters(sources);
             this.updateSourcesStatus(sources);
 
-            // 加载市场数据
-            await this.loadMarketData(sources);
+            // 加载市场状态
+            await this.loadMarketStatus(sources);
             
             this.showToast('success', '数据加载完成');
         } catch (error) {
@@ -134,27 +136,19 @@ class MarketMonitor {
         }
     }
 
-    async loadMarketData(sources) {
+    async loadMarketStatus(sources) {
+        // 最新行情由数据流连接后的 snapshot 事件提供，这里只获取市场状态
+        const requests = [];
         for (const source of sources) {
             for (const market of source.supported_markets) {
-                try {
-                    // 获取实时数据
-                    const realtimeData = await this.fetchAPI(
-                        `/api/sources/${source.source_id}/latest/${market}/realtime`
-                    );
-                    this.updateMarketCard(realtimeData);
-
-                    // 获取市场状态
-                    const statusData = await this.fetchAPI(
-                        `/api/sources/${source.source_id}/market-status/${market}`
-                    );
-                    this.updateMarketStatus(market, statusData);
-
-                } catch (error) {
-                    console.warn(`获取 ${source.source_id} ${market} 数据失败:`, error);
-                }
+                requests.push(
+                    this.fetchAPI(`/api/sources/${source.source_id}/market-status/${market}`)
+                        .then(statusData => this.updateMarketStatus(market, statusData))
+                        .catch(error => console.warn(`获取 ${source.source_id} ${market} 市场状态失败:`, error))
+                );
             }
         }
+        await Promise.all(requests);
     }
 
     updateSourceFilters(sources) {
@@ -222,9 +216,15 @@ class MarketMonitor {
 
         // 存储市场数据
         this.marketData.set(data.market, marketData);
+
+        // 卡片重绘后恢复已获取的市场状态
+        if (this.marketStatus.has(data.market)) {
+            this.updateMarketStatus(data.market, this.marketStatus.get(data.market));
+        }
     }
 
     updateMarketStatus(market, statusData) {
+        this.marketStatus.set(market, statusData);
         const statusElement = document.getElementById(`status-${market}`);
         if (statusElement) {
             const isOpen = statusData.status.is_open;
@@ -251,6 +251,11 @@ class MarketMonitor {
             params.append('data_types', filters.dataTypes.join(','));
         }
 
+        // 手动重连时携带最后收到的事件ID，服务端补发断线期间的数据
+        if (this.lastEventId) {
+            params.append('last_event_id', this.lastEventId);
+        }
+
         const url = `/api/sources/stream${params.toString() ? '?' + params.toString() : ''}`;
         
         this.eventSource = new EventSource(url);
@@ -273,6 +278,7 @@ class MarketMonitor {
         });
 
         this.eventSource.addEventListener('market_data', (event) => {
+            this.lastEventId = event.lastEventId;
             if (!this.isPaused) {
                 const data = JSON.parse(event.data);
                 console.log('收到市场数据:', data);
@@ -280,6 +286,20 @@ class MarketMonitor {
             }
         });
 
+        this.eventSource.addEventListener('reset', (event) => {
+            // 随后的 snapshot 事件会带来最新行情
+            this.lastEventId = event.lastEventId;
+            console.log('断线期间的数据无法补发，等待快照');
+        });
+
+        this.eventSource.addEventListener('snapshot', (event) => {
+            const data = JSON.parse(event.data);
+            console.log('收到行情快照:', data.items.length);
+            data.items
+                .filter(item => item.type === 'realtime')
+                .forEach(item => this.updateMarketCard(this.formatMarketData(item)));
+        });
+
         this.eventSource.addEventListener('heartbeat', (event) => {
             const data = JSON.parse(event.data);
             this.updateLastUpdate();
@@ -329,8 +349,23 @@ class MarketMonitor {
     handleMarketData(data) {
         console.log('处理市场数据:', data);
         
+        const formattedData = this.formatMarketData(data);
+        
+        // 更新市场卡片
+        this.updateMarketCard(formattedData);
+        
+        // 添加到数据流
+        this.addToDataStream(formattedData);
+        
+        // 更新K线图
+        if (data.type === 'kline1m' || data.type === 'realtime') {
+            this.updateKlineData(formattedData);
+        }
+    }
+
+    formatMarketData(data) {
         // 转换数据格式以匹配现有的处理逻辑
-        const formattedData = {
+        return {
             source_id: data.source,
             market: data.symbol,
             data_type: data.type,
@@ -347,17 +382,6 @@ class MarketMonitor {
                 change_percent: data.change_percent
             }
         };
-        
-        // 更新市场卡片
-        this.updateMarketCard(formattedData);
-        
-        // 添加到数据流
-        this.addToDataStream(formattedData);
-        
-        // 更新K线图
-        if (data.type === 'kline1m' || data.type === 'realtime') {
-            this.updateKlineData(formattedData);
-        }
     }
 
     addToDataStream(data) {
@@ -26,6 +26,7 @@ def test_api_endpoints():
         ("HSI市场状态", "GET", "/api/sources/wen_cai/market-status/HSI", 200),
         ("HSI交易时间", "GET", "/api/sources/wen_cai/trading-hours/HSI", 200),
         ("HSI下次开盘", "GET", "/api/sources/wen_cai/next-opening-time/HSI", 200),
+        ("批量最新价格", "GET", "/api/latest?markets=HSI,NASDAQ&data_types=realtime,kline1m", 200),
     ]
     
     results = []
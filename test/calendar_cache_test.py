@@ -0,0 +1,174 @@
+"""交易日历响应缓存测试."""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from email.utils import formatdate
+
+import pytz
+
+from app.services.calendar_cache import CalendarResponseCache
+from app.services.market_service import MarketService
+from app.services.source_service import SourceService
+from app.services.tick_cache import TickCache
+from markt.DemandTracker import DemandTracker
+from models.market_data import MarketSourceInfo, MarketSymbol
+from utils.logger_config import setup_logger
+from wen_cai.price_data_point import CurrentStatus, ParsedTradingRule, RulesVersion, TradingDay
+from wen_cai.trading_hours_client import TradingHoursClient
+
+logger = setup_logger('calendar_cache_test')
+
+RULES = [
+    ParsedTradingRule("*", "09:30:00", "12:00:00", "交易中"),
+    ParsedTradingRule("*", "13:00:00", "16:00:00", "交易中"),
+    ParsedTradingRule("w6", "00:00:00", "24:00:00", "休市"),
+]
+
+
+class FakeSource:
+    """记录交易时间表请求次数的数据源替身."""
+
+    def __init__(self):
+        self.demand = DemandTracker()
+        self.version = RulesVersion("v1", time.time() - 60, time.time() + 600)
+        self.status_change = datetime.now(pytz.utc) + timedelta(seconds=30)
+        self.fetches = 0
+
+    def get_source_info(self) -> MarketSourceInfo:
+        return MarketSourceInfo(source_id="wen_cai", source_name="问财", supported_markets=[MarketSymbol.HSI])
+
+    async def get_rules_version_async(self, market):
+        return self.version
+
+    async def get_next_status_change_async(self, market):
+        if isinstance(self.status_change, Exception):
+            raise self.status_change
+        return self.status_change
+
+    async def get_market_status_async(self, check_time, market):
+        self.fetches += 1
+        tz = pytz.timezone("Asia/Hong_Kong")
+        return CurrentStatus(True, "交易中", tz.localize(check_time) if check_time.tzinfo is None else check_time,
+                             RULES[0])
+
+    async def get_trading_hours_async(self, market):
+        self.fetches += 1
+        start = datetime(2030, 1, 1, tzinfo=pytz.utc)
+        return [TradingDay(start, start + timedelta(days=1), "休市")]
+
+    async def get_next_opening_time_async(self, market):
+        self.fetches += 1
+        return ParsedTradingRule("2026-10-20", "09:30:00", "12:00:00", "交易中")
+
+
+def test_rules_version_and_status_change():
+    """规则内容不变时版本不变；状态变化时间为当天规则的起止时间或次日零点."""
+    client = TradingHoursClient()
+    client._update_cache("HK", list(RULES))
+    version = client.rules_version("HSI")
+    client._update_cache("HK", list(RULES))
+    assert client.rules_version("HK").version == version.version
+    client._update_cache("HK", RULES[:2])
+    assert client.rules_version("HK").version != version.version
+
+    tz = pytz.timezone("Asia/Hong_Kong")
+    monday = tz.localize(datetime(2026, 10, 19, 10, 0))
+    assert client.get_next_status_change("HK", RULES, monday) == tz.localize(datetime(2026, 10, 19, 12, 0))
+    evening = tz.localize(datetime(2026, 10, 19, 17, 0))
+    assert client.get_next_status_change("HK", RULES, evening) == tz.localize(datetime(2026, 10, 20, 0, 0))
+    saturday = tz.localize(datetime(2026, 10, 24, 10, 0))
+    assert client.get_next_status_change("HK", RULES, saturday) == tz.localize(datetime(2026, 10, 24, 23, 59, 59))
+
+
+def test_calendar_response_cache():
+    """规则版本不变时复用渲染结果，版本变化时重新渲染；条件请求返回 304."""
+    source = FakeSource()
+    cache = CalendarResponseCache()
+    service = MarketService(SourceService([source]), TickCache(), calendar_cache=cache)
+
+    def trading_hours():
+        return asyncio.run(service.get_calendar_response("trading_hours", "wen_cai", MarketSymbol.HSI))
+
+    first = trading_hours()
+    assert trading_hours() is first and source.fetches == 1
+    assert 590 <= first.max_age() <= 600
+    assert first.last_modified == source.version.modified
+
+    response = first.respond(first.etag)
+    assert response.status_code == 304 and response.headers["etag"] == first.etag
+    assert first.respond(f'"other", W/{first.etag}').status_code == 304
+    assert first.respond('"other"').status_code == 200
+    assert first.respond(None, formatdate(time.time(), usegmt=True)).status_code == 304
+    assert first.respond(None, formatdate(first.last_modified - 10, usegmt=True)).status_code == 200
+    assert first.respond(None, "not a date").status_code == 200
+    assert first.respond().body == first.body
+
+    # 规则版本变化时重新渲染，响应内容不变则 ETag 不变
+    source.version = RulesVersion("v2", time.time(), time.time() + 600)
+    second = trading_hours()
+    assert second is not first and source.fetches == 2 and second.etag == first.etag
+
+    # 不提供规则版本的数据源不缓存
+    source.version = None
+    uncached = trading_hours()
+    assert source.fetches == 3 and uncached.max_age() == 0
+    assert uncached.headers()["Cache-Control"] == "no-cache"
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_status_bound_expiry():
+    """依赖当前时间的响应缓存到市场状态下一次可能变化的时间，状态变化时间未知时不缓存."""
+    source = FakeSource()
+    cache = CalendarResponseCache()
+    service = MarketService(SourceService([source]), TickCache(), calendar_cache=cache)
+
+    def next_opening():
+        return asyncio.run(service.get_calendar_response("next_opening_time", "wen_cai", MarketSymbol.HSI))
+
+    first = next_opening()
+    assert 25 <= first.max_age() <= 30
+    assert next_opening() is first and source.fetches == 1
+
+    key = ("next_opening_time", "wen_cai", "HSI", "v1")
+    assert cache.get(key, first.expires_at) is None
+
+    source.status_change = None
+    assert next_opening().max_age() == 0
+    next_opening()
+    assert source.fetches == 3 and cache.get_stats()["entries"] == 0
+
+
+def test_market_status_fresh_times():
+    """市场状态只缓存状态部分，每次响应的检查时间与市场时间为当前时间；状态变化时间获取失败时不缓存."""
+    source = FakeSource()
+    cache = CalendarResponseCache()
+    service = MarketService(SourceService([source]), TickCache(), calendar_cache=cache)
+
+    def market_status():
+        return asyncio.run(service.get_calendar_response("market_status", "wen_cai", MarketSymbol.HSI))
+
+    first = market_status()
+    time.sleep(0.01)
+    second = market_status()
+    assert source.fetches == 1 and second.etag == first.etag and first.etag.startswith("W/")
+    body = json.loads(second.body)
+    assert body["check_time"] > json.loads(first.body)["check_time"]
+    assert body["status"]["status_text"] == "交易中" and body["status"]["market_time"].endswith("+08:00")
+    assert second.respond(first.etag).status_code == 304
+
+    source.version = RulesVersion("v2", time.time(), time.time() + 600)
+    source.status_change = RuntimeError("规则解析失败")
+    uncached = market_status()
+    assert uncached.max_age() == 0 and source.fetches == 2
+    market_status()
+    assert source.fetches == 3
+
+
+if __name__ == "__main__":
+    test_rules_version_and_status_change()
+    test_calendar_response_cache()
+    test_status_bound_expiry()
+    test_market_status_fresh_times()
+    logger.info("✅ 交易日历响应缓存测试完成")
@@ -0,0 +1,50 @@
+"""按需轮询需求跟踪测试."""
+
+from markt.DemandTracker import DemandTracker
+from models.market_data import MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('demand_tracker_test')
+
+
+def test_no_provider_polls_everything():
+    """未注册提供者时保持全量轮询."""
+    tracker = DemandTracker(warmup_seconds=0)
+    symbols = tracker.filter_symbols('wen_cai', [MarketSymbol.HSI, MarketSymbol.NASDAQ], MarketDataType.REALTIME)
+    assert symbols == [MarketSymbol.HSI, MarketSymbol.NASDAQ]
+
+
+def test_provider_union_and_linger():
+    """仅轮询有消费者的标的，消费者离开后滞留一段时间."""
+    subscribed = {('HSI', 'realtime')}
+    tracker = DemandTracker(linger_seconds=0.2, warmup_seconds=0)
+    tracker.add_provider(lambda source_id, symbol, data_type: (symbol, data_type) in subscribed)
+
+    symbols = tracker.filter_symbols('wen_cai', [MarketSymbol.HSI, MarketSymbol.NASDAQ], MarketDataType.REALTIME)
+    assert symbols == [MarketSymbol.HSI]
+
+    # REST访问产生临时需求
+    tracker.touch(MarketSymbol.NASDAQ, MarketDataType.REALTIME, ttl=60)
+    assert tracker.is_demanded('wen_cai', MarketSymbol.NASDAQ, MarketDataType.REALTIME)
+
+    # 订阅取消后仍在滞留窗口内
+    subscribed.clear()
+    assert tracker.is_demanded('wen_cai', MarketSymbol.HSI, MarketDataType.REALTIME)
+
+    import time
+    time.sleep(0.25)
+    assert not tracker.is_demanded('wen_cai', MarketSymbol.HSI, MarketDataType.REALTIME)
+
+
+def test_warmup_window():
+    """预热窗口内全量轮询."""
+    tracker = DemandTracker(warmup_seconds=60)
+    tracker.add_provider(lambda source_id, symbol, data_type: False)
+    assert tracker.is_demanded('wen_cai', MarketSymbol.HSI, MarketDataType.KLINE1M)
+
+
+if __name__ == "__main__":
+    test_no_provider_polls_everything()
+    test_provider_union_and_linger()
+    test_warmup_window()
+    logger.info("✅ 需求跟踪测试完成")
@@ -0,0 +1,35 @@
+"""问财请求头测试."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from utils.logger_config import setup_logger
+from wen_cai import headers
+
+logger = setup_logger('headers_test')
+
+
+def test_token_timeout_kills_node():
+    """node进程超时未输出时抛出 TimeoutError 并结束进程，不阻塞调用方."""
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "hang.js")
+        with open(script, "w") as f:
+            f.write("setTimeout(() => console.log('late'), 10000);\n")
+        original, headers.TOKEN_SCRIPT = headers.TOKEN_SCRIPT, script
+        try:
+            started = time.monotonic()
+            try:
+                asyncio.run(headers.get_token_async(timeout=0.2))
+                raise AssertionError("应等待超时")
+            except TimeoutError:
+                pass
+            assert time.monotonic() - started < 5
+        finally:
+            headers.TOKEN_SCRIPT = original
+
+
+if __name__ == "__main__":
+    test_token_timeout_kills_node()
+    logger.info("✅ 问财请求头测试完成")
@@ -0,0 +1,112 @@
+"""最新价格缓存测试."""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.market_service import MarketService
+from app.services.source_service import SourceService
+from app.services.tick_cache import TickCache
+from app.utils.exceptions import InvalidParameterError
+from markt.DemandTracker import DemandTracker
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from models.market_data import MarketSourceInfo
+from utils.logger_config import setup_logger
+
+logger = setup_logger('latest_cache_test')
+
+
+class FakeSource:
+    """记录上游请求次数的数据源替身."""
+
+    def __init__(self):
+        self.demand = DemandTracker()
+        self.is_open = True
+        self.fetches = 0
+        self.batches = []
+        self.markets = [MarketSymbol.HSI, MarketSymbol.NASDAQ]
+
+    def get_source_info(self) -> MarketSourceInfo:
+        return MarketSourceInfo(source_id="wen_cai", source_name="问财", supported_markets=self.markets)
+
+    async def get_market_status_async(self, check_time, market):
+        return SimpleNamespace(is_open=self.is_open)
+
+    async def get_latest_data_async(self, market, data_type):
+        self.fetches += 1
+        return SimpleNamespace(name=market.value, time=datetime.now(), price=1.0, volume=None,
+                               change=None, change_percent=None)
+
+    async def get_latest_batch_async(self, keys):
+        self.batches.append(list(keys))
+        return {key: ValueError("不支持的数据类型") if key[1] == MarketDataType.KLINE5M
+                else await self.get_latest_data_async(*key) for key in keys}
+
+
+def latest(service, data_type=MarketDataType.REALTIME):
+    return asyncio.run(service.get_latest_price("wen_cai", MarketSymbol.HSI, data_type))
+
+
+def test_latest_from_cache():
+    """缓存足够新时不请求上游，过期时开市请求上游、休市返回缓存，缺失时请求上游."""
+    source = FakeSource()
+    cache = TickCache()
+    service = MarketService(SourceService([source]), cache, {"realtime": 5.0})
+
+    response = latest(service)
+    assert not response.cached and source.fetches == 1
+
+    cache.update(MarketData("wen_cai", MarketSymbol.HSI, MarketDataType.REALTIME, 20000.0, datetime.now(),
+                            change=12.5))
+    response = latest(service)
+    assert response.cached and response.data.price == 20000.0 and response.data.change == 12.5
+    assert source.fetches == 1
+
+    # 未配置新鲜度的数据类型始终请求上游
+    latest(service, MarketDataType.KLINE1M)
+    assert source.fetches == 2
+
+    service.max_staleness["realtime"] = 0.0
+    assert not latest(service).cached
+    assert source.fetches == 3
+
+    source.is_open = False
+    assert latest(service).cached
+    assert source.fetches == 3
+    assert service.cache_hits == 2 and service.upstream_fetches == 3
+
+
+def test_latest_batch():
+    """批量查询: 缓存命中的条目直接返回，未命中的条目合并为一次上游请求，单条失败不影响其他条目."""
+    source = FakeSource()
+    cache = TickCache()
+    service = MarketService(SourceService([source]), cache, {"realtime": 5.0}, batch_max_items=4)
+    cache.update(MarketData("wen_cai", MarketSymbol.HSI, MarketDataType.REALTIME, 20000.0, datetime.now()))
+
+    response = asyncio.run(service.get_latest_batch(
+        None, None, [MarketDataType.REALTIME, MarketDataType.KLINE1M]))
+    assert response.cached == 1 and response.fetched == 3 and not response.errors
+    assert [(item.market, item.data_type, item.cached) for item in response.items] == [
+        ("HSI", "realtime", True), ("HSI", "kline1m", False),
+        ("NASDAQ", "realtime", False), ("NASDAQ", "kline1m", False)]
+    assert len(source.batches) == 1 and len(source.batches[0]) == 3
+
+    # 数据源不支持的市场被忽略
+    source.markets = [MarketSymbol.HSI]
+    response = asyncio.run(service.get_latest_batch(
+        ["wen_cai"], [MarketSymbol.HSI, MarketSymbol.HSI, MarketSymbol.NASDAQ],
+        [MarketDataType.REALTIME, MarketDataType.KLINE5M]))
+    assert [item.data_type for item in response.items] == ["realtime"]
+    assert [(error.market, error.data_type) for error in response.errors] == [("HSI", "kline5m")]
+
+    try:
+        asyncio.run(service.get_latest_batch(None, None, list(MarketDataType)))
+        raise AssertionError("应超出条目数上限")
+    except InvalidParameterError:
+        pass
+
+
+if __name__ == "__main__":
+    test_latest_from_cache()
+    test_latest_batch()
+    logger.info("✅ 最新价格缓存测试完成")
@@ -0,0 +1,114 @@
+"""数据源线程到SSE客户端的投递方式对比.
+
+原实现: 每个tick新建线程和事件循环，在该循环中调用 broadcast_data，
+跨线程操作服务事件循环的连接队列，服务端等待者不一定被唤醒。
+现实现: 经 LoopBridge 用 call_soon_threadsafe 唤醒服务事件循环中的唯一消费任务。
+
+统计每个tick新建的线程数，以及从数据源线程产生tick到服务事件循环中的客户端取到帧的延迟。
+
+运行: python test/loop_bridge_benchmark.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.loop_bridge import LoopBridge
+from app.services.sse_manager import SSEFilter, SSEManager
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('loop_bridge_benchmark')
+
+TICKS = 200
+TICK_INTERVAL = 0.005
+CLIENT_TIMEOUT = 1.0  # 客户端未被唤醒时的等待上限
+
+
+def legacy_submit(manager: SSEManager, data: MarketData) -> None:
+    """原实现中 data_handler 在调度器线程里的广播方式."""
+    def run_broadcast():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(manager.broadcast_data(data))
+        loop.close()
+
+    threading.Thread(target=run_broadcast, daemon=True).start()
+
+
+async def run(mode: str):
+    manager = SSEManager()
+    manager._initialized = True  # 基准测试不启动清理任务
+    connection = manager.get_connection(manager.create_connection(SSEFilter(), queue_size=TICKS * 2))
+    bridge = LoopBridge(lambda batch: [manager.publish(data) for data in batch])
+    if mode == "bridge":
+        bridge.start()
+
+    produced_at = {}
+    latencies = []
+
+    def producer():
+        for i in range(TICKS):
+            data = MarketData(source="wen_cai", symbol=MarketSymbol.HSI, type=MarketDataType.REALTIME,
+                              price=float(i), timestamp=datetime.now())
+            produced_at[float(i)] = time.perf_counter()
+            if mode == "bridge":
+                bridge.submit(data)
+            else:
+                legacy_submit(manager, data)
+            time.sleep(TICK_INTERVAL)
+
+    threads_before = threading.active_count()
+    created = 0
+    original_start = threading.Thread.start
+
+    def counting_start(thread):
+        nonlocal created
+        created += 1
+        original_start(thread)
+
+    threading.Thread.start = counting_start
+    producer_thread = threading.Thread(target=producer, daemon=True)
+    producer_thread.start()
+    try:
+        while len(latencies) < TICKS:
+            try:
+                event = await asyncio.wait_for(connection.queue.get(), timeout=CLIENT_TIMEOUT)
+            except asyncio.TimeoutError:
+                if not producer_thread.is_alive() and connection.queue.empty():
+                    break
+                continue
+            latencies.append(time.perf_counter() - produced_at[event.payload["price"]])
+    finally:
+        threading.Thread.start = original_start
+        await bridge.stop()
+
+    # 不计生产者线程本身
+    return created - 1, latencies, threads_before
+
+
+def main() -> None:
+    import logging
+    logging.getLogger('api').setLevel(logging.WARNING)
+
+    logger.info("=" * 60)
+    for mode, label in (("legacy", "原实现(每tick新建线程+事件循环)"), ("bridge", "LoopBridge")):
+        created, latencies, _ = asyncio.run(run(mode))
+        latencies_ms = sorted(latency * 1000 for latency in latencies)
+        logger.info(f"{label}")
+        logger.info(f"   新建线程: {created} 个 / {TICKS} tick, 客户端收到 {len(latencies)} 条")
+        if latencies_ms:
+            p99 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.99))]
+            logger.info(f"   tick到客户端延迟: 中位数 {statistics.median(latencies_ms):.3f}ms, "
+                        f"p99 {p99:.3f}ms, 最大 {latencies_ms[-1]:.3f}ms")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""线程到事件循环桥接测试."""
+
+import asyncio
+import threading
+
+from app.services.loop_bridge import LoopBridge
+from utils.logger_config import setup_logger
+
+logger = setup_logger('loop_bridge_test')
+
+
+def test_cross_thread_delivery():
+    """多个生产者线程的数据全部在事件循环线程中按批投递."""
+    async def scenario():
+        loop_thread = threading.get_ident()
+        received = []
+        consumer_threads = set()
+
+        def consumer(batch):
+            consumer_threads.add(threading.get_ident())
+            received.extend(batch)
+
+        bridge = LoopBridge(consumer, batch_size=64)
+        bridge.submit(-1)  # 启动前的数据暂存在积压队列中
+        bridge.start()
+
+        def produce(offset):
+            for i in range(500):
+                bridge.submit(offset + i)
+
+        threads = [threading.Thread(target=produce, args=(n * 1000,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            await asyncio.to_thread(thread.join)
+        for _ in range(100):
+            if len(received) == 2001:
+                break
+            await asyncio.sleep(0.01)
+        await bridge.stop()
+        return received, consumer_threads, loop_thread, bridge
+
+    received, consumer_threads, loop_thread, bridge = asyncio.run(scenario())
+    assert sorted(received) == [-1] + sorted(n * 1000 + i for n in range(4) for i in range(500))
+    assert consumer_threads == {loop_thread}
+    assert bridge.max_batch <= 64
+    assert bridge.dropped == 0
+
+
+def test_bounded_backlog():
+    """积压超过上限时丢弃最旧的数据."""
+    async def scenario():
+        received = []
+        bridge = LoopBridge(received.extend, max_backlog=3)
+        for i in range(5):
+            bridge.submit(i)
+        bridge.start()
+        await asyncio.sleep(0.01)
+        await bridge.stop()
+        return received, bridge
+
+    received, bridge = asyncio.run(scenario())
+    assert received == [2, 3, 4]
+    assert bridge.dropped == 2
+
+
+if __name__ == "__main__":
+    test_cross_thread_delivery()
+    test_bounded_backlog()
+    logger.info("✅ 线程到事件循环桥接测试完成")
@@ -0,0 +1,94 @@
+"""MarketData 与 TickRecord 的内存与序列化性能对比.
+
+运行: python -m test.market_data_benchmark 或 python test/market_data_benchmark.py
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.market_data import BEIJING_TZ, MarketData, MarketDataType, MarketSymbol, TickRecord
+from utils.logger_config import setup_logger
+
+logger = setup_logger('market_data_benchmark')
+
+TICK_COUNT = 100_000
+SERIALIZE_ROUNDS = 50_000
+
+
+def make_ticks(count: int):
+    """构造测试数据，与实时行情一样只有价格和时间."""
+    base = datetime(2025, 1, 2, 9, 30, tzinfo=BEIJING_TZ)
+    return [
+        MarketData(source="wen_cai", symbol=MarketSymbol.HSI if i % 2 else MarketSymbol.NASDAQ,
+                   type=MarketDataType.REALTIME, price=20000.0 + i * 0.01,
+                   timestamp=base + timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+
+def measure_retained(factory) -> float:
+    """测量保留 TICK_COUNT 条记录时每条的平均内存(字节)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    retained = factory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return size / len(retained)
+
+
+def measure_throughput(func, items) -> float:
+    """测量每秒序列化条数."""
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    return len(items) / (time.perf_counter() - started)
+
+
+def legacy_to_dict(data: MarketData):
+    """原实现: dataclasses.asdict 递归深拷贝."""
+    result = asdict(data)
+    result['symbol'] = data.symbol.value
+    result['type'] = data.type.value
+    result['timestamp'] = data.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    return result
+
+
+def main() -> None:
+    ticks = make_ticks(SERIALIZE_ROUNDS)
+    records = [TickRecord.from_market_data(tick) for tick in ticks]
+
+    # 保留内存中的记录均为新建对象，时间戳等字段不与输入共享
+    market_data_bytes = measure_retained(lambda: make_ticks(TICK_COUNT))
+    tick_record_bytes = measure_retained(
+        lambda: [TickRecord.from_market_data(tick) for tick in make_ticks(TICK_COUNT)])
+
+    logger.info("=" * 60)
+    logger.info(f"📦 每条保留记录内存 (n={TICK_COUNT})")
+    logger.info(f"   MarketData : {market_data_bytes:8.1f} 字节")
+    logger.info(f"   TickRecord : {tick_record_bytes:8.1f} 字节 "
+                f"({market_data_bytes / tick_record_bytes:.2f}x)")
+
+    results = [
+        ("MarketData asdict to_dict (原实现)", measure_throughput(legacy_to_dict, ticks)),
+        ("MarketData.to_dict", measure_throughput(MarketData.to_dict, ticks)),
+        ("TickRecord.to_dict", measure_throughput(TickRecord.to_dict, records)),
+        ("MarketData json.dumps(asdict)", measure_throughput(
+            lambda d: json.dumps(legacy_to_dict(d), ensure_ascii=False), ticks)),
+        ("TickRecord.to_json", measure_throughput(TickRecord.to_json, records)),
+    ]
+    logger.info(f"⚡ 序列化吞吐 (n={SERIALIZE_ROUNDS})")
+    for name, per_second in results:
+        logger.info(f"   {name:<34}: {per_second:12,.0f} 条/秒")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""共享调度器测试."""
+
+import threading
+import time
+
+from utils.scheduler import SharedScheduler
+from utils.logger_config import setup_logger
+
+logger = setup_logger('scheduler_test')
+
+
+def test_coalesce_and_metrics():
+    """上一次运行未结束时合并触发，并记录耗时统计."""
+    scheduler = SharedScheduler(max_workers=2)
+
+    def slow_job():
+        time.sleep(0.3)
+
+    scheduler.add_interval_job(slow_job, 0.1, job_id='slow', run_immediately=True)
+    time.sleep(0.7)
+    stats = scheduler.get_stats()['jobs']['slow']
+    scheduler.shutdown()
+
+    assert stats['runs'] >= 1
+    assert stats['coalesced'] >= 2
+    assert stats['max_duration_ms'] >= 290
+
+
+def test_thread_count_constant():
+    """注册更多任务不会增加线程数."""
+    scheduler = SharedScheduler(max_workers=2)
+    calls = []
+
+    async def tick():
+        calls.append(time.monotonic())
+
+    scheduler.add_interval_job(tick, 0.05, job_id='job-0')
+    baseline = threading.active_count()
+    for i in range(1, 20):
+        scheduler.add_interval_job(tick, 0.05, job_id=f'job-{i}', jitter=0.01)
+    time.sleep(0.3)
+
+    assert threading.active_count() == baseline
+    assert len(calls) > 20
+    scheduler.shutdown()
+    assert not scheduler.running
+
+
+def test_shutdown_with_stuck_job():
+    """运行中的任务超时未结束时仍能停止调度线程，事件循环在线程退出后关闭."""
+    scheduler = SharedScheduler(max_workers=1)
+    release = threading.Event()
+    scheduler.add_interval_job(lambda: release.wait(2), 0.01, job_id='stuck', run_immediately=True)
+    time.sleep(0.1)
+    loop, thread = scheduler._loop, scheduler._thread
+
+    started = time.monotonic()
+    scheduler.shutdown(timeout=0.1)
+    assert time.monotonic() - started < 1
+    thread.join(1)
+    assert not thread.is_alive() and loop.is_closed()
+    release.set()
+
+
+if __name__ == "__main__":
+    test_coalesce_and_metrics()
+    test_thread_count_constant()
+    test_shutdown_with_stuck_job()
+    logger.info("✅ 共享调度器测试完成")
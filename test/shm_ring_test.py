@@ -0,0 +1,124 @@
+"""共享内存环形缓冲区与工作进程数据源测试."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from markt.ISourceStrategy import AbstractFetcher
+from markt.ProcessSource import ProcessSource
+from models.market_data import MarketData, MarketDataType, MarketSourceInfo, MarketSymbol
+from utils.shm_ring import RingOverflowError, ShmRingBuffer
+from utils.logger_config import setup_logger
+
+logger = setup_logger('shm_ring_test')
+
+
+class FakeSource(AbstractFetcher):
+    """每次启动即发布固定数量数据的测试数据源."""
+
+    def start(self) -> None:
+        for i in range(5):
+            self.notify(MarketData(source="fake", symbol=MarketSymbol.HSI, type=MarketDataType.REALTIME,
+                                   price=100.0 + i, timestamp=datetime(2024, 1, 1, 10, 0, i), volume=i))
+
+    def stop(self) -> None:
+        pass
+
+    def get_source_info(self) -> MarketSourceInfo:
+        return MarketSourceInfo(source_id="fake", source_name="测试", supported_markets=[MarketSymbol.HSI])
+
+    def get_market_status(self, check_time, market):
+        return None
+
+    def get_trading_hours(self, market):
+        return []
+
+    def get_latest_data(self, market, type):
+        return None
+
+    def get_next_opening_time(self, market):
+        return None
+
+
+def test_publish_and_read():
+    """按序号顺序读取消息."""
+    writer = ShmRingBuffer.create(capacity=8, slot_size=64)
+    reader = ShmRingBuffer.attach(writer.name)
+    try:
+        for i in range(5):
+            assert writer.publish(f"msg-{i}".encode()) == i
+        messages, dropped = reader.read()
+        assert messages == [f"msg-{i}".encode() for i in range(5)]
+        assert dropped == 0
+        assert reader.read() == ([], 0)
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_overflow_detection():
+    """读取落后超过容量时报告丢失条数并跳到最旧的有效消息."""
+    ring = ShmRingBuffer.create(capacity=4, slot_size=64)
+    try:
+        for i in range(10):
+            ring.publish(str(i).encode())
+        messages, dropped = ring.read()
+        assert dropped == 6
+        assert messages == [b"6", b"7", b"8", b"9"]
+
+        try:
+            ring.publish(b"x" * 100)
+            assert False, "超长消息应当被拒绝"
+        except RingOverflowError:
+            pass
+    finally:
+        ring.close()
+
+
+def test_concurrent_publish():
+    """同一进程内多个线程同时发布时每条消息占用独立序号，不丢失也不互相覆盖."""
+    writer = ShmRingBuffer.create(capacity=4096, slot_size=64)
+    reader = ShmRingBuffer.attach(writer.name)
+    start = threading.Barrier(8)
+
+    def publish_many(worker: int):
+        start.wait()
+        return [writer.publish(f"{worker}-{i}".encode()) for i in range(400)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            seqs = [seq for result in pool.map(publish_many, range(8)) for seq in result]
+        assert sorted(seqs) == list(range(3200))
+        messages, dropped = reader.read(max_items=4096)
+        assert dropped == 0
+        assert sorted(messages) == sorted(f"{w}-{i}".encode() for w in range(8) for i in range(400))
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_process_source_roundtrip():
+    """工作进程发布的数据经共享内存送达API进程观察者."""
+    received = []
+    source = ProcessSource(FakeSource, capacity=16, slot_size=256)
+    source.attach(received.append)
+    source.start()
+    try:
+        deadline = time.monotonic() + 20
+        while len(received) < 5 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        source.stop()
+
+    assert [data.price for data in received] == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert received[0].symbol is MarketSymbol.HSI
+    assert received[4].volume == 4
+
+
+if __name__ == "__main__":
+    test_publish_and_read()
+    test_overflow_detection()
+    test_concurrent_publish()
+    test_process_source_roundtrip()
+    logger.info("✅ 共享内存传输测试完成")
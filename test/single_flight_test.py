@@ -0,0 +1,109 @@
+"""上游请求合并测试."""
+
+import asyncio
+import threading
+
+from utils.logger_config import setup_logger
+from utils.single_flight import SingleFlight, SingleFlightTimeout
+
+logger = setup_logger('single_flight_test')
+
+
+def test_concurrent_calls_share_one_fetch():
+    """100个并发的相同请求只触发一次上游调用，全部得到同一结果."""
+    async def scenario():
+        flight = SingleFlight(max_workers=2)
+        calls = []
+        release = asyncio.Event()
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return {"price": 1.0}
+
+        waiters = [asyncio.ensure_future(flight.do_async("HSI", fetch)) for _ in range(100)]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.calls == 1 and flight.shared == 99
+        assert flight.get_stats()["in_flight"] == []
+
+    asyncio.run(scenario())
+
+
+def test_error_and_timeout_propagation():
+    """上游异常传给所有调用方，等待超时单独报告，调用结束后同键可再次请求."""
+    async def scenario():
+        flight = SingleFlight(max_workers=2)
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("上游错误")
+
+        results = await asyncio.gather(*(flight.do_async("NASDAQ", fail) for _ in range(5)),
+                                       return_exceptions=True)
+        assert [str(result) for result in results] == ["上游错误"] * 5
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.calls == 1 and flight.errors == 1
+
+        release = asyncio.Event()
+        try:
+            await flight.do_async("slow", release.wait, timeout=0.01)
+            raise AssertionError("应等待超时")
+        except SingleFlightTimeout:
+            pass
+        # 超时后进行中的调用仍被合并
+        assert flight.get_stats()["in_flight"] == ["slow"]
+        release.set()
+        assert await flight.do_async("slow", lambda: asyncio.sleep(0, "new"), timeout=1) is True
+        assert await flight.do_async("slow", lambda: asyncio.sleep(0, "new"), timeout=1) == "new"
+        assert flight.timeouts == 1
+
+    asyncio.run(scenario())
+
+
+def test_async_calls():
+    """异步调用按键合并且不占用线程，并发数受上限约束，等待超时与取消不影响进行中的调用."""
+    async def scenario():
+        flight = SingleFlight(max_workers=2)
+        threads = threading.active_count()
+        running = []
+        peak = []
+
+        async def fetch(symbol):
+            running.append(symbol)
+            peak.append(len(running))
+            await asyncio.sleep(0.05)
+            running.remove(symbol)
+            return {"symbol": symbol}
+
+        keys = [f"S{i % 5}" for i in range(500)]
+        results = await asyncio.gather(*(flight.do_async(key, lambda key=key: fetch(key)) for key in keys))
+        assert [result["symbol"] for result in results] == keys
+        assert flight.calls == 5 and flight.shared == 495
+        assert max(peak) == 2
+        assert threading.active_count() == threads
+        assert flight.get_stats()["in_flight"] == []
+
+        try:
+            await flight.do_async("slow", lambda: asyncio.sleep(0.1, "done"), timeout=0.01)
+            raise AssertionError("应等待超时")
+        except SingleFlightTimeout:
+            pass
+        waiter = asyncio.ensure_future(flight.do_async("slow", lambda: asyncio.sleep(0, "new")))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        assert await flight.do_async("slow", lambda: asyncio.sleep(0, "new"), timeout=1) == "done"
+        assert flight.calls == 6 and flight.timeouts == 1 and flight.errors == 0
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_fetch()
+    test_error_and_timeout_propagation()
+    test_async_calls()
+    logger.info("✅ 上游请求合并测试完成")
@@ -0,0 +1,78 @@
+"""SSE广播每个tick的CPU开销随连接数变化的对比.
+
+原实现每个连接各自 json.dumps 并拼接两段字符串；现实现每个tick只编码一次SSE帧，
+所有连接共享同一个 bytes 对象。
+
+运行: python test/sse_broadcast_benchmark.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.sse_manager import SSEFilter, SSEManager
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('sse_broadcast_benchmark')
+
+CONNECTION_COUNTS = [10, 100, 1000, 5000]
+TICKS = 50
+
+
+def legacy_encode(data: dict):
+    """原实现中每个连接的事件生成器所做的编码."""
+    return f"event: {data['event']}\n", f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def run(connection_count: int):
+    manager = SSEManager()
+    manager._initialized = True  # 基准测试不启动清理任务
+    connections = []
+    for _ in range(connection_count):
+        connection_id = manager.create_connection(SSEFilter())
+        connections.append(manager.get_connection(connection_id))
+
+    tick = MarketData(source="wen_cai", symbol=MarketSymbol.HSI, type=MarketDataType.REALTIME,
+                      price=20000.0, timestamp=datetime.now())
+
+    legacy_cpu = 0.0
+    shared_cpu = 0.0
+    for _ in range(TICKS):
+        await manager.broadcast_data(tick)
+        # 共享帧: 每个连接直接取出已编码的帧
+        started = time.process_time()
+        for connection in connections:
+            connection.queue.get_nowait().frame
+        shared_cpu += time.process_time() - started
+
+        # 原实现: 每个连接重复序列化
+        await manager.broadcast_data(tick)
+        started = time.process_time()
+        for connection in connections:
+            legacy_encode(connection.queue.get_nowait().payload)
+        legacy_cpu += time.process_time() - started
+
+    return legacy_cpu / TICKS, shared_cpu / TICKS
+
+
+def main() -> None:
+    import logging
+    logging.getLogger('api').setLevel(logging.WARNING)
+
+    logger.info("=" * 60)
+    logger.info(f"{'连接数':>8} | {'原实现编码CPU/tick':>18} | {'共享帧CPU/tick':>16} | {'每连接(共享)':>12}")
+    for count in CONNECTION_COUNTS:
+        legacy, shared = asyncio.run(run(count))
+        logger.info(f"{count:>10} | {legacy * 1000:>16.3f}ms | {shared * 1000:>14.3f}ms | "
+                    f"{shared / count * 1e6:>10.3f}µs")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
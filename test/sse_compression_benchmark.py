@@ -0,0 +1,85 @@
+"""1000个SSE连接的流式压缩CPU开销与节省字节数.
+
+每个连接持有独立的压缩上下文，每个事件压缩后同步刷新。
+对比不同压缩级别与数据格式下每个tick的压缩CPU、传输字节与每连接压缩状态内存。
+
+运行: python test/sse_compression_benchmark.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.sse_manager import SSEFilter, SSEManager
+from app.services.stream_codec import CompactEncoder
+from app.services.stream_compression import StreamCompressor
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('sse_compression_benchmark')
+
+CONNECTIONS = 1000
+TICKS = 40
+CONFIGS = [
+    ("json", None),
+    ("json", dict(level=1)),
+    ("json", dict(level=6)),
+    ("json", dict(level=1, window_bits=15, mem_level=8)),
+    ("compact", None),
+    ("compact", dict(level=1)),
+]
+
+
+def make_events(count: int):
+    manager = SSEManager()
+    queue = manager.get_connection(manager.create_connection(SSEFilter(), queue_size=count)).queue
+    base = datetime(2025, 1, 2, 9, 30)
+    for i in range(count):
+        symbol = MarketSymbol.HSI if i % 2 else MarketSymbol.NASDAQ
+        manager.publish(MarketData(source="wen_cai", symbol=symbol, type=MarketDataType.REALTIME,
+                                   price=20000.0 + i * 0.37, timestamp=base + timedelta(seconds=2 * i)))
+    return [queue.get_nowait() for _ in range(count)]
+
+
+def run(data_format: str, options):
+    events = make_events(TICKS)
+    tracemalloc.start()
+    codecs = [CompactEncoder() if data_format == "compact" else None for _ in range(CONNECTIONS)]
+    compressors = [StreamCompressor("gzip", **options) if options else None for _ in range(CONNECTIONS)]
+    state_bytes = tracemalloc.get_traced_memory()[0] / CONNECTIONS
+    tracemalloc.stop()
+
+    raw_bytes = 0
+    sent_bytes = 0
+    started = time.process_time()
+    for event in events:
+        for codec, compressor in zip(codecs, compressors):
+            frame = codec.frame(event) if codec else event.frame
+            raw_bytes += len(event.frame)
+            sent_bytes += len(compressor.compress(frame) if compressor else frame)
+    cpu = time.process_time() - started
+    return cpu / TICKS, raw_bytes / TICKS / CONNECTIONS, sent_bytes / TICKS / CONNECTIONS, state_bytes
+
+
+def main() -> None:
+    import logging
+    logging.getLogger('api').setLevel(logging.WARNING)
+
+    logger.info("=" * 78)
+    logger.info(f"{CONNECTIONS} 个连接, {TICKS} 个tick（CPU含格式编码与压缩）")
+    logger.info(f"{'配置':<34} | {'CPU/tick':>10} | {'字节/事件':>9} | {'节省':>6} | {'每连接状态':>10}")
+    for data_format, options in CONFIGS:
+        cpu, raw, sent, state = run(data_format, options)
+        label = f"{data_format} + " + (
+            "gzip " + ",".join(f"{k}={v}" for k, v in options.items()) if options else "不压缩")
+        logger.info(f"{label:<36} | {cpu * 1000:>8.2f}ms | {sent:>11.1f} | {1 - sent / raw:>6.1%} | "
+                    f"{state / 1024:>9.1f}KB")
+    logger.info("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""SSE管理器测试."""
+
+import asyncio
+import time
+from datetime import datetime
+
+from app.services.sse_manager import SSEFilter, SSEManager, SubscriptionSet
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('sse_manager_test')
+
+
+def make_tick(symbol=MarketSymbol.HSI, data_type=MarketDataType.REALTIME, price=100.0) -> MarketData:
+    return MarketData(source="wen_cai", symbol=symbol, type=data_type, price=price, timestamp=datetime.now())
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_index_fanout():
+    """广播只触达过滤条件匹配的连接."""
+    async def scenario():
+        manager = SSEManager()
+        all_id = manager.create_connection(SSEFilter())
+        hsi_id = manager.create_connection(SSEFilter(markets={"HSI"}))
+        kline_id = manager.create_connection(SSEFilter(markets={"NASDAQ"}, data_types={"kline1m"}))
+
+        assert manager.publish(make_tick()) == 2
+        assert manager.publish(make_tick(MarketSymbol.NASDAQ, MarketDataType.KLINE1M)) == 2
+        assert manager.get_connection(all_id).queue.qsize() == 2
+        assert manager.get_connection(hsi_id).queue.qsize() == 1
+        assert manager.get_connection(kline_id).queue.qsize() == 1
+
+        assert manager.has_subscriber("wen_cai", "NASDAQ", "kline1m")
+        manager.disconnect_connection(all_id)
+        manager.disconnect_connection(kline_id)
+        assert not manager.has_subscriber("wen_cai", "NASDAQ", "kline1m")
+        assert manager.publish(make_tick(MarketSymbol.NASDAQ)) == 0
+
+        # 动态更新过滤条件
+        manager.update_filter(hsi_id, SSEFilter(markets={"NASDAQ"}))
+        assert manager.publish(make_tick(MarketSymbol.NASDAQ)) == 1
+        assert manager.publish(make_tick()) == 0
+
+    run(scenario())
+
+
+def test_overlapping_index_keys():
+    """过滤条件的索引键重叠时每个连接只计一次，断开后从所有索引键中移除."""
+    async def scenario():
+        manager = SSEManager()
+        overlap_id = manager.create_connection(SubscriptionSet([
+            ("*", "*", "*"), ("*", "HSI", "*"), ("wen_cai", "HSI", "realtime")]))
+        hsi_id = manager.create_connection(SSEFilter(markets={"HSI"}))
+
+        assert len(manager.subscribers("wen_cai", "HSI", "realtime")) == 2
+        assert manager.publish(make_tick()) == 2
+        assert manager.publish(make_tick(MarketSymbol.NASDAQ)) == 1
+        assert manager.get_connection(overlap_id).queue.qsize() == 2
+        assert manager.get_connection(hsi_id).queue.qsize() == 1
+
+        manager.disconnect_connection(overlap_id)
+        assert manager.subscription_keys() == [("*", "HSI", "*")]
+        assert manager.publish(make_tick()) == 1
+
+    run(scenario())
+
+
+def test_conflation():
+    """合并模式下每个键只保留最新的待发送事件，并按首次入队顺序输出."""
+    async def scenario():
+        manager = SSEManager()
+        fifo_id = manager.create_connection(SSEFilter(), queue_size=3)
+        conflate_id = manager.create_connection(SSEFilter(), conflate=True)
+
+        for price in (1.0, 2.0, 3.0):
+            manager.publish(make_tick(price=price))
+            manager.publish(make_tick(MarketSymbol.NASDAQ, price=price * 10))
+        manager.publish(make_tick(price=4.0))
+
+        fifo = manager.get_connection(fifo_id).queue
+        assert fifo.qsize() == 3
+        assert fifo.dropped == 4
+
+        queue = manager.get_connection(conflate_id).queue
+        assert queue.qsize() == 2
+        assert queue.conflated == 5
+        first = await queue.get()
+        second = await queue.get()
+        assert (first.payload["symbol"], first.payload["price"]) == ("HSI", 4.0)
+        assert (second.payload["symbol"], second.payload["price"]) == ("NASDAQ", 30.0)
+        assert queue.empty()
+
+    run(scenario())
+
+
+def test_replay_since():
+    """重连时只补发错过的、匹配过滤条件的事件，缺口过大时返回 None."""
+    manager = SSEManager(replay_size=4)
+    start = manager.event_counter
+
+    # 无订阅者时也记录事件
+    for price in (1.0, 2.0, 3.0):
+        manager.publish(make_tick(price=price))
+    manager.publish(make_tick(MarketSymbol.NASDAQ, price=4.0))
+    assert manager.event_counter == start + 4
+
+    missed = manager.replay_since(start + 1, SSEFilter(markets={"HSI"}))
+    assert [event.payload["price"] for event in missed] == [2.0, 3.0]
+    assert len(manager.replay_since(start, SSEFilter())) == 4
+    assert manager.replay_since(start + 4, SSEFilter()) == []
+
+    manager.publish(make_tick(price=5.0))
+    assert manager.replay_since(start, SSEFilter()) is None  # 第一条已被挤出
+    assert manager.replay_since(start + 100, SSEFilter()) is None  # 未来的ID，来自其他运行实例
+    assert manager.replay_since(0, SSEFilter()) is None
+
+
+def test_external_event_ids():
+    """使用采集进程分配的事件ID时按该ID补发，ID不连续时更早的事件返回 None（重置）."""
+    manager = SSEManager(replay_size=10)
+    manager.publish(make_tick(price=1.0))
+    manager.publish(make_tick(price=2.0), event_id=500)
+    manager.publish(make_tick(price=3.0), event_id=501)
+    assert manager.event_counter == 501
+    assert [event.event_id for event in manager.replay_since(499, SSEFilter())] == [500, 501]
+    assert manager.replay_since(498, SSEFilter()) is None
+
+    # 断线期间丢失 502-509
+    manager.publish(make_tick(price=4.0), event_id=510)
+    assert manager.replay_since(501, SSEFilter()) is None
+    assert [event.payload["price"] for event in manager.replay_since(509, SSEFilter())] == [4.0]
+
+
+def test_idle_eviction():
+    """空闲超时的连接被断开并移除，期间有推送的连接按最后活动时间重新调度."""
+    manager = SSEManager(idle_timeout=10.0)
+    now = time.monotonic()
+    idle_id = manager.create_connection(SSEFilter(markets={"NASDAQ"}))
+    active_id = manager.create_connection(SSEFilter(markets={"HSI"}))
+    closed_id = manager.create_connection(SSEFilter())
+
+    # 断开的连接立即移除
+    manager.disconnect_connection(closed_id)
+    assert closed_id not in manager.connections
+
+    manager.get_connection(active_id).last_activity = now + 8.0
+    assert manager.expire_idle(now + 5.0) == 0
+    assert manager.expire_idle(now + 12.0) == 1
+    assert idle_id not in manager.connections
+    assert not manager.has_subscriber("wen_cai", "NASDAQ", "realtime")
+    assert active_id in manager.connections
+
+    assert manager.expire_idle(now + 20.0) == 1
+    assert manager.connections == {}
+    assert manager.idle_evicted == 2
+
+
+if __name__ == "__main__":
+    test_index_fanout()
+    test_overlapping_index_keys()
+    test_conflation()
+    test_replay_since()
+    test_external_event_ids()
+    test_idle_eviction()
+    logger.info("✅ SSE管理器测试完成")
@@ -0,0 +1,67 @@
+"""SSE数据流会话测试."""
+
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from app.services.sse_manager import SSEFilter, SSEManager
+from app.services.sse_stream import SSEStreamSession
+from app.services.tick_cache import TickCache
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('sse_stream_test')
+
+HEARTBEAT_INTERVAL = 0.05
+TICKS = 20
+
+
+def test_delivery_latency_with_heartbeats():
+    """心跳活跃时数据不等待心跳: 按发布顺序输出，且每条都在一个心跳间隔内送达."""
+    async def scenario():
+        manager = SSEManager()
+        manager._initialized = True  # 测试不启动清理任务
+        session = SSEStreamSession(SSEFilter(), manager=manager, tick_cache=TickCache(),
+                                   heartbeat_interval=HEARTBEAT_INTERVAL)
+        sent_at = {}
+        received_ids = []
+        latencies = []
+        heartbeats = 0
+
+        async def consume():
+            nonlocal heartbeats
+            async for frame in session.events():
+                if frame.startswith(b"event: heartbeat"):
+                    heartbeats += 1
+                elif frame.startswith(b"event: market_data"):
+                    event_id = int(frame.split(b"\n")[1][len(b"id: "):])
+                    received_ids.append(event_id)
+                    latencies.append(time.perf_counter() - sent_at[event_id])
+                    if len(latencies) == TICKS:
+                        return
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        for i in range(TICKS):
+            # 间隔与心跳错开，覆盖心跳刚发送后到达的数据
+            await asyncio.sleep(HEARTBEAT_INTERVAL * 0.7)
+            manager.publish(MarketData(source="wen_cai", symbol=MarketSymbol.HSI, type=MarketDataType.REALTIME,
+                                       price=100.0 + i, timestamp=datetime.now()))
+            sent_at[manager.event_counter] = time.perf_counter()
+        await asyncio.wait_for(consumer, timeout=5)
+        return sorted(sent_at), received_ids, latencies, heartbeats
+
+    sent_ids, received_ids, latencies, heartbeats = asyncio.run(scenario())
+    assert heartbeats >= 5
+    assert received_ids == sent_ids
+    # 数据若要等到下一次心跳才输出，延迟平均约为半个心跳间隔；断言留足余量，不依赖具体机器的耗时
+    assert max(latencies) < HEARTBEAT_INTERVAL, f"最大延迟 {max(latencies) * 1000:.2f}ms"
+    assert statistics.median(latencies) < HEARTBEAT_INTERVAL / 5, \
+        f"延迟中位数 {statistics.median(latencies) * 1000:.2f}ms"
+    logger.info(f"心跳 {heartbeats} 次，最大延迟 {max(latencies) * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    test_delivery_latency_with_heartbeats()
+    logger.info("✅ SSE数据流会话测试完成")
@@ -0,0 +1,90 @@
+"""数据流准入控制测试."""
+
+import asyncio
+from datetime import datetime
+
+from app.services.sse_manager import SSEFilter, SSEManager
+from app.services.stream_admission import AdmissionController, AdmissionRejected
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('stream_admission_test')
+
+
+def make_tick(symbol=MarketSymbol.HSI, price=100.0) -> MarketData:
+    return MarketData(source="wen_cai", symbol=symbol, type=MarketDataType.REALTIME, price=price,
+                      timestamp=datetime.now())
+
+
+def expect_rejected(manager: SSEManager, **kwargs) -> AdmissionRejected:
+    try:
+        manager.create_connection(SSEFilter(), **kwargs)
+    except AdmissionRejected as e:
+        return e
+    raise AssertionError("连接应被拒绝")
+
+
+def test_connection_caps():
+    """全局与单个IP的连接数上限，断开后额度立即释放."""
+    async def scenario():
+        manager = SSEManager()
+        manager.admission = AdmissionController(max_connections=3, max_per_ip=2, retry_after=2.0)
+        first = manager.create_connection(SSEFilter(), client_ip="10.0.0.1")
+        manager.create_connection(SSEFilter(), client_ip="10.0.0.1")
+        assert expect_rejected(manager, client_ip="10.0.0.1").retry_after == 2.0
+
+        manager.create_connection(SSEFilter(), client_ip="10.0.0.2")
+        expect_rejected(manager, client_ip="10.0.0.3")
+        assert manager.admission.rejected == 2
+
+        manager.disconnect_connection(first)
+        manager.create_connection(SSEFilter(), client_ip="10.0.0.1")
+        stats = manager.admission.get_stats(len(manager.connections))
+        assert stats["connections"] == 3 and stats["pressure"] == 1.0
+
+    asyncio.run(scenario())
+
+
+def test_memory_budget_policies():
+    """待发送事件计数随入队/出队/断开增减，超出预算时按策略拒绝、降级或断开最慢的连接."""
+    async def scenario():
+        manager = SSEManager()
+        manager.admission = AdmissionController(max_queued_events=10, policy="reject")
+        slow = manager.create_connection(SSEFilter(), queue_size=8)
+        fast = manager.create_connection(SSEFilter(markets={"NASDAQ"}), queue_size=8)
+        for price in range(6):
+            manager.publish(make_tick(price=float(price)))
+            manager.publish(make_tick(MarketSymbol.NASDAQ, price=float(price)))
+        assert manager.admission.counter.queued == 14  # 8 + 6，满队列丢弃最旧的不计入
+        manager.get_connection(fast).queue.get_nowait()
+        assert manager.admission.counter.queued == 13
+        expect_rejected(manager)
+
+        # conflate: 压力较高时新连接降级为合并模式
+        manager.admission.policy = "conflate"
+        downgraded = manager.create_connection(SSEFilter())
+        assert manager.get_connection(downgraded).conflate
+        assert manager.admission.downgraded == 1
+
+        # evict: 断开积压最多的连接
+        manager.admission.policy = "evict"
+        latest = manager.create_connection(SSEFilter(), queue_size=20)
+        assert slow not in manager.connections
+        assert manager.admission.evicted == 1
+        assert manager.admission.counter.queued == 5
+
+        # 合并队列 1 + fast 8 + latest 12，超出预算时只断开积压最多的 latest
+        for price in range(12):
+            manager.publish(make_tick(MarketSymbol.NASDAQ, price=float(price)))
+        assert manager.admission.counter.queued == 21
+        assert manager.enforce_memory_budget() == 1
+        assert latest not in manager.connections and fast in manager.connections
+        assert manager.admission.counter.queued == 9
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_connection_caps()
+    test_memory_budget_policies()
+    logger.info("✅ 数据流准入控制测试完成")
@@ -0,0 +1,48 @@
+"""SSE紧凑增量格式测试."""
+
+import json
+from datetime import datetime, timedelta
+
+from app.services.sse_manager import SSEFilter, SSEManager
+from app.services.stream_codec import CompactEncoder
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('stream_codec_test')
+
+
+def publish(manager, price, seconds, symbol=MarketSymbol.HSI, **fields):
+    manager.publish(MarketData(source="wen_cai", symbol=symbol, type=MarketDataType.REALTIME, price=price,
+                               timestamp=datetime(2025, 1, 2, 9, 30) + timedelta(seconds=seconds), **fields))
+
+
+def decode(frame: bytes):
+    return json.loads(frame.decode('utf-8').split("data: ", 1)[1])
+
+
+def test_delta_encoding():
+    """首条为完整记录，之后只发送变化的字段，字段清除时发送 null."""
+    manager = SSEManager()
+    queue = manager.get_connection(manager.create_connection(SSEFilter())).queue
+    publish(manager, 100.0, 0, volume=5.0)
+    publish(manager, 100.0, 2, volume=5.0)
+    publish(manager, 101.0, 4)
+    publish(manager, 7.0, 4, MarketSymbol.NASDAQ)
+
+    encoder = CompactEncoder()
+    records = [decode(encoder.frame(queue.get_nowait())) for _ in range(4)]
+    assert records[0] == {"k": 0, "s": "wen_cai", "m": "HSI", "y": "realtime", "p": 100.0,
+                          "t": 1735781400000, "v": 5.0}
+    assert records[1] == {"k": 0, "t": 1735781402000}
+    assert records[2] == {"k": 0, "p": 101.0, "t": 1735781404000, "v": None}
+    assert records[3]["k"] == 1 and records[3]["m"] == "NASDAQ"
+
+    stats = encoder.get_stats()
+    assert stats["events"] == 4
+    assert stats["compact_bytes"] < stats["full_bytes"] / 2
+    logger.info(f"每条节省 {stats['saved_bytes_per_event']} 字节 ({stats['saved_ratio']:.0%})")
+
+
+if __name__ == "__main__":
+    test_delta_encoding()
+    logger.info("✅ SSE紧凑增量格式测试完成")
@@ -0,0 +1,91 @@
+"""SSE流式压缩测试."""
+
+import asyncio
+import zlib
+from datetime import datetime
+
+from app.services.sse_manager import SSEFilter, SSEManager
+from app.services.sse_stream import SSEStreamSession
+from app.services.stream_compression import CompressionBudget, StreamCompressor, negotiate_encoding
+from app.services.tick_cache import TickCache
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('stream_compression_test')
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_encoding("br;q=1.0, deflate;q=0.5") == "deflate"
+    assert negotiate_encoding("gzip;q=0, deflate") == "deflate"
+    assert negotiate_encoding("*") == "gzip"
+    assert negotiate_encoding("*, gzip;q=0") == "deflate"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding(None) is None
+
+
+def test_each_event_decodes_immediately():
+    """每个事件同步刷新后，客户端无需等待后续数据即可解出完整事件."""
+    manager = SSEManager()
+    queue = manager.get_connection(manager.create_connection(SSEFilter())).queue
+    budget = CompressionBudget()
+    for encoding, wbits in (("gzip", 31), ("deflate", 15)):
+        compressor = StreamCompressor(encoding, budget=budget)
+        decompressor = zlib.decompressobj(wbits)
+        for i in range(20):
+            manager.publish(MarketData(source="wen_cai", symbol=MarketSymbol.HSI, type=MarketDataType.REALTIME,
+                                       price=20000.0 + i, timestamp=datetime.now()))
+            frame = queue.get_nowait().frame
+            assert decompressor.decompress(compressor.compress(frame)) == frame
+        # 共享的压缩上下文使后续事件远小于原文
+        assert compressor.compressed_bytes < compressor.raw_bytes / 3
+    assert budget.usage() > 0
+
+
+def test_budget_rejects_new_connections():
+    budget = CompressionBudget(max_cpu_fraction=0.1, window_seconds=10)
+    budget.record(0.5, now=100.0)
+    assert budget.allow_new(now=100.5)
+    budget.record(0.6, now=101.0)
+    assert not budget.allow_new(now=101.5)
+    assert budget.rejected == 1
+    # 超出窗口后恢复
+    assert budget.allow_new(now=112.5)
+
+
+def test_server_closed_stream_decompresses_to_end():
+    """服务端关闭连接时输出压缩流结尾，客户端可完整解压并校验."""
+    async def scenario(encoding):
+        manager = SSEManager()
+        manager._initialized = True  # 测试不启动清理任务
+        session = SSEStreamSession(SSEFilter(), manager=manager, tick_cache=TickCache(), heartbeat_interval=0.02,
+                                   compressor=StreamCompressor(encoding))
+        chunks = []
+
+        async def consume():
+            async for chunk in session.events():
+                chunks.append(chunk)
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        for i in range(5):
+            manager.publish(MarketData(source="wen_cai", symbol=MarketSymbol.HSI, type=MarketDataType.REALTIME,
+                                       price=20000.0 + i, timestamp=datetime.now()))
+        await asyncio.sleep(0.01)
+        manager.disconnect_connection(session.connection.connection_id)
+        await asyncio.wait_for(consumer, timeout=1)
+        return b"".join(chunks)
+
+    for encoding, wbits in (("gzip", 31), ("deflate", 15)):
+        decompressor = zlib.decompressobj(wbits)
+        text = decompressor.decompress(asyncio.run(scenario(encoding)))
+        assert decompressor.eof and decompressor.unused_data == b""
+        assert text.count(b"event: market_data") == 5
+
+
+if __name__ == "__main__":
+    test_negotiate_encoding()
+    test_each_event_decodes_immediately()
+    test_budget_rejects_new_connections()
+    test_server_closed_stream_decompresses_to_end()
+    logger.info("✅ SSE流式压缩测试完成")
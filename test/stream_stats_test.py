@@ -0,0 +1,99 @@
+"""数据流聚合统计测试."""
+
+import asyncio
+from datetime import datetime
+
+from app.services.sse_manager import SSEFilter, SSEManager, SubscriptionSet
+from app.services.stream_stats import LatencyHistogram
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('stream_stats_test')
+
+
+def make_tick(symbol=MarketSymbol.HSI, price=100.0) -> MarketData:
+    return MarketData(source="wen_cai", symbol=symbol, type=MarketDataType.REALTIME, price=price,
+                      timestamp=datetime.now())
+
+
+def test_latency_percentiles():
+    """分位数为所在对数桶的上界，超过两个窗口的样本过期."""
+    histogram = LatencyHistogram(window_seconds=10.0, now=0.0)
+    for _ in range(90):
+        histogram.record(0.001, now=0.0)
+    for _ in range(10):
+        histogram.record(0.1, now=0.0)
+    result = histogram.percentiles((0.5, 0.95), now=1.0)
+    assert 1.0 <= result["p50"] <= 1.2
+    assert 100.0 <= result["p95"] <= 120.0
+
+    assert histogram.count() == 100
+    histogram.record(0.002, now=15.0)  # 上一个窗口仍计入
+    assert histogram.count() == 101
+    assert histogram.percentiles((0.5,), now=40.0) == {"p50": None}
+
+
+def test_incremental_counters():
+    """连接分布、入队/丢弃计数与队列深度分布随事件增量更新."""
+    async def scenario():
+        manager = SSEManager()
+        hsi = manager.create_connection(SSEFilter(markets={"HSI"}), queue_size=4)
+        manager.create_connection(SSEFilter())
+        ws = manager.create_connection(SubscriptionSet(), prefix="ws")
+        manager.update_filter(ws, SubscriptionSet({("*", "NASDAQ", "*")}))
+
+        for price in range(6):
+            manager.publish(make_tick(price=float(price)))
+        manager.publish(make_tick(MarketSymbol.NASDAQ))
+
+        stats = await manager.get_stats()
+        assert stats["connections_by_kind"] == {"sse": 2, "ws": 1}
+        assert stats["connections_by_filter"] == {"*|HSI|*": 1, "*|*|*": 1, "*|NASDAQ|*": 1}
+        assert stats["events_enqueued"] == 14
+        assert stats["events_dropped"] == 2
+        assert stats["events_queued"] == 12
+        assert stats["queue_depth_histogram"]["1"] == 1
+        assert stats["queue_depth_histogram"]["4-7"] == 2
+
+        queue = manager.get_connection(hsi).queue
+        batch = [queue.get_nowait() for _ in range(queue.qsize())]
+        manager.stats.record_sent(batch)
+        manager.disconnect_connection(hsi)
+
+        stats = await manager.get_stats()
+        assert stats["events_sent"] == 4
+        assert stats["latency_ms"]["p50"] is not None
+        assert stats["connections_closed"] == 1
+        assert "*|HSI|*" not in stats["connections_by_filter"]
+        assert stats["queue_depth_histogram"]["0"] == 0
+        assert sum(stats["queue_depth_histogram"].values()) == 2
+
+    asyncio.run(scenario())
+
+
+def test_connection_details_pagination():
+    """连接详情分页并可按类型、市场、积压过滤."""
+    async def scenario():
+        manager = SSEManager()
+        ids = [manager.create_connection(SSEFilter(markets={"HSI"}), client_ip="10.0.0.1") for _ in range(5)]
+        manager.create_connection(SSEFilter(markets={"NASDAQ"}))
+        manager.create_connection(SubscriptionSet({("*", "*", "realtime")}), prefix="ws")
+        manager.publish(make_tick(MarketSymbol.NASDAQ))
+
+        page = manager.connection_details(offset=2, limit=2)
+        assert page["total"] == 7
+        assert [item["id"] for item in page["items"]] == ids[2:4]
+        assert manager.connection_details(kind="ws")["total"] == 1
+        assert manager.connection_details(client_ip="10.0.0.1")["total"] == 5
+        assert manager.connection_details(market="NASDAQ")["total"] == 2  # 含订阅全部市场的连接
+        slow = manager.connection_details(min_queue=1)
+        assert slow["total"] == 2 and all(item["queue_size"] == 1 for item in slow["items"])
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_latency_percentiles()
+    test_incremental_counters()
+    test_connection_details_pagination()
+    logger.info("✅ 数据流聚合统计测试完成")
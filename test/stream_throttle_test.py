@@ -0,0 +1,65 @@
+"""推送限速与采样测试."""
+
+from datetime import datetime
+
+from app.services.sse_manager import SSEEvent, market_data_payload
+from app.services.stream_throttle import StreamThrottle
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('stream_throttle_test')
+
+
+def make_event(event_id: int, price: float, symbol=MarketSymbol.HSI) -> SSEEvent:
+    data = MarketData(source="wen_cai", symbol=symbol, type=MarketDataType.REALTIME, price=price,
+                      timestamp=datetime.now())
+    return SSEEvent(event_id, "market_data", market_data_payload(data),
+                    (data.source, data.symbol.value, data.type.value))
+
+
+def run_window(sample: str):
+    """1秒窗口: t=0 立即发送，t=0.2~0.6 合并，t=1.0 窗口结束时发送."""
+    throttle = StreamThrottle(max_rate=1, sample=sample)
+    assert [e.event_id for e in throttle.offer(make_event(1, 10.0), 0.0)] == [1]
+    for event_id, (price, at) in enumerate([(12.0, 0.2), (9.0, 0.4), (11.0, 0.6)], start=2):
+        assert throttle.offer(make_event(event_id, price), at) == []
+    # 其他键不受影响
+    assert len(throttle.offer(make_event(9, 1.0, MarketSymbol.NASDAQ), 0.5)) == 1
+    assert throttle.next_deadline() == 1.0
+    assert throttle.flush_due(0.9) == []
+    merged = throttle.flush_due(1.0)
+    assert len(merged) == 1
+    assert throttle.received == 5 and throttle.emitted == 3
+    return merged[0]
+
+
+def test_sample_modes():
+    assert run_window("latest").payload["price"] == 11.0
+    first = run_window("first")
+    # 保留最早一条的内容，事件ID为窗口内最新的一条
+    assert first.payload["price"] == 12.0 and first.event_id == 4
+    assert first.frame.startswith(b"event: market_data\nid: 4\n")
+
+    ohlc = run_window("ohlc")
+    assert ohlc.event_id == 4
+    assert (ohlc.payload["open_price"], ohlc.payload["high_price"], ohlc.payload["low_price"],
+            ohlc.payload["close_price"], ohlc.payload["price"]) == (12.0, 12.0, 9.0, 11.0, 11.0)
+    assert ohlc.payload["sample_count"] == 3
+
+
+def test_idle_key_is_sent_immediately():
+    """窗口结束且无待发送数据后，下一条数据立即发送."""
+    throttle = StreamThrottle(max_rate=2)
+    assert len(throttle.offer(make_event(1, 1.0), 0.0)) == 1
+    assert throttle.flush_due(0.6) == []
+    assert len(throttle.offer(make_event(2, 2.0), 0.7)) == 1
+    # 窗口已过期但仍有待发送数据时，随新数据一起合并发送
+    throttle.offer(make_event(3, 3.0), 0.8)
+    merged = throttle.offer(make_event(4, 4.0), 1.3)
+    assert [e.event_id for e in merged] == [4]
+
+
+if __name__ == "__main__":
+    test_sample_modes()
+    test_idle_key_is_sent_immediately()
+    logger.info("✅ 推送限速与采样测试完成")
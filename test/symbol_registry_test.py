@@ -0,0 +1,71 @@
+"""标的注册表与新浪批量行情测试."""
+
+from datetime import datetime
+
+from models.market_data import InstrumentSymbol, MarketSymbol
+from models.symbol_registry import SymbolRegistry, SymbolSpec, get_symbol_registry
+from wen_cai.price_data_point import SinaPriceDataPoint
+from wen_cai.sina_realtime_quote_client import SinaRealtimeQuoteClient
+from utils.logger_config import setup_logger
+
+logger = setup_logger('symbol_registry_test')
+
+
+def test_default_symbols():
+    """内置标的映射到 MarketSymbol 枚举成员."""
+    registry = get_symbol_registry()
+    assert registry.symbol('hsi') is MarketSymbol.HSI
+    assert registry.find('gb_ixic') is MarketSymbol.NASDAQ
+    assert registry.find('176_HSI') is MarketSymbol.HSI
+    assert registry.find('恒生指数') is MarketSymbol.HSI
+    assert registry.spec(MarketSymbol.NASDAQ).calendar == 'NASDAQ'
+
+
+def test_register_instrument():
+    """动态注册标的."""
+    registry = SymbolRegistry()
+    symbol = registry.register(SymbolSpec(symbol_id='HK00700', sina_code='rt_hk00700',
+                                          calendar='HK', name='腾讯控股'))
+    assert isinstance(symbol, InstrumentSymbol)
+    assert symbol.value == 'HK00700'
+    assert registry.find('rt_hk00700') is symbol
+    assert registry.find('腾讯控股') is symbol
+
+    registry.unregister('HK00700')
+    assert registry.find('rt_hk00700') is None
+    assert len(registry) == 0
+
+
+def test_batches_respect_url_limit():
+    """代码列表按URL长度拆分批次."""
+    client = SinaRealtimeQuoteClient()
+    codes = [f"rt_hk{i:05d}" for i in range(3000)]
+    batches = client._split_batches(codes)
+
+    assert sum(len(batch) for batch in batches) == len(codes)
+    for batch in batches:
+        url = f"{client.SINA_API_URL}?rn={int(datetime.now().timestamp() * 1000)}&list={','.join(batch)}"
+        assert len(url) <= client.MAX_URL_LENGTH
+
+
+def test_fetch_merges_batches():
+    """多个批次并发请求并合并结果."""
+    client = SinaRealtimeQuoteClient()
+    client.MAX_URL_LENGTH = 200
+    now = datetime.now()
+    client._fetch_batch = lambda batch: {
+        code: SinaPriceDataPoint(name=code, time=now, price=1.0) for code in batch
+    }
+
+    codes = [f"gb_sym{i}" for i in range(100)]
+    result = client.fetch_sina_quotes(codes)
+    assert len(client._split_batches(codes)) > 1
+    assert set(result) == set(codes)
+
+
+if __name__ == "__main__":
+    test_default_symbols()
+    test_register_instrument()
+    test_batches_respect_url_limit()
+    test_fetch_merges_batches()
+    logger.info("✅ 标的注册表测试完成")
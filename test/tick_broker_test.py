@@ -0,0 +1,122 @@
+"""采集进程与API工作进程间行情发布/订阅测试."""
+
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+from app.services.tick_broker import (EVENT_ID, FRAME_HEADER, KIND_EVENT, MAX_FRAME_SIZE, TickBrokerClient,
+                                      TickBrokerServer, encode_event, encode_frame)
+from app.services.tick_cache import TickCache
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('tick_broker_test')
+
+
+def make_tick(symbol=MarketSymbol.HSI, price=100.0) -> MarketData:
+    return MarketData(source="wen_cai", symbol=symbol, type=MarketDataType.REALTIME, price=price,
+                      timestamp=datetime.now())
+
+
+async def wait_until(predicate, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("等待超时")
+
+
+def test_publish_and_demand():
+    """工作进程连接后先收到快照，需求回传到发布端，断线后自动重连."""
+    async def scenario(socket_path):
+        cache = TickCache()
+        cache.update(make_tick(price=99.0))
+        server = TickBrokerServer(socket_path, cache)
+        await server.start()
+
+        workers = []
+        for demand in ([("*", "HSI", "*")], [("wen_cai", "NASDAQ", "realtime")]):
+            received = []
+            client = TickBrokerClient(socket_path, lambda data, event_id, received=received:
+                                      received.append((data, event_id)),
+                                      lambda demand=demand: demand, demand_interval=0.02)
+            client.start()
+            workers.append((client, received))
+
+        await wait_until(lambda: len(server._subscribers) == 2)
+        await wait_until(lambda: server.has_subscriber("wen_cai", "NASDAQ", "realtime"))
+        assert server.has_subscriber("wen_cai", "HSI", "kline1m")
+        assert not server.has_subscriber("wen_cai", "NASDAQ", "kline1m")
+
+        # 快照没有事件ID
+        for _, received in workers:
+            await wait_until(lambda received=received: len(received) == 1)
+            tick, event_id = received[0]
+            assert tick.price == 99.0 and tick.symbol == MarketSymbol.HSI and event_id is None
+
+        server.publish_batch([make_tick(price=101.0), make_tick(MarketSymbol.NASDAQ, price=7.0)])
+        for _, received in workers:
+            await wait_until(lambda received=received: len(received) == 3)
+        assert [tick.price for tick, _ in workers[0][1]] == [99.0, 101.0, 7.0]
+        # 事件ID由发布端分配，所有工作进程一致且连续
+        event_ids = [event_id for _, event_id in workers[0][1][1:]]
+        assert event_ids == [event_id for _, event_id in workers[1][1][1:]]
+        assert event_ids == [server.event_counter - 1, server.event_counter]
+
+        # 发布端重启后重连
+        await server.stop()
+        server = TickBrokerServer(socket_path, cache)
+        await server.start()
+        await wait_until(lambda: len(server._subscribers) == 2, timeout=5)
+        assert workers[0][0].reconnects >= 1
+
+        for client, _ in workers:
+            await client.stop()
+        await server.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "broker.sock")
+        asyncio.run(scenario(socket_path))
+
+
+def test_bad_frames():
+    """帧长度异常时断开重连；单帧负载损坏时跳过该帧，连接保持."""
+    async def scenario(socket_path):
+        connections = []
+
+        async def handle(reader, writer):
+            connections.append(writer)
+            if len(connections) == 1:
+                writer.write(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1, KIND_EVENT))
+            else:
+                writer.write(encode_frame(KIND_EVENT, b"\x00"))
+                writer.write(encode_frame(KIND_EVENT, EVENT_ID.pack(1) + b"not json"))
+                writer.write(encode_event(7, make_tick(price=101.0)))
+            await writer.drain()
+
+        server = await asyncio.start_unix_server(handle, path=socket_path)
+        received = []
+        client = TickBrokerClient(socket_path, lambda data, event_id: received.append((data, event_id)),
+                                  lambda: [], max_backoff=0.05)
+        client.start()
+
+        await wait_until(lambda: len(received) == 1)
+        assert client.reconnects == 1 and len(connections) == 2
+        assert received[0][0].price == 101.0 and received[0][1] == 7
+        assert client.connected
+
+        await client.stop()
+        for writer in connections:
+            writer.close()
+        server.close()
+        await server.wait_closed()
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(scenario(os.path.join(directory, "broker.sock")))
+
+
+if __name__ == "__main__":
+    test_publish_and_demand()
+    test_bad_frames()
+    logger.info("✅ 行情发布/订阅测试完成")
@@ -0,0 +1,35 @@
+"""最新行情缓存测试."""
+
+from datetime import datetime
+
+from app.services.sse_manager import SSEFilter
+from app.services.tick_cache import TickCache
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('tick_cache_test')
+
+
+def make_tick(symbol=MarketSymbol.HSI, data_type=MarketDataType.REALTIME, price=100.0) -> MarketData:
+    return MarketData(source="wen_cai", symbol=symbol, type=data_type, price=price, timestamp=datetime.now())
+
+
+def test_latest_per_key():
+    """每个键只保留最新值，快照按过滤条件筛选."""
+    cache = TickCache()
+    cache.update(make_tick(price=1.0))
+    cache.update(make_tick(price=2.0))
+    cache.update(make_tick(MarketSymbol.NASDAQ, price=3.0))
+    cache.update(make_tick(MarketSymbol.NASDAQ, MarketDataType.KLINE1M, price=4.0))
+
+    assert len(cache) == 3
+    assert cache.get("wen_cai", "HSI", "realtime").price == 2.0
+
+    snapshot = cache.snapshot(SSEFilter(data_types={"realtime"}).accepts)
+    assert sorted((record.symbol.value, record.price) for record in snapshot) == [("HSI", 2.0), ("NASDAQ", 3.0)]
+    assert len(cache.snapshot()) == 3
+
+
+if __name__ == "__main__":
+    test_latest_per_key()
+    logger.info("✅ 最新行情缓存测试完成")
@@ -0,0 +1,51 @@
+"""TickRecord 紧凑行情记录测试."""
+
+from datetime import datetime
+
+from app.services.sse_manager import market_data_payload
+from markt.impl.WenCaiSource import WenCaiSource
+from models.market_data import BEIJING_TZ, MarketData, MarketDataType, MarketSymbol, TickRecord, normalize_timestamp
+from utils.logger_config import setup_logger
+
+logger = setup_logger('tick_record_test')
+
+
+def test_roundtrip_and_compact_dict():
+    """转换往返保持数据，序列化跳过空字段."""
+    data = MarketData(source="wen_cai", symbol=MarketSymbol.HSI, type=MarketDataType.KLINE1M,
+                      price=25000.5, timestamp=datetime(2024, 1, 1, 10, 15, 0), volume=100)
+    record = TickRecord.from_market_data(data)
+
+    assert record.ts_ms == 1704075300000  # 无时区时间按北京时间解释
+    assert record.type is MarketDataType.KLINE1M
+    assert record.to_dict() == {
+        "source": "wen_cai", "symbol": "HSI", "type": "kline1m",
+        "price": 25000.5, "timestamp": 1704075300000, "volume": 100,
+    }
+
+    restored = TickRecord.from_dict(record.to_dict()).to_market_data()
+    assert restored.symbol is MarketSymbol.HSI
+    assert restored.timestamp == datetime(2024, 1, 1, 10, 15, 0, tzinfo=BEIJING_TZ)
+    assert restored.volume == 100 and restored.open_price is None
+
+
+def test_source_timestamps_serialize_consistently():
+    """数据源按交易日历时区统一时间戳，实时推送与经 TickRecord 往返后的序列化结果一致."""
+    source = WenCaiSource()
+    # 纳斯达克分钟K线为美东时间（夏令时 UTC-4），恒指为香港时间
+    nasdaq = source._source_time(source.registry.spec(MarketSymbol.NASDAQ), datetime(2024, 7, 1, 9, 30))
+    assert nasdaq == datetime(2024, 7, 1, 21, 30, tzinfo=BEIJING_TZ)
+    hsi = source._source_time(source.registry.spec(MarketSymbol.HSI), datetime(2024, 7, 1, 9, 30))
+    assert hsi.isoformat() == "2024-07-01T09:30:00+08:00"
+    assert normalize_timestamp(nasdaq) == nasdaq
+
+    live = MarketData(source="wen_cai", symbol=MarketSymbol.NASDAQ, type=MarketDataType.KLINE1M,
+                      price=18000.0, timestamp=nasdaq)
+    restored = TickRecord.from_market_data(live).to_market_data()
+    assert market_data_payload(restored) == market_data_payload(live)
+
+
+if __name__ == "__main__":
+    test_roundtrip_and_compact_dict()
+    test_source_timestamps_serialize_consistently()
+    logger.info("✅ TickRecord 测试完成")
@@ -0,0 +1,50 @@
+"""哈希时间轮测试."""
+
+from app.services.timing_wheel import TimingWheel
+from utils.logger_config import setup_logger
+
+logger = setup_logger('timing_wheel_test')
+
+
+def test_expire_in_order():
+    """条目在到期后一个tick内取出，取消与重新调度立即生效."""
+    wheel = TimingWheel(tick_seconds=1.0, slots=8, now=100.0)
+    wheel.schedule("a", 102.5)
+    wheel.schedule("b", 103.0)
+    wheel.schedule("c", 104.0)
+    assert len(wheel) == 3
+
+    assert wheel.advance(102.9) == []
+    assert wheel.advance(103.0) == ["a"]
+    assert wheel.cancel("b")
+    assert not wheel.cancel("b")
+    wheel.schedule("c", 106.0)
+    assert wheel.advance(105.5) == []
+    assert wheel.deadline("c") == 106.0
+    assert wheel.advance(107.0) == ["c"]
+    assert len(wheel) == 0
+
+
+def test_multiple_rotations():
+    """超过一圈的条目在对应圈数到期，已过期的条目下次推进即取出."""
+    wheel = TimingWheel(tick_seconds=1.0, slots=4, now=0.0)
+    wheel.schedule("far", 9.5)
+    wheel.schedule("near", 1.5)
+    assert wheel.advance(2.0) == ["near"]
+    assert wheel.advance(6.0) == []
+    assert wheel.advance(10.0) == ["far"]
+
+    wheel.schedule("past", 3.0)
+    assert wheel.advance(10.5) == []  # 当前tick未走完
+    assert wheel.advance(11.0) == ["past"]
+
+    # 长时间未推进时所有到期条目一次取出
+    wheel.schedule("x", 12.0)
+    wheel.schedule("y", 20.0)
+    assert sorted(wheel.advance(100.0)) == ["x", "y"]
+
+
+if __name__ == "__main__":
+    test_expire_in_order()
+    test_multiple_rotations()
+    logger.info("✅ 时间轮测试完成")
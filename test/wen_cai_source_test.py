@@ -0,0 +1,61 @@
+"""问财数据源K线推送测试."""
+
+from datetime import datetime
+
+from markt.impl.WenCaiSource import WenCaiSource
+from models.market_data import MarketSymbol
+from utils.logger_config import setup_logger
+from wen_cai.price_data_point import SinaPriceDataPoint
+
+logger = setup_logger('wen_cai_source_test')
+
+
+class FakeWenCaiClient:
+    """按同花顺代码返回预设分钟K线，可模拟请求失败."""
+
+    def __init__(self):
+        self.bars = {}
+        self.failing = set()
+
+    def get_data(self, ths_code):
+        if ths_code in self.failing:
+            raise ConnectionError("上游超时")
+        return list(self.bars.get(ths_code, []))
+
+
+def bar(name, hour, minute, price):
+    return SinaPriceDataPoint(name=name, time=datetime(2024, 7, 1, hour, minute), price=price)
+
+
+def test_kline_watermark_per_symbol():
+    """每个标的按已推送的最新K线时间去重，一个标的失败不影响其他标的，美股K线不因时区差被挡住."""
+    source = WenCaiSource()
+    client = FakeWenCaiClient()
+    source.wen_cai_client = client
+    source.demand.filter_symbols = lambda source_id, symbols, data_type: list(symbols)
+    received = []
+    source.attach(received.append)
+
+    client.bars = {"176_HSI": [bar("HSI", 10, 0, 1.0), bar("HSI", 10, 1, 2.0)],
+                   "88_IXIC": [bar("IXIC", 9, 30, 10.0)]}
+    source._tick_update_kline()
+    assert [(d.symbol, d.price) for d in received] == \
+        [(MarketSymbol.HSI, 1.0), (MarketSymbol.HSI, 2.0), (MarketSymbol.NASDAQ, 10.0)]
+
+    # 恒指请求失败时纳斯达克照常推送新K线，之后恒指从自己的水位继续
+    received.clear()
+    client.failing = {"176_HSI"}
+    client.bars["176_HSI"].append(bar("HSI", 10, 2, 3.0))
+    client.bars["88_IXIC"].append(bar("IXIC", 9, 31, 11.0))
+    source._tick_update_kline()
+    assert [(d.symbol, d.price) for d in received] == [(MarketSymbol.NASDAQ, 11.0)]
+
+    received.clear()
+    client.failing = set()
+    source._tick_update_kline()
+    assert [(d.symbol, d.price) for d in received] == [(MarketSymbol.HSI, 3.0)]
+
+
+if __name__ == "__main__":
+    test_kline_watermark_per_symbol()
+    logger.info("✅ 问财数据源K线推送测试完成")
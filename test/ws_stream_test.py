@@ -0,0 +1,203 @@
+"""WebSocket行情推送测试."""
+
+import asyncio
+import json
+from datetime import datetime
+
+from fastapi import WebSocketDisconnect
+
+from app.services.sse_manager import SSEManager
+from app.services.tick_cache import TickCache
+from app.services.ws_stream import FRAME_SNAPSHOT, FRAME_TICKS, KeyTable, WSStreamSession, decode_frame
+from models.market_data import MarketData, MarketDataType, MarketSymbol
+from utils.logger_config import setup_logger
+
+logger = setup_logger('ws_stream_test')
+
+
+class FakeWebSocket:
+    """记录发送内容的WebSocket替身，客户端消息经队列送入."""
+
+    def __init__(self):
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.sent = []
+        self.received = asyncio.Event()
+        self.client = None
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+    async def receive_text(self):
+        message = await self.inbox.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return json.dumps(message)
+
+    async def send_json(self, data):
+        self.sent.append(data)
+        self.received.set()
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+        self.received.set()
+
+
+def make_tick(symbol=MarketSymbol.HSI, data_type=MarketDataType.REALTIME, price=100.0) -> MarketData:
+    return MarketData(source="wen_cai", symbol=symbol, type=data_type, price=price,
+                      timestamp=datetime.now(), volume=10.0)
+
+
+def test_subscribe_and_batched_frames():
+    """运行时订阅/退订，新订阅先收到快照，多条行情合为一个二进制帧."""
+    async def scenario():
+        manager = SSEManager()
+        manager._initialized = True  # 测试不启动清理任务
+        cache = TickCache()
+        cache.update(make_tick(price=99.0))
+        websocket = FakeWebSocket()
+        keys = KeyTable()
+        session = WSStreamSession(websocket, conflate=True, manager=manager, tick_cache=cache, key_table=keys)
+        runner = asyncio.create_task(session.run())
+
+        async def settle():
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        await websocket.inbox.put({"action": "subscribe", "subscriptions": [{"symbol": "HSI"}]})
+        await settle()
+        assert manager.has_subscriber("wen_cai", "HSI", "realtime")
+        assert not manager.has_subscriber("wen_cai", "NASDAQ", "realtime")
+
+        # 同一轮事件循环内的多条行情在一个帧中发送，合并模式下同键只保留最新
+        manager.publish(make_tick(price=100.0))
+        manager.publish(make_tick(price=101.0))
+        manager.publish(make_tick(data_type=MarketDataType.KLINE1M, price=102.0))
+        manager.publish(make_tick(MarketSymbol.NASDAQ, price=1.0))
+        await settle()
+
+        await websocket.inbox.put({"action": "unsubscribe", "subscriptions": [{"symbol": "HSI"}]})
+        await settle()
+        assert not manager.has_subscriber("wen_cai", "HSI", "realtime")
+
+        await websocket.inbox.put(None)
+        await asyncio.wait_for(runner, timeout=1)
+        assert not session.connection.connected
+        assert session.connection.connection_id not in manager.connections
+        return websocket.sent, keys
+
+    sent, keys = asyncio.run(scenario())
+    texts = [message for message in sent if isinstance(message, dict)]
+    frames = [decode_frame(message) for message in sent if isinstance(message, bytes)]
+    assert texts[0]["type"] == "connected"
+    assert texts[1] == {"type": "subscriptions", "subscriptions": [["*", "HSI", "*"]]}
+
+    snapshot_type, snapshot = frames[0]
+    assert snapshot_type == FRAME_SNAPSHOT
+    assert [record["price"] for record in snapshot] == [99.0]
+
+    tick_type, ticks = frames[1]
+    assert tick_type == FRAME_TICKS
+    assert [(keys.key(r["key_id"])[2], r["price"], r["volume"]) for r in ticks] == \
+        [("realtime", 101.0, 10.0), ("kline1m", 102.0, 10.0)]
+    assert len(frames) == 2
+
+    # 键映射在对应帧之前下发
+    key_messages = [message["keys"] for message in texts if message["type"] == "keys"]
+    announced = {int(key_id): tuple(key) for message in key_messages for key_id, key in message.items()}
+    assert announced == {keys.id_for(("wen_cai", "HSI", "realtime")): ("wen_cai", "HSI", "realtime"),
+                         keys.id_for(("wen_cai", "HSI", "kline1m")): ("wen_cai", "HSI", "kline1m")}
+    assert texts[-1]["type"] == "subscriptions" and texts[-1]["subscriptions"] == []
+
+
+class SlowKeysWebSocket(FakeWebSocket):
+    """发送键映射时让出事件循环，模拟慢速发送."""
+
+    async def send_json(self, data):
+        if data.get("type") == "keys":
+            await asyncio.sleep(0.01)
+        await super().send_json(data)
+
+
+def test_keys_sent_before_frames():
+    """新订阅的快照与推送任务并发发送时，帧中的键ID总在其映射之后到达客户端."""
+    async def scenario():
+        manager = SSEManager()
+        manager._initialized = True
+        cache = TickCache()
+        cache.update(make_tick(price=99.0))
+        websocket = SlowKeysWebSocket()
+        keys = KeyTable()
+        session = WSStreamSession(websocket, manager=manager, tick_cache=cache, key_table=keys)
+        runner = asyncio.create_task(session.run())
+
+        await websocket.inbox.put({"action": "subscribe", "subscriptions": [{"symbol": "HSI"}]})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        # 快照的键映射仍在发送中时广播同键行情
+        manager.publish(make_tick(price=100.0))
+        await asyncio.sleep(0.05)
+
+        await websocket.inbox.put(None)
+        await asyncio.wait_for(runner, timeout=1)
+        return websocket.sent
+
+    announced = set()
+    frames = 0
+    for message in asyncio.run(scenario()):
+        if isinstance(message, dict):
+            if message["type"] == "keys":
+                announced.update(int(key_id) for key_id in message["keys"])
+        else:
+            frames += 1
+            assert {record["key_id"] for record in decode_frame(message)[1]} <= announced
+    assert frames == 2
+
+
+def test_overlapping_subscriptions_deliver_once():
+    """通配订阅与具体订阅重叠时每条行情只推送一次，退订具体订阅后通配订阅仍然有效."""
+    async def scenario():
+        manager = SSEManager()
+        manager._initialized = True
+        websocket = FakeWebSocket()
+        session = WSStreamSession(websocket, manager=manager, tick_cache=TickCache(), key_table=KeyTable())
+        runner = asyncio.create_task(session.run())
+
+        async def settle():
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        def tick_records():
+            return [record for message in websocket.sent if isinstance(message, bytes)
+                    for record in decode_frame(message)[1]]
+
+        await websocket.inbox.put({"action": "subscribe", "subscriptions": [
+            {}, {"source": "wen_cai", "symbol": "HSI", "type": "realtime"}]})
+        await settle()
+        assert len(session.connection.filter_config.keys) == 2
+        assert manager.publish(make_tick(price=100.0)) == 1
+        await settle()
+        assert [record["price"] for record in tick_records()] == [100.0]
+
+        await websocket.inbox.put({"action": "unsubscribe", "subscriptions": [
+            {"source": "wen_cai", "symbol": "HSI", "type": "realtime"}]})
+        await settle()
+        assert session.connection.filter_config.keys == {("*", "*", "*")}
+        assert manager.publish(make_tick(price=101.0)) == 1
+        await settle()
+        assert [record["price"] for record in tick_records()] == [100.0, 101.0]
+
+        await websocket.inbox.put(None)
+        await asyncio.wait_for(runner, timeout=1)
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_subscribe_and_batched_frames()
+    test_keys_sent_before_frames()
+    test_overlapping_subscriptions_deliver_once()
+    logger.info("✅ WebSocket行情推送测试完成")
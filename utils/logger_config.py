@@ -99,7 +99,6 @@ def configure_global_logging():
     logging.getLogger().setLevel(logging.WARNING)
     
     # 设置第三方库日志级别
-    logging.getLogger('apscheduler').setLevel(logging.WARNING)
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('requests').setLevel(logging.WARNING)
     logging.getLogger('uvicorn').setLevel(logging.INFO)
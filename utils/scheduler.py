@@ -0,0 +1,252 @@
+"""共享任务调度器.
+
+所有数据源的定时任务注册到同一个调度器，调度器在一个独立的事件循环线程上运行，
+同步任务交给固定大小的线程池执行，线程数量不随数据源数量增长。
+"""
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from utils.logger_config import setup_logger
+
+logger = setup_logger('scheduler')
+
+
+@dataclass
+class JobStats:
+    """任务运行统计."""
+    runs: int = 0
+    failures: int = 0
+    # 上一次运行未结束时到期而被合并跳过的次数
+    coalesced: int = 0
+    # 超过容忍时间而被跳过的次数
+    misfires: int = 0
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    total_duration: float = 0.0
+    last_run_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "misfires": self.misfires,
+            "last_duration_ms": round(self.last_duration * 1000, 3),
+            "avg_duration_ms": round(self.total_duration / self.runs * 1000, 3) if self.runs else 0.0,
+            "max_duration_ms": round(self.max_duration * 1000, 3),
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class ScheduledJob:
+    """定时任务."""
+    job_id: str
+    func: Callable[[], Any]
+    interval: float
+    jitter: float = 0.0
+    # 实际触发晚于计划时间超过该值时跳过本次运行，None表示不跳过
+    misfire_grace: Optional[float] = None
+    next_run: float = 0.0
+    running: bool = False
+    handle: Optional[asyncio.TimerHandle] = None
+    stats: JobStats = field(default_factory=JobStats)
+
+
+class SharedScheduler:
+    """共享任务调度器."""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        """初始化调度器.
+
+        Args:
+            max_workers: 执行同步任务的线程池大小
+        """
+        self.max_workers = max_workers
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """启动调度线程（重复调用无副作用）."""
+        with self._lock:
+            if self.running:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scheduler-worker')
+            self._thread = threading.Thread(target=self._run_loop, args=(self._loop,), name='scheduler-loop',
+                                            daemon=True)
+            self._thread.start()
+            logger.info(f"✅ 共享调度器已启动 (工作线程: {self.max_workers})")
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            # 在循环线程中于循环停止后关闭，shutdown 等待超时时不会关闭仍在运行的循环
+            loop.close()
+
+    def add_interval_job(self, func: Callable[[], Any], seconds: float, job_id: Optional[str] = None,
+                         jitter: float = 0.0, misfire_grace: Optional[float] = None,
+                         run_immediately: bool = False) -> str:
+        """注册周期任务.
+
+        Args:
+            func: 任务函数，可以是普通函数或协程函数
+            seconds: 运行间隔(秒)
+            job_id: 任务ID，默认使用函数名
+            jitter: 每次触发时增加的随机延迟上限(秒)，用于错开上游请求
+            misfire_grace: 触发延迟容忍时间(秒)，超过则跳过本次运行
+            run_immediately: 是否立即运行第一次
+
+        Returns:
+            任务ID
+        """
+        self.start()
+        job_id = job_id or getattr(func, '__qualname__', repr(func))
+        if job_id in self._jobs:
+            raise ValueError(f"任务已存在: {job_id}")
+
+        job = ScheduledJob(job_id=job_id, func=func, interval=seconds, jitter=jitter,
+                           misfire_grace=misfire_grace)
+        self._jobs[job_id] = job
+
+        def schedule_first() -> None:
+            job.next_run = self._loop.time() + (0 if run_immediately else seconds)
+            self._schedule(job)
+
+        self._loop.call_soon_threadsafe(schedule_first)
+        logger.info(f"⏱️ 注册定时任务: {job_id} (每{seconds}秒)")
+        return job_id
+
+    def remove_job(self, job_id: str) -> None:
+        """移除任务，正在运行的实例会继续执行完毕."""
+        job = self._jobs.pop(job_id, None)
+        if job and self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._cancel, job)
+            logger.info(f"🗑️ 移除定时任务: {job_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调度器与各任务的运行统计."""
+        return {
+            "running": self.running,
+            "workers": self.max_workers,
+            "jobs": {
+                job_id: {"interval": job.interval, "running": job.running, **job.stats.to_dict()}
+                for job_id, job in list(self._jobs.items())
+            }
+        }
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """停止调度器：取消全部任务，等待运行中的任务结束后停止线程.
+
+        会阻塞至多约 2 * timeout 秒，在事件循环中应通过 asyncio.to_thread 调用。
+        """
+        with self._lock:
+            if not self.running:
+                return
+
+            for job in list(self._jobs.values()):
+                self._loop.call_soon_threadsafe(self._cancel, job)
+            self._jobs.clear()
+
+            drain = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+            try:
+                drain.result(timeout)
+            except Exception as e:
+                drain.cancel()
+                logger.warning(f"⚠️ 等待运行中的任务结束超时: {e}")
+
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("⚠️ 调度线程未在超时时间内退出，其事件循环将在线程退出时关闭")
+            self._executor.shutdown(wait=False)
+            self._thread = None
+            logger.info("🛑 共享调度器已停止")
+
+    async def _drain(self) -> None:
+        if self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    def _cancel(self, job: ScheduledJob) -> None:
+        if job.handle:
+            job.handle.cancel()
+            job.handle = None
+
+    def _schedule(self, job: ScheduledJob) -> None:
+        delay = random.uniform(0, job.jitter) if job.jitter else 0.0
+        job.handle = self._loop.call_at(job.next_run + delay, self._fire, job)
+
+    def _fire(self, job: ScheduledJob) -> None:
+        if self._jobs.get(job.job_id) is not job:
+            return
+
+        now = self._loop.time()
+        lateness = now - job.next_run - job.jitter
+        if job.running:
+            job.stats.coalesced += 1
+        elif job.misfire_grace is not None and lateness > job.misfire_grace:
+            job.stats.misfires += 1
+        else:
+            job.running = True
+            task = self._loop.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        # 计算下一次触发时间，错过的周期直接跳过而不是补跑
+        job.next_run += job.interval
+        if job.next_run <= now:
+            missed = int((now - job.next_run) // job.interval) + 1
+            job.next_run += missed * job.interval
+            job.stats.misfires += missed
+        self._schedule(job)
+
+    async def _run(self, job: ScheduledJob) -> None:
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await job.func()
+            else:
+                await self._loop.run_in_executor(self._executor, job.func)
+            job.stats.last_error = None
+        except Exception as e:
+            job.stats.failures += 1
+            job.stats.last_error = str(e)
+            logger.error(f"❌ 定时任务 {job.job_id} 执行失败: {e}")
+        finally:
+            duration = time.perf_counter() - started
+            job.running = False
+            job.stats.runs += 1
+            job.stats.last_duration = duration
+            job.stats.total_duration += duration
+            job.stats.max_duration = max(job.stats.max_duration, duration)
+            job.stats.last_run_at = time.time()
+
+
+# 全局调度器实例
+_scheduler = None
+
+
+def get_scheduler() -> SharedScheduler:
+    """获取共享调度器实例."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SharedScheduler()
+    return _scheduler
@@ -0,0 +1,140 @@
+"""共享内存环形缓冲区.
+
+单生产者进程/单消费者的跨进程消息通道。缓冲区由固定大小的槽位组成，每个槽位以
+序号和负载长度开头，写入方递增全局写序号，读取方根据序号检测溢出与被覆盖的槽位。
+写入方进程内的多个线程可同时发布，写入由锁串行化。
+
+内存布局::
+
+    头部 (32字节): magic(u32) | slot_size(u32) | capacity(u32) | 保留(u32) | write_seq(u64) | 保留(u64)
+    槽位 (slot_size字节): seq+1(u64, 0表示空, WRITING表示写入中) | length(u32) | payload
+"""
+
+import struct
+import threading
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+_MAGIC = 0x4D534D52  # "MSMR"
+_HEADER = struct.Struct('<IIIIQQ')
+_WRITE_SEQ = struct.Struct('<Q')
+_WRITE_SEQ_OFFSET = 16
+_SLOT_HEADER = struct.Struct('<QI')
+_WRITING = 0xFFFFFFFFFFFFFFFF
+
+
+class RingOverflowError(Exception):
+    """负载超过槽位容量."""
+    pass
+
+
+class ShmRingBuffer:
+    """共享内存环形缓冲区."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self._shm = shm
+        self._buf = shm.buf
+        self._owner = owner
+        magic, self.slot_size, self.capacity, _, _, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"无效的共享内存环形缓冲区: {shm.name}")
+        self.max_payload = self.slot_size - _SLOT_HEADER.size
+        # 写入方进程内的线程锁，保证序号的读取、槽位写入与序号递增不被交错
+        self._write_lock = threading.Lock()
+        # 读取方状态
+        self.read_seq = 0
+        self.dropped = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @classmethod
+    def create(cls, capacity: int = 4096, slot_size: int = 256, name: Optional[str] = None) -> 'ShmRingBuffer':
+        """创建缓冲区（由消费方进程创建并负责释放）."""
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError(f"槽位大小必须大于 {_SLOT_HEADER.size} 字节")
+        size = _HEADER.size + capacity * slot_size
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, slot_size, capacity, 0, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'ShmRingBuffer':
+        """连接到已创建的缓冲区."""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python 3.13 之前连接方也会注册到 resource_tracker，需手动注销避免重复释放
+            shm = shared_memory.SharedMemory(name=name)
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+        return cls(shm, owner=False)
+
+    @property
+    def write_seq(self) -> int:
+        return _WRITE_SEQ.unpack_from(self._buf, _WRITE_SEQ_OFFSET)[0]
+
+    def publish(self, payload: bytes) -> int:
+        """写入一条消息，返回其序号；缓冲区满时覆盖最旧的槽位."""
+        length = len(payload)
+        if length > self.max_payload:
+            raise RingOverflowError(f"消息长度 {length} 超过槽位容量 {self.max_payload}")
+
+        with self._write_lock:
+            seq = self.write_seq
+            offset = _HEADER.size + (seq % self.capacity) * self.slot_size
+            _SLOT_HEADER.pack_into(self._buf, offset, _WRITING, length)
+            data_offset = offset + _SLOT_HEADER.size
+            self._buf[data_offset:data_offset + length] = payload
+            _SLOT_HEADER.pack_into(self._buf, offset, seq + 1, length)
+            _WRITE_SEQ.pack_into(self._buf, _WRITE_SEQ_OFFSET, seq + 1)
+            return seq
+
+    def read(self, max_items: int = 256) -> Tuple[List[bytes], int]:
+        """读取新消息.
+
+        Returns:
+            (消息列表, 本次检测到的丢失条数)。读取落后超过缓冲区容量或槽位在读取时被覆盖都会计为丢失。
+        """
+        head = self.write_seq
+        dropped = 0
+        if head - self.read_seq > self.capacity:
+            dropped = head - self.capacity - self.read_seq
+            self.read_seq = head - self.capacity
+
+        messages = []
+        while self.read_seq < head and len(messages) < max_items:
+            seq = self.read_seq
+            offset = _HEADER.size + (seq % self.capacity) * self.slot_size
+            slot_seq, length = _SLOT_HEADER.unpack_from(self._buf, offset)
+            if slot_seq == seq + 1:
+                data_offset = offset + _SLOT_HEADER.size
+                payload = bytes(self._buf[data_offset:data_offset + length])
+                # 复制后再次校验，防止读取过程中被写入方覆盖
+                if _SLOT_HEADER.unpack_from(self._buf, offset)[0] == seq + 1:
+                    messages.append(payload)
+                else:
+                    dropped += 1
+            else:
+                dropped += 1
+            self.read_seq += 1
+
+        self.dropped += dropped
+        return messages, dropped
+
+    def close(self) -> None:
+        """关闭映射，创建方同时释放共享内存."""
+        self._buf = None
+        try:
+            self._shm.close()
+        finally:
+            if self._owner:
+                try:
+                    self._shm.unlink()
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,104 @@
+"""上游请求合并（single-flight）.
+
+相同键的并发请求共享同一次进行中的上游调用，全部调用方得到同一结果或同一异常；
+调用作为事件循环中的任务执行，同时进行的上游调用数受固定上限约束，不随API并发数增长。
+"""
+
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from utils.logger_config import setup_logger
+
+logger = setup_logger('single_flight')
+
+
+class SingleFlightTimeout(TimeoutError):
+    """等待进行中的上游调用超时，调用本身继续执行，之后的相同请求仍会合并到该调用."""
+    pass
+
+
+class SingleFlight:
+    """按键合并并发调用."""
+
+    def __init__(self, max_workers: int = 4, default_timeout: float = 10.0):
+        # 每个事件循环中同时进行的上游调用数上限
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        # 事件循环 -> 该循环中进行中的调用与并发上限
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopFlights]" = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.shared = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]],
+                       timeout: Optional[float] = None) -> Any:
+        """执行协程函数 func 或加入相同键进行中的调用，最多等待 timeout 秒.
+
+        func 抛出的异常原样传给所有等待的调用方；等待超时抛出 SingleFlightTimeout。
+        调用方被取消或等待超时不会取消进行中的调用，其结果仍提供给其他等待方。
+        """
+        loop = asyncio.get_running_loop()
+        flights = self._loops.get(loop)
+        if flights is None:
+            flights = self._loops[loop] = _LoopFlights(self.max_workers)
+        task = flights.tasks.get(key)
+        if task is None:
+            task = loop.create_task(flights.run(func))
+            flights.tasks[key] = task
+            self.calls += 1
+            task.add_done_callback(lambda done: self._finish(flights, key, done))
+        else:
+            self.shared += 1
+
+        timeout = self.default_timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"⚠️ 等待上游调用超时({timeout}秒): {key}")
+            raise SingleFlightTimeout(f"等待上游调用超时({timeout}秒): {key}") from None
+
+    def _finish(self, flights: "_LoopFlights", key: Hashable, task: "asyncio.Task") -> None:
+        if flights.tasks.get(key) is task:
+            del flights.tasks[key]
+        if task.cancelled() or task.exception() is not None:
+            self.errors += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        in_flight = []
+        for flights in list(self._loops.values()):
+            in_flight.extend(str(key) for key in list(flights.tasks))
+        return {
+            "max_workers": self.max_workers,
+            "calls": self.calls,
+            "shared": self.shared,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "in_flight": in_flight
+        }
+
+
+class _LoopFlights:
+    """单个事件循环中进行中的调用及其并发上限."""
+
+    def __init__(self, max_concurrency: int):
+        self.tasks: Dict[Hashable, "asyncio.Task"] = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def run(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._slots:
+            return await func()
+
+
+# 全局上游请求合并实例
+_single_flight = None
+
+
+def get_single_flight() -> SingleFlight:
+    """获取上游请求合并实例."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
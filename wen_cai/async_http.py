@@ -0,0 +1,35 @@
+"""共享的异步HTTP客户端.
+
+每个事件循环复用一个 httpx.AsyncClient（连接池不能跨事件循环使用），
+并发连接数有上限，慢速上游只占用协程而不占用线程。
+"""
+
+import asyncio
+import weakref
+
+import httpx
+
+# 单个事件循环内到上游的最大并发连接数
+MAX_CONNECTIONS = 32
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """获取当前事件循环的共享异步HTTP客户端."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS // 2)
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_async_client() -> None:
+    """关闭当前事件循环的共享客户端，在服务关闭时调用."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,23 +1,58 @@
+import asyncio
 import os
 # import execjs
 import subprocess
 
+from fake_useragent import UserAgent
+
+
+TOKEN_SCRIPT = os.path.join(os.path.dirname(__file__), 'hexin-v.bundle.js')
+# 生成token的node进程超时时间（秒）
+TOKEN_TIMEOUT = 10
 
 
 def get_token():
     '''获取token'''
-    result = subprocess.run(['node', os.path.join(os.path.dirname(__file__), 'hexin-v.bundle.js')], stdout=subprocess.PIPE)
+    result = subprocess.run(['node', TOKEN_SCRIPT], stdout=subprocess.PIPE)
     return result.stdout.decode().strip() 
 
+async def get_token_async(timeout=TOKEN_TIMEOUT):
+    '''异步获取token，等待node进程时不占用线程；超时或被取消时结束node进程'''
+    process = await asyncio.create_subprocess_exec('node', TOKEN_SCRIPT, stdout=asyncio.subprocess.PIPE)
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"生成token超时({timeout}秒)") from None
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+    return stdout.decode().strip()
+
+# UserAgent 加载浏览器数据较慢，模块内只创建一次
+_user_agent = UserAgent()
+
+def _random_user_agent():
+    return _user_agent.random
+
 def headers(cookie=None, user_agent=None):
 
     if user_agent is None:
-        from fake_useragent import UserAgent
-        ua = UserAgent()
-        user_agent = ua.random
+        user_agent = _random_user_agent()
 
     return {
         'hexin-v': get_token(),
         'User-Agent': user_agent,
         'cookie': cookie
     }
+
+async def headers_async(cookie=None, user_agent=None):
+
+    if user_agent is None:
+        user_agent = _random_user_agent()
+
+    return {
+        'hexin-v': await get_token_async(),
+        'User-Agent': user_agent,
+        'cookie': cookie
+    }
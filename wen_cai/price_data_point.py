@@ -45,3 +45,14 @@ class CurrentStatus:
     status_text: str
     market_time: datetime
     matched_rule: Optional[ParsedTradingRule]
+
+
+@dataclass
+class RulesVersion:
+    """交易规则版本，规则内容变化时版本号才变化"""
+    # 规则内容摘要
+    version: str
+    # 规则内容最近一次变化的时间 (epoch秒)
+    modified: float
+    # 规则缓存到期、下次刷新的时间 (epoch秒)
+    refresh_at: float
@@ -1,18 +1,32 @@
+import asyncio
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pprint import pprint
 from typing import Dict, List, Optional
+import httpx
 import pytz
 import requests
+from requests.adapters import HTTPAdapter
 
+from .async_http import get_async_client
 from .price_data_point import SinaPriceDataPoint
 
 
+# 批量请求共享线程池，所有客户端实例共用
+_batch_executor: Optional[ThreadPoolExecutor] = None
+
+
 class SinaRealtimeQuoteClient:
     """新浪财经实时行情客户端"""
     
+    # 单个请求URL的最大长度，超出时自动拆分为多个批次
+    MAX_URL_LENGTH = 2000
+    # 并发请求的批次数上限
+    MAX_CONCURRENT_BATCHES = 8
+    
     def __init__(self):
         self.HEADERS = {
             'Referer': 'https://stock.finance.sina.com.cn/',
@@ -36,6 +50,10 @@ class SinaRealtimeQuoteClient:
         self.US_PRICE_IDX = 1
         self.US_DATETIME_TZ_IDX = 25  # 例如: "Jul 21 05:15PM EDT"
         self.US_YEAR_IDX = 29         # 例如: "2025"
+        
+        # 复用连接，连接池大小与并发批次数一致
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=self.MAX_CONCURRENT_BATCHES))
 
     def _to_float(self, value: str, default: float = 0.0) -> float:
         try:
@@ -101,59 +119,69 @@ class SinaRealtimeQuoteClient:
             print(f"解析美股数据时出错: {e}")
             return None
 
-    def fetch_sina_quotes(self, codes: List[str]) -> Dict[str, SinaPriceDataPoint]:
-        """
-        从新浪财经获取指定代码列表的实时行情。
+    def _split_batches(self, codes: List[str]) -> List[List[str]]:
+        """按URL长度限制将代码列表拆分为多个批次。"""
+        # 预留域名、时间戳等固定部分的长度
+        budget = self.MAX_URL_LENGTH - len(f"{self.SINA_API_URL}?rn=0000000000000&list=")
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_len = 0
+        for code in codes:
+            code_len = len(code) + (1 if current else 0)
+            if current and current_len + code_len > budget:
+                batches.append(current)
+                current, current_len = [], 0
+                code_len = len(code)
+            current.append(code)
+            current_len += code_len
+        if current:
+            batches.append(current)
+        return batches
 
-        参数:
-            codes (List[str]): 股票/指数代码列表, 例如 ['rt_hkHSI', 'gb_ixic']。
+    def _parse_quotes(self, text: str, codes: List[str]) -> Dict[str, SinaPriceDataPoint]:
+        """解析新浪行情响应文本。"""
+        results = {}
+        matches = re.findall(r'var hq_str_([^=]+)="([^"]*)"', text)
 
-        返回:
-            Dict[str, SinaPriceDataPoint]: 一个字典，键为完整的股票代码，值为 SinaPriceDataPoint 对象。
-                                        如果请求失败或无数据解析，则返回空字典。
-        """
-        if not codes:
-            return {}
+        requested_codes_set = set(codes)
+
+        for code_from_api, data_str in matches:
+            if code_from_api not in requested_codes_set:
+                print(f"警告: 收到未在请求列表中的代码 '{code_from_api}' 的数据，已跳过。")
+                continue
 
+            if not data_str:
+                print(f"警告: 代码 {code_from_api} 未返回有效数据。")
+                continue
+
+            data_parts = data_str.split(',')
+            
+            point = None
+            # 根据代码前缀分发到对应的解析器
+            if code_from_api.startswith('rt_hk'):
+                point = self._parse_hk_stock(data_parts)
+            elif code_from_api.startswith('gb_'):
+                point = self._parse_us_stock(data_parts)
+            else:
+                print(f"警告: 代码 '{code_from_api}' 没有对应的解析器。")
+                continue
+            
+            if point:
+                results[code_from_api] = point
+
+        return results
+
+    def _fetch_batch(self, codes: List[str]) -> Dict[str, SinaPriceDataPoint]:
+        """请求单个批次的行情，失败时返回空字典。"""
         timestamp = int(time.time() * 1000)
         list_str = ",".join(codes)
         url = f"{self.SINA_API_URL}?rn={timestamp}&list={list_str}"
 
         try:
-            response = requests.get(url, headers=self.HEADERS, timeout=5)
+            response = self.session.get(url, headers=self.HEADERS, timeout=5)
             response.raise_for_status()
             response.encoding = 'gbk'
-
-            results = {}
-            matches = re.findall(r'var hq_str_([^=]+)="([^"]*)"', response.text)
-
-            requested_codes_set = set(codes)
-
-            for code_from_api, data_str in matches:
-                if code_from_api not in requested_codes_set:
-                    print(f"警告: 收到未在请求列表中的代码 '{code_from_api}' 的数据，已跳过。")
-                    continue
-
-                if not data_str:
-                    print(f"警告: 代码 {code_from_api} 未返回有效数据。")
-                    continue
-
-                data_parts = data_str.split(',')
-                
-                point = None
-                # 根据代码前缀分发到对应的解析器
-                if code_from_api.startswith('rt_hk'):
-                    point = self._parse_hk_stock(data_parts)
-                elif code_from_api.startswith('gb_'):
-                    point = self._parse_us_stock(data_parts)
-                else:
-                    print(f"警告: 代码 '{code_from_api}' 没有对应的解析器。")
-                    continue
-                
-                if point:
-                    results[code_from_api] = point
-
-            return results
+            return self._parse_quotes(response.text, codes)
 
         except requests.exceptions.RequestException as e:
             print(f"网络请求失败: {e}")
@@ -162,6 +190,73 @@ class SinaRealtimeQuoteClient:
             print(f"获取或解析数据时发生意外错误: {e}")
             return {}
 
+    async def _fetch_batch_async(self, codes: List[str]) -> Dict[str, SinaPriceDataPoint]:
+        """异步请求单个批次的行情，失败时返回空字典。"""
+        timestamp = int(time.time() * 1000)
+        list_str = ",".join(codes)
+        url = f"{self.SINA_API_URL}?rn={timestamp}&list={list_str}"
+
+        try:
+            response = await get_async_client().get(url, headers=self.HEADERS, timeout=5)
+            response.raise_for_status()
+            response.encoding = 'gbk'
+            return self._parse_quotes(response.text, codes)
+
+        except httpx.HTTPError as e:
+            print(f"网络请求失败: {e}")
+            return {}
+        except Exception as e:
+            print(f"获取或解析数据时发生意外错误: {e}")
+            return {}
+
+    def fetch_sina_quotes(self, codes: List[str]) -> Dict[str, SinaPriceDataPoint]:
+        """
+        从新浪财经获取指定代码列表的实时行情。
+
+        代码过多时按URL长度限制自动拆分为多个批次并发请求，结果合并返回。
+
+        参数:
+            codes (List[str]): 股票/指数代码列表, 例如 ['rt_hkHSI', 'gb_ixic']。
+
+        返回:
+            Dict[str, SinaPriceDataPoint]: 一个字典，键为完整的股票代码，值为 SinaPriceDataPoint 对象。
+                                        请求失败的批次不包含在结果中。
+        """
+        if not codes:
+            return {}
+
+        batches = self._split_batches(list(dict.fromkeys(codes)))
+        if len(batches) == 1:
+            return self._fetch_batch(batches[0])
+
+        global _batch_executor
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_BATCHES,
+                                                 thread_name_prefix='sina-quote')
+        results: Dict[str, SinaPriceDataPoint] = {}
+        for batch_result in _batch_executor.map(self._fetch_batch, batches):
+            results.update(batch_result)
+        return results
+
+    async def fetch_sina_quotes_async(self, codes: List[str]) -> Dict[str, SinaPriceDataPoint]:
+        """
+        fetch_sina_quotes 的异步版本，各批次在当前事件循环中并发请求，不占用线程。
+        """
+        if not codes:
+            return {}
+
+        batches = self._split_batches(list(dict.fromkeys(codes)))
+        slots = asyncio.Semaphore(self.MAX_CONCURRENT_BATCHES)
+
+        async def fetch(batch: List[str]) -> Dict[str, SinaPriceDataPoint]:
+            async with slots:
+                return await self._fetch_batch_async(batch)
+
+        results: Dict[str, SinaPriceDataPoint] = {}
+        for batch_result in await asyncio.gather(*(fetch(batch) for batch in batches)):
+            results.update(batch_result)
+        return results
+
     def get_hsi_quote(self) -> Optional[SinaPriceDataPoint]:
         """获取恒生指数的实时报价。"""
         result = self.fetch_sina_quotes(['rt_hkHSI'])
@@ -1,13 +1,16 @@
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Tuple
 from datetime import datetime, time as time_obj, timedelta
+import hashlib
+import httpx
 import requests
 import re
 import time
 import random
 import pytz
 import logging
-from wen_cai.price_data_point import ParsedTradingRule, TradingDay, CurrentStatus
+from wen_cai.async_http import get_async_client
+from wen_cai.price_data_point import ParsedTradingRule, TradingDay, CurrentStatus, RulesVersion
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -38,10 +41,17 @@ class TradingHoursClient:
         "竞价", "节", "日", "提前", "延迟" , "盘前"
     }
     
+    REQUEST_HEADERS = {
+        "User-Agent": "Mozilla/5.0", 
+        "Referer": "https://stock.finance.sina.com.cn"
+    }
+    
     def __init__(self, cache_ttl: int = 3600):
         self.data_sources = self._init_data_sources()
         self.cache: Dict[str, Tuple[List[ParsedTradingRule], float]] = {}
         self.cache_ttl = cache_ttl
+        # 市场 -> (规则内容摘要, 内容最近一次变化的时间)
+        self.versions: Dict[str, Tuple[str, float]] = {}
         
     def _generate_random_param(self) -> str:
         """必要的请求参数"""
@@ -74,8 +84,26 @@ class TradingHoursClient:
                 time.time() - self.cache[market][1] < self.cache_ttl)
     
     def _update_cache(self, market: str, rules: List[ParsedTradingRule]) -> None:
-        """更新缓存"""
-        self.cache[market] = (rules, time.time())
+        """更新缓存，规则内容变化时更新版本"""
+        now = time.time()
+        self.cache[market] = (rules, now)
+        digest = hashlib.sha1(repr(rules).encode()).hexdigest()[:16]
+        if self.versions.get(market, (None,))[0] != digest:
+            self.versions[market] = (digest, now)
+
+    def rules_version(self, market: str) -> Optional[RulesVersion]:
+        """已缓存规则的版本，没有有效缓存时返回 None"""
+        if market == "HSI":
+            market = "HK"
+        if not self._is_cache_valid(market) or market not in self.versions:
+            return None
+        version, modified = self.versions[market]
+        return RulesVersion(version, modified, self.cache[market][1] + self.cache_ttl)
+
+    async def get_rules_version_async(self, market: str) -> Optional[RulesVersion]:
+        """获取（必要时刷新）交易规则并返回其版本"""
+        await self._fetch_trading_rules_async(market)
+        return self.rules_version(market)
     
     def _fetch_trading_rules(self, market: str) -> List[ParsedTradingRule]:
         """获取交易日历"""
@@ -94,25 +122,41 @@ class TradingHoursClient:
         url = data_source.api_url.format(self._generate_random_param())
         
         try:
-            response = requests.get(
-                url, 
-                headers={
-                    "User-Agent": "Mozilla/5.0", 
-                    "Referer": "https://stock.finance.sina.com.cn"
-                }, 
-                timeout=10
-            )
+            response = requests.get(url, headers=self.REQUEST_HEADERS, timeout=10)
             response.raise_for_status()
-            parsed_rules = self._parse_trading_data(response.text, data_source)
-            
-            # 只有获取到规则时才更新缓存
-            if parsed_rules: 
-                self._update_cache(market, parsed_rules)
-                
-            return parsed_rules
+            return self._accept_trading_data(market, response.text, data_source)
         except requests.RequestException as e:
             logger.error(f"获取 {market} 交易时间数据失败: {e}")
             return []
+
+    async def _fetch_trading_rules_async(self, market: str) -> List[ParsedTradingRule]:
+        """异步获取交易日历，与同步版本共享缓存"""
+        if market == "HSI":
+            market = "HK"
+            
+        if market not in self.data_sources:
+            raise ValueError(f"不支持的市场: {market}")
+            
+        if self._is_cache_valid(market):
+            return self.cache[market][0]
+        
+        data_source = self.data_sources[market]
+        url = data_source.api_url.format(self._generate_random_param())
+        
+        try:
+            response = await get_async_client().get(url, headers=self.REQUEST_HEADERS, timeout=10)
+            response.raise_for_status()
+            return self._accept_trading_data(market, response.text, data_source)
+        except httpx.HTTPError as e:
+            logger.error(f"获取 {market} 交易时间数据失败: {e}")
+            return []
+
+    def _accept_trading_data(self, market: str, data: str, source: DataSource) -> List[ParsedTradingRule]:
+        """解析交易数据，只有获取到规则时才更新缓存"""
+        parsed_rules = self._parse_trading_data(data, source)
+        if parsed_rules: 
+            self._update_cache(market, parsed_rules)
+        return parsed_rules
     
     def _parse_trading_data(self, data: str, source: DataSource) -> List[ParsedTradingRule]:
         """解析交易数据"""
@@ -159,15 +203,8 @@ class TradingHoursClient:
         else:
             return current_t >= start_t or current_t < end_t
 
-    def _get_status_for_datetime(self, market: str, target_market_time: datetime) -> CurrentStatus:
-        """
-        [内部核心方法] 获取指定市场在特定时区时间点的状态。
-        """
-        all_rules = self._fetch_trading_rules(market)
-        if not all_rules:
-            return CurrentStatus(False, "无法获取交易规则", target_market_time, None)
-
-        current_time_str = target_market_time.strftime("%H:%M:%S")
+    def _applicable_rules(self, all_rules: List[ParsedTradingRule], target_market_time: datetime) -> List[ParsedTradingRule]:
+        """指定日期适用的规则: 特定日期 > 星期几 > 默认规则"""
         today_date_str = target_market_time.strftime("%Y-%m-%d")
         today_weekday_str = f"w{(target_market_time.weekday() + 1) % 7}"
 
@@ -179,7 +216,20 @@ class TradingHoursClient:
         ]
         
         # 找到第一个非空的规则组
-        applicable_rules = next((rules for rules in rule_groups if rules), [])
+        return next((rules for rules in rule_groups if rules), [])
+
+    def _get_status_for_datetime(self, market: str, target_market_time: datetime,
+                                 rules: Optional[List[ParsedTradingRule]] = None) -> CurrentStatus:
+        """
+        [内部核心方法] 获取指定市场在特定时区时间点的状态。
+        rules 为已获取的交易规则，未提供时自动获取。
+        """
+        all_rules = rules if rules is not None else self._fetch_trading_rules(market)
+        if not all_rules:
+            return CurrentStatus(False, "无法获取交易规则", target_market_time, None)
+
+        current_time_str = target_market_time.strftime("%H:%M:%S")
+        applicable_rules = self._applicable_rules(all_rules, target_market_time)
 
         # 查找匹配的规则
         matched_rule = next(
@@ -255,9 +305,10 @@ class TradingHoursClient:
                 
         return result
     
-    def get_all_trading_days(self, market: str) -> List[TradingDay]:
+    def get_all_trading_days(self, market: str,
+                             rules: Optional[List[ParsedTradingRule]] = None) -> List[TradingDay]:
         """
-        获取指定市场的所有交易日。
+        获取指定市场的所有交易日。rules 为已获取的交易规则，未提供时自动获取。
         """
         # 处理市场别名
         if market == "HSI":
@@ -266,7 +317,7 @@ class TradingHoursClient:
         if market not in self.data_sources:
             raise ValueError(f"不支持的市场: {market}")
             
-        all_rules = self._fetch_trading_rules(market)
+        all_rules = rules if rules is not None else self._fetch_trading_rules(market)
         time_timezone = self.data_sources[market].timezone
         
         result = []
@@ -286,7 +337,8 @@ class TradingHoursClient:
                     
         return result
     
-    def get_next_opening_time(self, market: str) -> Optional[ParsedTradingRule]:
+    def get_next_opening_time(self, market: str,
+                              rules: Optional[List[ParsedTradingRule]] = None) -> Optional[ParsedTradingRule]:
         """
         获取指定市场的下一次开盘时间。
         此方法会首先查找常规交易日（周一至周五），然后排除掉特殊的节假日，
@@ -294,6 +346,7 @@ class TradingHoursClient:
 
         Args:
             market (str): 市场标识 (例如 "HK", "NASDAQ", "HSI").
+            rules: 已获取的交易规则，未提供时自动获取。
 
         Returns:
             Optional[ParsedTradingRule]: 返回下一个开盘时间的交易规则对象，
@@ -308,7 +361,7 @@ class TradingHoursClient:
         if market not in self.data_sources:
             raise ValueError(f"不支持的市场: {original_market}")
             
-        all_rules = self._fetch_trading_rules(market)
+        all_rules = rules if rules is not None else self._fetch_trading_rules(market)
         if not all_rules:
             return None
 
@@ -388,13 +441,14 @@ class TradingHoursClient:
         """
         self.cache.clear()
     
-    def get_current_trading_status(self, market: str) -> CurrentStatus:
+    def get_current_trading_status(self, market: str,
+                                   rules: Optional[List[ParsedTradingRule]] = None) -> CurrentStatus:
         """
-        获取指定市场当前的详细交易状态。
+        获取指定市场当前的详细交易状态。rules 为已获取的交易规则，未提供时自动获取。
         """
         
         if market == "HSI":
-            return self.get_current_trading_status("HK")
+            return self.get_current_trading_status("HK", rules)
     
         if market not in self.data_sources:
             raise ValueError(f"不支持的市场: {market}")
@@ -403,7 +457,55 @@ class TradingHoursClient:
         market_tz = pytz.timezone(data_source.timezone)
         now_market_time = datetime.now(market_tz)
         
-        return self._get_status_for_datetime(market, now_market_time)
+        return self._get_status_for_datetime(market, now_market_time, rules)
+
+    async def get_all_trading_days_async(self, market: str) -> List[TradingDay]:
+        """异步获取指定市场的所有交易日。"""
+        return self.get_all_trading_days(market, await self._fetch_trading_rules_async(market))
+
+    async def get_next_opening_time_async(self, market: str) -> Optional[ParsedTradingRule]:
+        """异步获取指定市场的下一次开盘时间。"""
+        return self.get_next_opening_time(market, await self._fetch_trading_rules_async(market))
+
+    async def get_current_trading_status_async(self, market: str) -> CurrentStatus:
+        """异步获取指定市场当前的详细交易状态。"""
+        return self.get_current_trading_status(market, await self._fetch_trading_rules_async(market))
+
+    def get_next_status_change(self, market: str, rules: Optional[List[ParsedTradingRule]] = None,
+                               at: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        获取指定市场交易状态下一次可能变化的时间（当天适用规则的起止时间或次日零点）。
+        在此之前当前状态与下一次开盘时间都不会变化。无法获取规则时返回 None。
+        """
+        if market == "HSI":
+            market = "HK"
+
+        if market not in self.data_sources:
+            raise ValueError(f"不支持的市场: {market}")
+
+        all_rules = rules if rules is not None else self._fetch_trading_rules(market)
+        if not all_rules:
+            return None
+
+        market_tz = pytz.timezone(self.data_sources[market].timezone)
+        now_market_time = at.astimezone(market_tz) if at is not None else datetime.now(market_tz)
+        today = now_market_time.date()
+        boundaries = [market_tz.localize(datetime.combine(today + timedelta(days=1), time_obj()))]
+        for rule in self._applicable_rules(all_rules, now_market_time):
+            for edge in (rule.start_time, rule.end_time):
+                # 与 _time_in_range 一致，24:00:00 按 23:59:59 处理
+                try:
+                    edge_time = time_obj.fromisoformat("23:59:59" if edge == "24:00:00" else edge)
+                except ValueError:
+                    continue
+                boundary = market_tz.localize(datetime.combine(today, edge_time))
+                if boundary > now_market_time:
+                    boundaries.append(boundary)
+        return min(boundaries)
+
+    async def get_next_status_change_async(self, market: str) -> Optional[datetime]:
+        """异步获取指定市场交易状态下一次可能变化的时间。"""
+        return self.get_next_status_change(market, await self._fetch_trading_rules_async(market))
 
     def get_status_at_time(self, market: str, time_str: str, timezone: str = "Asia/Shanghai") -> CurrentStatus:
         """
@@ -1,5 +1,6 @@
 from typing import Optional
-from .headers import headers
+from .async_http import get_async_client
+from .headers import headers, headers_async
 import requests
 import json
 from datetime import datetime, timedelta
@@ -90,6 +91,22 @@ class WenCaiClient:
         response = requests.get(url, params=params, headers=request_headers)
         return self.parse_quote_data(response.text)
 
+    async def get_data_async(self, type: str) -> Optional[list[SinaPriceDataPoint]]:
+        """
+        get_data 的异步版本，token生成与请求都不占用线程
+        """
+        url = 'https://d.10jqka.com.cn/v6/time/{}/last.js'.format(type)
+        request_headers = await headers_async()
+
+        params = {
+            'hexin-v': request_headers.get('hexin-v')
+        }
+
+        # requests 会忽略值为 None 的请求头，httpx 不允许
+        request_headers = {key: value for key, value in request_headers.items() if value is not None}
+        response = await get_async_client().get(url, params=params, headers=request_headers)
+        return self.parse_quote_data(response.text)
+
     def get_hsi_kline(self) -> list[SinaPriceDataPoint]:
         """获取恒生指数分钟级K线"""
         return self.get_data('176_HSI')